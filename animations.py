@@ -1,4 +1,5 @@
 # animations.py — robust helpers to animate IntVars / progress bars
+import time
 import tkinter as tk
 
 def _after_target(var, fallback=None):
@@ -27,32 +28,64 @@ def _after_target(var, fallback=None):
     except Exception:
         return None
 
+FRAME_MS = 16   # ~60 Hz frame cap
+
+
+class Tween:
+    """Handle for a running animate_intvar(); cancel() stops it where it is."""
+
+    def __init__(self, target):
+        self._target = target
+        self._after_id = None
+        self.done = False
+
+    def cancel(self):
+        self.done = True
+        if self._after_id is not None:
+            try:
+                self._target.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+
 def animate_intvar(var: tk.IntVar, start: int, end: int,
-                   duration_ms=350, steps=30, ease=True, widget=None):
-    """Tween an IntVar from start to end with optional easing."""
+                   duration_ms=350, steps=None, ease=True, widget=None):
+    """Tween an IntVar from start to end over a fixed duration with optional easing.
+
+    Time-based: each frame (at most one per FRAME_MS) sets the value for the
+    elapsed fraction of `duration_ms`, so the cost is ~duration/16 callbacks
+    no matter how far apart start and end are. `steps` is accepted for
+    backwards compatibility and ignored. Returns a Tween (call .cancel()).
+    """
     target = _after_target(var, fallback=widget)
-    if target is None or start == end or steps <= 0 or duration_ms <= 0:
+    handle = Tween(target)
+    if target is None or start == end or duration_ms <= 0:
         var.set(end)
-        return
+        handle.done = True
+        return handle
 
     delta = end - start
-    idx = {"i": 0}
+    t0 = time.perf_counter()
 
-    def step():
-        i = idx["i"]
-        t = (i + 1) / steps
+    def frame():
+        handle._after_id = None
+        if handle.done:
+            return
+        t = min(1.0, (time.perf_counter() - t0) * 1000.0 / duration_ms)
         if ease:
             # smoothstep
             t = t * t * (3 - 2 * t)
-        var.set(int(round(start + delta * t)))
-        idx["i"] += 1
-        if idx["i"] < steps:
-            target.after(max(1, duration_ms // steps), step)
-        else:
+        if t >= 1.0:
             var.set(end)
+            handle.done = True
+            return
+        var.set(int(round(start + delta * t)))
+        handle._after_id = target.after(FRAME_MS, frame)
 
     var.set(start)
-    step()
+    handle._after_id = target.after(FRAME_MS, frame)
+    return handle
 
 def flash_widget(widget, times=2, on="#FFFFFF", off=None, interval=120):
     """Quick flash to draw attention."""
@@ -0,0 +1,99 @@
+# assets.py — shared PhotoImage cache
+#
+#     icon = assets.image("images/coin.png", 28)   # fits in 28x28
+#     frames = assets.sprite_frames("Npc_Shop/idleshop.png")
+#
+# Images are decoded lazily and kept for the life of the process, keyed by
+# (path, max size), so every widget asking for the same icon shares one
+# PhotoImage (which also keeps it from being garbage-collected under a Label).
+#
+# Tk can only shrink by integer subsampling after decoding the full file,
+# which is the slow part for the 512/1024px sources. So the first time a
+# size is produced it is also written to images/.cache as a small PNG; later
+# runs load that thumbnail directly. The thumbnail name includes the
+# source's mtime, so editing an image invalidates it.
+import math
+import tkinter as tk
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+THUMB_DIR = ROOT / "images" / ".cache"
+
+_images: Dict[Tuple[str, int], Optional[tk.PhotoImage]] = {}
+_sprites: Dict[Tuple[str, int], List[tk.PhotoImage]] = {}
+
+
+def _resolve(path) -> Path:
+    p = Path(path)
+    return p if p.is_absolute() else ROOT / p
+
+
+def _thumb_path(src: Path, max_size: int) -> Path:
+    return THUMB_DIR / f"{src.stem}-{max_size}px-{src.stat().st_mtime_ns:x}.png"
+
+
+def image(path, max_size: int = 0) -> Optional[tk.PhotoImage]:
+    """PhotoImage for `path` shrunk to fit max_size (0 = original size); None if missing/unreadable."""
+    src = _resolve(path)
+    key = (str(src), int(max_size))
+    if key in _images:
+        return _images[key]
+    img = None
+    try:
+        if src.exists():
+            img = _load(src, int(max_size))
+    except Exception as e:
+        print(f"[assets] could not load {src.name}: {e}")
+    _images[key] = img
+    return img
+
+
+def _load(src: Path, max_size: int) -> tk.PhotoImage:
+    if max_size <= 0:
+        return tk.PhotoImage(file=str(src))
+    thumb = _thumb_path(src, max_size)
+    if thumb.exists():
+        try:
+            return tk.PhotoImage(file=str(thumb))
+        except tk.TclError:
+            pass  # corrupt thumbnail: rebuild it below
+    full = _images.get((str(src), 0)) or tk.PhotoImage(file=str(src))
+    w, h = full.width(), full.height()
+    if max(w, h) <= max_size:
+        return full
+    # integer subsample down (Tk limitation); ceil so the result fits
+    factor = max(1, int(math.ceil(max(w, h) / max_size)))
+    img = full.subsample(factor, factor)
+    try:
+        THUMB_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in THUMB_DIR.glob(f"{src.stem}-{max_size}px-*.png"):
+            stale.unlink()
+        img.write(str(thumb), format="png")
+    except Exception as e:
+        print(f"[assets] thumbnail not saved for {src.name}: {e}")
+    return img
+
+
+def sprite_frames(path, frame_w: int = 0) -> List[tk.PhotoImage]:
+    """Slice a horizontal sprite sheet into frames once (square frames unless frame_w is given).
+
+    Returns [] if the sheet is missing or its width isn't a whole number of frames.
+    """
+    src = _resolve(path)
+    key = (str(src), int(frame_w))
+    if key in _sprites:
+        return _sprites[key]
+    frames: List[tk.PhotoImage] = []
+    sheet = image(src)
+    if sheet is not None:
+        fh = sheet.height()
+        fw = frame_w or fh
+        count = sheet.width() // fw if fw else 0
+        if count >= 1 and sheet.width() % fw == 0:
+            for i in range(count):
+                frame = tk.PhotoImage(width=fw, height=fh)
+                frame.tk.call(frame, "copy", sheet, "-from", i * fw, 0, (i + 1) * fw, fh, "-to", 0, 0)
+                frames.append(frame)
+    _sprites[key] = frames
+    return frames
@@ -2,10 +2,7 @@
 # Best with: pip install pygame
 
 import os, random, threading, time
-try:
-    import pygame
-except Exception:
-    pygame = None  # we'll no-op if pygame isn't present
+pygame = None  # imported by init_bgm(); everything no-ops until then / if it isn't installed
 
 _SEARCH_DIRS = [".", "soundeffects", "audio", "assets", "assets/music", "bgm", "music"]
 _DEFAULT_NAMES = ["bgmusic.mp3", "bgmusic2.mp3", "bgmusic3.mp3",
@@ -29,9 +26,14 @@ def _resolve_candidates(names):
     return out
 
 def init_bgm():
-    """Initialize pygame mixer once."""
-    global _init_done
-    if _init_done or pygame is None:
+    """Import pygame and initialize the mixer once (kept off the import path: pygame is slow to load)."""
+    global _init_done, pygame
+    if _init_done:
+        return
+    try:
+        import pygame as _pg
+        pygame = _pg
+    except Exception:
         _init_done = True
         return
     try:
@@ -115,12 +115,15 @@ def set_theme(name: str):
 
     # Row backgrounds for list/tree views (gentle contrast from CARD)
     # blend slightly toward BG so rows are visible on both light and dark themes
-    COLORS.setdefault("ROW_ODD", _blend_hex(COLORS["CARD"], COLORS["BG"], 0.06))
-    COLORS.setdefault("ROW_EVEN", _blend_hex(COLORS["CARD"], COLORS["BG"], 0.12))
-
-    # Optional: hovers (keep if you already define them; these are safe fallbacks)
-    COLORS.setdefault("PRIMARY_HOVER", COLORS["PRIMARY"])
-    COLORS.setdefault("ACCENT_HOVER", COLORS["ACCENT"])
+    # (derived keys are recomputed unless the palette sets them, so a live
+    # theme switch doesn't keep the previous theme's values)
+    COLORS["ROW_ODD"] = pal.get("ROW_ODD") or _blend_hex(COLORS["CARD"], COLORS["BG"], 0.06)
+    COLORS["ROW_EVEN"] = pal.get("ROW_EVEN") or _blend_hex(COLORS["CARD"], COLORS["BG"], 0.12)
+
+    # Hovers/pressed shades (palette values win; otherwise derived like at import)
+    for key, base, factor in (("PRIMARY_HOVER", "PRIMARY", 0.92), ("PRIMARY_ACTIVE", "PRIMARY", 0.84),
+                              ("ACCENT_HOVER", "ACCENT", 0.92), ("ACCENT_ACTIVE", "ACCENT", 0.84)):
+        COLORS[key] = pal.get(key) or _shade(COLORS[base], factor)
 
 
 # ---------- Fonts ----------
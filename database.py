@@ -1,9 +1,13 @@
 # database.py — SQLite helpers (attributes, entries, meta, journal, daily double, contracts)
 import sqlite3
 import random
+import time
+import json
 from pathlib import Path
 from datetime import date, timedelta, datetime
 
+from events import emit
+
 DB_FILE = Path("habit_tracker.db")
 
 def get_connection():
@@ -107,13 +111,96 @@ def initialize_db():
     except sqlite3.OperationalError:
         pass  # already exists
 
+    # Shop: active effects (one row per state key), owned tokens, rotating slots
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS effects (
+          key   TEXT PRIMARY KEY,         -- 'active_date' or an active-effect key
+          value TEXT NOT NULL             -- JSON-encoded value
+        );
+    """)
+
+    # Append-only log of every effect mutation; `effects` above is a snapshot of it
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS effect_events (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          ts TEXT NOT NULL,               -- 'YYYY-MM-DD HH:MM:SS' localtime
+          op TEXT NOT NULL,               -- max/add/flag/set/consume/reset/expiry/day
+          key TEXT NOT NULL,
+          target TEXT,                    -- per-trait sub-key (xp_trait / sin_trait_reduce)
+          value TEXT,                     -- JSON-encoded
+          source TEXT                     -- e.g. 'token:Omni Booster', 'contract:shield'
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          item TEXT NOT NULL,
+          category TEXT,
+          bought_at TEXT NOT NULL         -- YYYY-MM-DD
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shop_slots (
+          idx INTEGER PRIMARY KEY,        -- visible slot position (0..2)
+          item TEXT,
+          expires_at TEXT                 -- ISO datetime (localtime)
+        );
+    """)
+
+    # Random challenges: the deadline is wall-clock time, so a running timer survives restarts
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS challenges (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          title TEXT NOT NULL,
+          trait TEXT NOT NULL,
+          minutes INTEGER NOT NULL,
+          reward_pts INTEGER NOT NULL,    -- Daily Double multiplier already applied
+          penalty_pts INTEGER NOT NULL,
+          daily_double INTEGER NOT NULL DEFAULT 0,
+          started_at TEXT NOT NULL,       -- ISO datetime (localtime)
+          deadline REAL NOT NULL,         -- unix time; remaining = deadline - now
+          status TEXT NOT NULL DEFAULT 'active',  -- 'active' | 'completed' | 'failed' | 'declined'
+          resolved_at TEXT
+        );
+    """)
+
+    # Currency: one balance row per currency + append-only history of every change
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS wallet (
+          currency TEXT PRIMARY KEY,                      -- 'coins' | 'shards'
+          balance INTEGER NOT NULL DEFAULT 0 CHECK (balance >= 0),
+          period TEXT NOT NULL DEFAULT '',                -- cap window: 'YYYY-MM-DD' (coins) / 'YYYY-Www' (shards)
+          period_earned INTEGER NOT NULL DEFAULT 0,       -- earned inside `period`, counted against the cap
+          last_delta INTEGER NOT NULL DEFAULT 0           -- delta applied by the latest update (read via RETURNING)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS currency_ledger (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          ts TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+          currency TEXT NOT NULL,
+          delta INTEGER NOT NULL,
+          reason TEXT,                    -- 'earn', 'spend', 'buy', 'level_up', ...
+          ref TEXT                        -- optional pointer (item name, contract id, ...)
+        );
+    """)
+
     # Helpful indexes
     cur.execute("CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_contracts_active ON contracts(active)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_inventory_item ON inventory(item)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ledger_currency_ts ON currency_ledger(currency, ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_challenges_status ON challenges(status, deadline)")
 
     conn.commit()
     conn.close()
 
+    import_shop_json_if_needed()
+    import_meta_wallet_if_needed()
+
 # -------- meta --------
 def get_meta(key: str):
     conn = get_connection()
@@ -171,6 +258,8 @@ def update_attribute_score(name: str, delta: int):
     cur.execute("UPDATE attributes SET score=? WHERE name=?", (new_score, name))
     conn.commit()
     conn.close()
+    if new_score != score:
+        emit("attributes", name=name, score=new_score)
 
 # -------- entries --------
 def insert_entry(date: str, entry_type: str, category: str, item: str, points: int):
@@ -179,8 +268,10 @@ def insert_entry(date: str, entry_type: str, category: str, item: str, points: i
     cur.execute("""
         INSERT INTO entries(date, entry_type, category, item, points) VALUES(?,?,?,?,?)
     """, (date, entry_type, category, item, int(points)))
+    entry_id = cur.lastrowid
     conn.commit()
     conn.close()
+    emit(f"entries:{date}", date=date, added=entry_id)
 
 def get_entries_by_date(date: str):
     conn = get_connection()
@@ -194,12 +285,28 @@ def get_entries_by_date(date: str):
     conn.close()
     return rows
 
+def get_entry(entry_id: int):
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, date, entry_type, category, item, points, ts
+        FROM entries WHERE id=?
+    """, (int(entry_id),))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
 def delete_entry(entry_id: int):
     conn = get_connection()
     cur = conn.cursor()
+    cur.execute("SELECT date FROM entries WHERE id=?", (int(entry_id),))
+    row = cur.fetchone()
     cur.execute("DELETE FROM entries WHERE id=?", (int(entry_id),))
     conn.commit()
     conn.close()
+    if row:
+        emit(f"entries:{row[0]}", date=row[0], removed=int(entry_id))
 
 # -------- journal --------
 def get_journal(date: str):
@@ -219,6 +326,7 @@ def upsert_journal(date: str, content: str):
     """, (date, content))
     conn.commit()
     conn.close()
+    emit(f"journal:{date}", date=date)
 
 # -------- daily double --------
 def get_daily_double(day_iso: str):
@@ -238,6 +346,7 @@ def set_daily_double(day_iso: str, atone_category: str, sin_category: str):
     )
     conn.commit()
     conn.close()
+    emit("dailydouble", day=day_iso)
 
 def get_active_contracts(day_iso: str):
     deactivate_expired_and_broken()
@@ -267,6 +376,7 @@ def create_contract(title: str, penalty_xp: int, start_iso: str, end_iso: str):
     """, (title, start_iso, end_iso, int(penalty_xp)))
     conn.commit()
     conn.close()
+    emit("contracts")
 
 def _insert_contract(title: str, penalty_xp: int, start_iso: str, end_iso: str = None, expires_at: str = None):
     """Internal helper for daily auto-generation (supports hour-limited contracts)."""
@@ -278,6 +388,7 @@ def _insert_contract(title: str, penalty_xp: int, start_iso: str, end_iso: str =
     """, (title, start_iso, end_iso or start_iso, int(penalty_xp), expires_at))
     conn.commit()
     conn.close()
+    emit("contracts")
 
 def mark_contract_broken(cid: int):
     conn = get_connection()
@@ -285,6 +396,7 @@ def mark_contract_broken(cid: int):
     cur.execute("UPDATE contracts SET broken=1 WHERE id=?", (cid,))
     conn.commit()
     conn.close()
+    emit("contracts", id=cid)
 
 def mark_contract_penalty_applied(cid: int):
     conn = get_connection()
@@ -292,6 +404,7 @@ def mark_contract_penalty_applied(cid: int):
     cur.execute("UPDATE contracts SET penalty_applied=1 WHERE id=?", (cid,))
     conn.commit()
     conn.close()
+    emit("contracts", id=cid)
     
 # --- add near the other "entries" helpers ---
 def get_logged_days_in_range(start_iso: str, end_iso: str) -> set[str]:
@@ -320,6 +433,20 @@ def get_logged_days_in_range(start_iso: str, end_iso: str) -> set[str]:
     return rows
 
 
+def get_year_activity(year: int) -> dict[str, tuple[int, int]]:
+    """One query for a whole year: {YYYY-MM-DD: (entry count, net points)} for days with entries."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT date, COUNT(*), COALESCE(SUM(points), 0) FROM entries
+        WHERE date BETWEEN ? AND ?
+        GROUP BY date
+    """, (f"{int(year):04d}-01-01", f"{int(year):04d}-12-31"))
+    out = {d: (int(n), int(net)) for d, n, net in cur.fetchall()}
+    conn.close()
+    return out
+
+
 def deactivate_expired_and_broken():
     """
     Marks contracts inactive when they shouldn't count anymore:
@@ -354,6 +481,8 @@ def deactivate_expired_and_broken():
     total += cur.rowcount
     conn.commit()
     conn.close()
+    if total:
+        emit("contracts")
     return total
 
 
@@ -479,6 +608,7 @@ def create_personal_contract_limited(title: str, days: int, penalty_xp: int = 20
         VALUES (?,?,?,?,1,0,0,1)
     """, (title, start_iso, end_iso, int(penalty_xp)))
     conn.commit(); conn.close()
+    emit("contracts")
 
 # ---- offers (available contracts) ----
 def _now_local_iso():
@@ -527,6 +657,7 @@ def claim_contract_offer(offer_id: int):
     """, (title, start.isoformat(), end.isoformat(), int(penalty_xp)))
     cur.execute("UPDATE contract_offers SET claimed=1 WHERE id=?", (offer_id,))
     conn.commit(); conn.close()
+    emit("contracts", claimed=offer_id)
 
 # ---- daily generator ----
 def generate_daily_contracts_if_needed():
@@ -567,6 +698,7 @@ def generate_daily_contracts_if_needed():
     """, new_offers)
     conn.commit(); conn.close()
     set_meta("offers_day", today)
+    emit("contracts")
     
     # -------- nonnegotiables (Logger) --------
 def add_nn_task(date_for: str, text: str):
@@ -597,3 +729,253 @@ def set_nn_result_applied(date_for: str, xp_delta: int):
     set_meta(f"nn_applied:{date_for}", str(int(xp_delta)))
 
 
+# -------- wallet --------
+# legacy meta keys per currency: (total, period counter, period stamp)
+_WALLET_META_KEYS = {
+    "coins": ("coins_total", "coins_today", "coins_last_day"),
+    "shards": ("shards_total", "shards_week", "shards_week_start"),
+}
+
+def import_meta_wallet_if_needed():
+    """
+    Create the wallet rows, seeding them once from the old meta counters.
+    Seeded balances are recorded in the ledger as 'opening_balance'.
+    """
+    conn = get_connection(); cur = conn.cursor()
+    with conn:
+        for currency, keys in _WALLET_META_KEYS.items():
+            cur.execute("SELECT 1 FROM wallet WHERE currency=?", (currency,))
+            if cur.fetchone():
+                continue
+            vals = []
+            for k in keys:
+                cur.execute("SELECT value FROM meta WHERE key=?", (k,))
+                row = cur.fetchone()
+                vals.append(row[0] if row else None)
+            try:
+                total, earned = max(0, int(vals[0] or 0)), max(0, int(vals[1] or 0))
+            except ValueError:
+                total, earned = 0, 0
+            cur.execute(
+                "INSERT INTO wallet(currency, balance, period, period_earned) VALUES (?,?,?,?)",
+                (currency, total, vals[2] or "", earned)
+            )
+            if total:
+                cur.execute(
+                    "INSERT INTO currency_ledger(currency, delta, reason) VALUES (?,?,'opening_balance')",
+                    (currency, total)
+                )
+    conn.close()
+
+# -------- shop (effects / inventory / slots) --------
+SHOP_STATE_JSON = Path("data/shop_state.json")
+SHOP_INVENTORY_JSON = Path("data/shop_inventory.json")
+SHOP_SLOTS_JSON = Path("data/shop_slots.json")
+
+def _read_json(path: Path, default):
+    try:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8") or "null") or default
+    except Exception:
+        pass
+    return default
+
+def import_shop_json_if_needed():
+    """
+    One-time import of the legacy shop JSON files into SQLite.
+    Guarded by meta 'shop_json_imported'; the JSON files are left in place.
+    """
+    if get_meta("shop_json_imported") == "1":
+        return
+
+    state = _read_json(SHOP_STATE_JSON, {})
+    if isinstance(state, dict) and "day" in state and "active_date" not in state:
+        state["active_date"] = state.pop("day")
+    items = _read_json(SHOP_INVENTORY_JSON, [])
+    slots = _read_json(SHOP_SLOTS_JSON, [])
+
+    conn = get_connection(); cur = conn.cursor()
+    with conn:
+        if isinstance(state, dict) and state:
+            cur.execute("DELETE FROM effects")
+            _write_effects_rows(cur, state)
+        if isinstance(items, list):
+            cur.executemany(
+                "INSERT INTO inventory(item, category, bought_at) VALUES (?,?,?)",
+                [(it.get("item"), it.get("category"), it.get("bought_at") or date.today().isoformat())
+                 for it in items if isinstance(it, dict) and it.get("item")]
+            )
+        if isinstance(slots, list):
+            for i, sl in enumerate(slots):
+                if isinstance(sl, dict) and sl.get("item"):
+                    cur.execute("INSERT OR REPLACE INTO shop_slots(idx, item, expires_at) VALUES (?,?,?)",
+                                (i, sl.get("item"), sl.get("expires_at")))
+        cur.execute(
+            "INSERT INTO meta(key,value) VALUES('shop_json_imported','1') "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value"
+        )
+    conn.close()
+
+# reserved effects-table keys that are not entries of state['active']
+_EFFECTS_META_KEYS = ("active_date", "expires")
+
+def _write_effects_rows(cur, state: dict):
+    rows = [(k, json.dumps(state[k])) for k in _EFFECTS_META_KEYS if k in state]
+    rows += [(k, json.dumps(v)) for k, v in (state.get("active") or {}).items()]
+    cur.executemany("INSERT OR REPLACE INTO effects(key, value) VALUES (?,?)", rows)
+
+def get_effects_state():
+    """Return {'active_date': str, 'active': {...}[, 'expires': {...}]} or None if nothing stored yet."""
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("SELECT key, value FROM effects")
+    rows = cur.fetchall()
+    conn.close()
+    if not rows:
+        return None
+    out = {"active_date": None, "active": {}}
+    for k, v in rows:
+        try:
+            val = json.loads(v)
+        except Exception:
+            continue
+        if k in _EFFECTS_META_KEYS:
+            out[k] = val
+        else:
+            out["active"][k] = val
+    return out
+
+def _write_effects_snapshot(cur, state: dict):
+    cur.execute("DELETE FROM effects")
+    _write_effects_rows(cur, state)
+    # the snapshot covers every event logged so far
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM effect_events")
+    cur.execute(
+        "INSERT INTO meta(key,value) VALUES('effects_snapshot_event_id',?) "
+        "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (str(cur.fetchone()[0]),)
+    )
+
+def save_effects_state(state: dict):
+    """Replace the stored effects snapshot in one transaction."""
+    conn = get_connection(); cur = conn.cursor()
+    with conn:
+        _write_effects_snapshot(cur, state)
+    conn.close()
+
+def append_effect_events(events, snapshot: dict | None = None):
+    """
+    Append (ts, op, key, target, value, source) tuples to the effect log and,
+    if `snapshot` is given, rewrite the effects snapshot in the same transaction.
+    """
+    conn = get_connection(); cur = conn.cursor()
+    with conn:
+        cur.executemany(
+            "INSERT INTO effect_events(ts, op, key, target, value, source) VALUES (?,?,?,?,?,?)",
+            [(ts, op, key, target, json.dumps(value), source) for ts, op, key, target, value, source in events]
+        )
+        if snapshot is not None:
+            _write_effects_snapshot(cur, snapshot)
+    conn.close()
+
+def get_effect_events(since_snapshot: bool = False, source: str | None = None, limit: int | None = None):
+    """
+    Effect log rows (oldest first) as dicts with a decoded 'value'.
+    since_snapshot=True returns only events newer than the stored snapshot (for replay);
+    `source` filters by prefix ('token:', 'contract:') for auditing.
+    """
+    after = int(get_meta("effects_snapshot_event_id") or 0) if since_snapshot else 0
+    q = "SELECT id, ts, op, key, target, value, source FROM effect_events WHERE id > ?"
+    args = [after]
+    if source:
+        q += " AND source LIKE ?"; args.append(source + "%")
+    q += " ORDER BY id ASC"
+    if limit:
+        q += " LIMIT ?"; args.append(int(limit))
+    conn = get_connection(); conn.row_factory = sqlite3.Row; cur = conn.cursor()
+    cur.execute(q, args)
+    rows = []
+    for r in cur.fetchall():
+        d = dict(r)
+        try:
+            d["value"] = json.loads(d["value"]) if d["value"] is not None else None
+        except Exception:
+            pass
+        rows.append(d)
+    conn.close(); return rows
+
+def get_inventory():
+    conn = get_connection(); conn.row_factory = sqlite3.Row; cur = conn.cursor()
+    cur.execute("SELECT id, item, category, bought_at FROM inventory ORDER BY id ASC")
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close(); return rows
+
+def remove_inventory_item(inv_id: int) -> bool:
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("DELETE FROM inventory WHERE id=?", (int(inv_id),))
+    ok = cur.rowcount > 0
+    conn.commit(); conn.close(); return ok
+
+def add_inventory_item(cur, item: str, category: str | None):
+    """Insert an owned token using the caller's cursor (part of a larger transaction)."""
+    cur.execute("INSERT INTO inventory(item, category, bought_at) VALUES (?,?,?)",
+                (item, category, date.today().isoformat()))
+    return cur.lastrowid
+
+def get_shop_slots():
+    """Return {idx: {'item': str, 'expires_at': str|None}}."""
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("SELECT idx, item, expires_at FROM shop_slots ORDER BY idx ASC")
+    out = {int(i): {"item": it, "expires_at": exp} for i, it, exp in cur.fetchall()}
+    conn.close(); return out
+
+def save_shop_slot(idx: int, item: str | None, expires_at: str | None):
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("INSERT OR REPLACE INTO shop_slots(idx, item, expires_at) VALUES (?,?,?)",
+                (int(idx), item, expires_at))
+    conn.commit(); conn.close()
+
+# -------- random challenges --------
+def start_challenge(title: str, trait: str, minutes: int, reward_pts: int, penalty_pts: int,
+                    daily_double: bool = False) -> dict:
+    """Persist an accepted challenge; its deadline is now + minutes (wall clock)."""
+    deadline = time.time() + int(minutes) * 60
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO challenges(title, trait, minutes, reward_pts, penalty_pts, daily_double, started_at, deadline)
+        VALUES (?,?,?,?,?,?,?,?)
+    """, (title, trait, int(minutes), int(reward_pts), int(penalty_pts), int(bool(daily_double)),
+          _now_local_iso(), deadline))
+    cid = cur.lastrowid
+    conn.commit(); conn.close()
+    return get_challenge(cid)
+
+def get_challenge(cid: int) -> dict | None:
+    conn = get_connection(); conn.row_factory = sqlite3.Row; cur = conn.cursor()
+    cur.execute("SELECT * FROM challenges WHERE id=?", (int(cid),))
+    row = cur.fetchone()
+    conn.close(); return dict(row) if row else None
+
+def get_active_challenges() -> list[dict]:
+    """Unresolved challenges, soonest deadline first (expired ones included)."""
+    conn = get_connection(); conn.row_factory = sqlite3.Row; cur = conn.cursor()
+    cur.execute("SELECT * FROM challenges WHERE status='active' ORDER BY deadline ASC")
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close(); return rows
+
+def extend_challenge(cid: int, seconds: float) -> float | None:
+    """Push an active challenge's deadline back; returns the new deadline."""
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("UPDATE challenges SET deadline = deadline + ? WHERE id=? AND status='active'",
+                (float(seconds), int(cid)))
+    cur.execute("SELECT deadline FROM challenges WHERE id=? AND status='active'", (int(cid),))
+    row = cur.fetchone()
+    conn.commit(); conn.close()
+    return row[0] if row else None
+
+def resolve_challenge(cid: int, status: str) -> bool:
+    """Close an active challenge; False if it was already resolved (so rewards/penalties apply once)."""
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute("UPDATE challenges SET status=?, resolved_at=? WHERE id=? AND status='active'",
+                (status, _now_local_iso(), int(cid)))
+    ok = cur.rowcount > 0
+    conn.commit(); conn.close(); return ok
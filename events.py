@@ -0,0 +1,47 @@
+# events.py — tiny in-process change notifications (data layer -> UI)
+#
+# Writers call emit("entries:2025-08-20", ...) / emit("xp") / emit("wallet") ...
+# Subscribers register for a full topic or its family (the part before ':'),
+# so subscribe("entries", fn) hears every "entries:<date>" event.
+#
+# Topics in use:
+#   entries:<date>   an entry was added/removed on that day
+#   attributes       a trait score changed
+#   xp               total XP changed
+#   wallet           a coin/shard balance changed
+#   contracts        contracts/offers changed
+#   effects          shop effects state changed
+#   dailydouble      the daily double for a day was (re)rolled
+#   journal:<date>   journal text saved for that day
+#
+# Subscribers run synchronously on the emitting thread. Everything above is
+# emitted from the Tk thread except journal:<date>, which the journal write
+# queue emits from its worker thread: don't touch Tk from a journal subscriber.
+from typing import Callable, Dict, List
+
+_subscribers: Dict[str, List[Callable]] = {}
+
+
+def subscribe(topic: str, fn: Callable) -> Callable[[], None]:
+    """Call fn(topic, **payload) on every matching emit; returns an unsubscribe function."""
+    _subscribers.setdefault(topic, []).append(fn)
+
+    def _unsubscribe():
+        try:
+            _subscribers.get(topic, []).remove(fn)
+        except ValueError:
+            pass
+    return _unsubscribe
+
+
+def emit(topic: str, **payload) -> None:
+    family = topic.split(":", 1)[0]
+    targets = list(_subscribers.get(topic, ()))
+    if family != topic:
+        targets += _subscribers.get(family, ())
+    for fn in targets:
+        try:
+            fn(topic, **payload)
+        except Exception as e:
+            # a broken subscriber must never break the write that emitted
+            print(f"[events] subscriber for {topic} failed: {e}")
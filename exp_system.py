@@ -2,6 +2,7 @@
 from typing import Dict
 from constants import RANKS, STAT_MIN
 from database import get_meta, set_meta
+from events import emit
 
 # XP curve: +50 per level step, starting at 100
 def xp_to_next(level: int) -> int:
@@ -33,7 +34,9 @@ def get_total_xp() -> int:
         return 0
 
 def set_total_xp(xp: int):
-    set_meta("xp", str(max(0, int(xp))))
+    xp = max(0, int(xp))
+    set_meta("xp", str(xp))
+    emit("xp", total=xp)
 
 def add_total_xp(delta: int) -> int:
     new = max(0, get_total_xp() + int(delta))
@@ -1,9 +1,13 @@
+import startup  # first: starts the startup timeline clock
 from database import initialize_db
 import tkinter as tk
 from ui.app import HabitTrackerApp
 
 if __name__ == "__main__":
+    startup.mark("imports")
     initialize_db()
+    startup.mark("database")
     root = tk.Tk()
+    startup.mark("tk root")
     HabitTrackerApp(root)
     root.mainloop()
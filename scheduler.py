@@ -0,0 +1,212 @@
+# scheduler.py — one shared timer for every periodic UI callback
+#
+# Instead of each widget re-arming its own endless `after` loop, periodic
+# work registers here:
+#
+#     scheduler.every("topbar.coin_bob", 140, step, widget=label)
+#
+# All tasks live in one min-heap keyed by their next due time and a single
+# `after` is armed for the earliest one (tasks due within SLACK_MS of each
+# other run in the same wakeup). While the root window is iconified or no
+# window of the app has focus the timer is not armed at all; overdue tasks
+# run once when the window comes back. A task is dropped when its widget is
+# destroyed, when its callback returns False, or when it raises. once() is the
+# one-shot variant for deadline-driven work that re-arms itself.
+import heapq
+import itertools
+import time
+import tkinter as tk
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+SLACK_MS = 10
+
+
+def _now_ms() -> float:
+    return time.monotonic() * 1000.0
+
+
+@dataclass
+class Task:
+    name: str
+    interval_ms: int
+    fn: Callable[[], Optional[bool]]
+    widget: Optional[tk.Misc] = None
+    due: float = 0.0
+    runs: int = 0
+    seq: int = field(default=0, repr=False)
+    cancelled: bool = False
+    once: bool = False
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._root: Optional[tk.Misc] = None
+        self._tasks: Dict[str, Task] = {}
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._after_id = None
+        self._armed_for: Optional[float] = None
+        self._iconified = False
+        self._unfocused = False
+
+    # ---- setup ----
+    def attach(self, root: tk.Misc) -> None:
+        """Bind to the app's root window (done automatically by the first every())."""
+        if self._root is root:
+            return
+        self._root = root
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<FocusIn>", self._on_focus_change, add="+")
+        root.bind("<FocusOut>", self._on_focus_change, add="+")
+        self._arm()
+
+    # ---- registry ----
+    def every(self, name: str, interval_ms: int, fn: Callable[[], Optional[bool]], *,
+              widget: Optional[tk.Misc] = None, run_now: bool = False) -> Task:
+        """Run fn every interval_ms; re-registering a name replaces the old task."""
+        self.cancel(name)
+        if self._root is None:
+            root = widget._root() if widget is not None else tk._get_default_root()
+            self.attach(root)
+        task = Task(name, max(1, int(interval_ms)), fn, widget)
+        task.due = _now_ms() + (0 if run_now else task.interval_ms)
+        self._tasks[name] = task
+        self._push(task)
+        self._arm()
+        return task
+
+    def once(self, name: str, delay_ms: float, fn: Callable[[], None], *,
+             widget: Optional[tk.Misc] = None) -> Task:
+        """Run fn once after delay_ms; re-registering a name reschedules it."""
+        task = self.every(name, max(1, int(delay_ms)), fn, widget=widget)
+        task.once = True
+        return task
+
+    def cancel(self, name: str) -> None:
+        task = self._tasks.pop(name, None)
+        if task is not None:
+            task.cancelled = True
+
+    def _drop(self, task: Task) -> None:
+        # only if `task` still owns its name (the callback may have re-registered it)
+        task.cancelled = True
+        if self._tasks.get(task.name) is task:
+            del self._tasks[task.name]
+
+    def tasks(self) -> List[dict]:
+        """Snapshot of registered tasks (for inspection/debugging)."""
+        now = _now_ms()
+        return [
+            {"name": t.name, "interval_ms": t.interval_ms, "due_in_ms": int(t.due - now),
+             "runs": t.runs, "widget": str(t.widget) if t.widget is not None else None}
+            for t in sorted(self._tasks.values(), key=lambda t: t.due)
+        ]
+
+    @property
+    def paused(self) -> bool:
+        return self._iconified or self._unfocused
+
+    # ---- timer ----
+    def _push(self, task: Task) -> None:
+        task.seq = next(self._counter)
+        heapq.heappush(self._heap, (task.due, task.seq, task))
+
+    def _arm(self) -> None:
+        # drop stale heap heads so we never wake up for a cancelled task
+        while self._heap and (self._heap[0][2].cancelled or self._heap[0][2].seq != self._heap[0][1]):
+            heapq.heappop(self._heap)
+        if self._root is None or self.paused or not self._heap:
+            self._disarm()
+            return
+        due = self._heap[0][0]
+        if self._after_id is not None and self._armed_for is not None and self._armed_for <= due:
+            return  # already armed early enough
+        self._disarm()
+        delay = max(1, int(due - _now_ms()))
+        try:
+            self._after_id = self._root.after(delay, self._tick)
+            self._armed_for = due
+        except tk.TclError:
+            self._after_id = None  # root destroyed
+
+    def _disarm(self) -> None:
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._armed_for = None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        self._armed_for = None
+        if self.paused:
+            return
+        now = _now_ms()
+        while self._heap and self._heap[0][0] <= now + SLACK_MS:
+            due, seq, task = heapq.heappop(self._heap)
+            if task.cancelled or task.seq != seq:
+                continue
+            if not self._alive(task):
+                self._drop(task)
+                continue
+            try:
+                keep = task.fn() is not False
+            except Exception as e:
+                print(f"[scheduler] {task.name} failed: {e}")
+                keep = False
+            task.runs += 1
+            if keep and not task.once and not task.cancelled:
+                # stay on the original cadence, but never try to "catch up" missed runs
+                task.due = max(due + task.interval_ms, now + 1)
+                self._push(task)
+            else:
+                self._drop(task)
+        self._arm()
+
+    @staticmethod
+    def _alive(task: Task) -> bool:
+        if task.widget is None:
+            return True
+        try:
+            return bool(task.widget.winfo_exists())
+        except tk.TclError:
+            return False
+
+    # ---- visibility ----
+    def _on_unmap(self, event) -> None:
+        if event.widget is self._root:
+            self._iconified = True
+            self._disarm()
+
+    def _on_map(self, event) -> None:
+        if event.widget is self._root:
+            self._iconified = False
+            self._arm()
+
+    def _on_focus_change(self, _event=None) -> None:
+        # FocusOut fires before the next widget gets focus; decide once Tk settles
+        try:
+            self._root.after_idle(self._check_focus)
+        except tk.TclError:
+            pass
+
+    def _check_focus(self) -> None:
+        try:
+            focused = self._root.focus_get() is not None
+        except (KeyError, tk.TclError):
+            # focus_get can fail while a native dialog (messagebox) owns focus
+            focused = True
+        was = self.paused
+        self._unfocused = not focused
+        if self.paused and not was:
+            self._disarm()
+        elif was and not self.paused:
+            self._arm()
+
+
+# shared instance
+scheduler = Scheduler()
@@ -0,0 +1,150 @@
+"""Token catalog: the one parsed copy of data/shop_tokens.csv.
+
+Rows are validated once into `Token` records (slotted: there are only a
+few dozen, but every shop path touches them) and indexed by item name,
+category (see `category_key`, the one category normalization shop code
+keys on) and currency. The file's mtime is checked at most once per
+RELOAD_CHECK_S, and an edited CSV is re-read in place. Holders of old
+Token objects keep working; new lookups see the new rows.
+
+    from shop.catalog import catalog
+    tok = catalog.get("Omni Booster")
+    tok.cost, tok.currency, tok.spec.magnitude
+"""
+from __future__ import annotations
+
+import csv
+import os
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+from shop.registry import EffectSpec, compile_spec
+
+TOKENS_CSV = Path(__file__).resolve().parents[1] / "data" / "shop_tokens.csv"
+RELOAD_CHECK_S = 1.0
+
+
+def category_key(category: str | None) -> str:
+    """Normalized category name; the one key shop code groups/looks up categories by."""
+    return (category or "").strip().lower()
+
+
+def _currency(raw: str | None) -> str:
+    c = (raw or "").strip().lower() or "coins"
+    if "shard" in c:
+        return "shards"
+    if "coin" in c:
+        return "coins"
+    return c  # unknown currencies are kept so the buy path can refuse them by name
+
+
+class Token:
+    __slots__ = ("item", "category", "category_key", "effect", "duration", "cost",
+                 "currency", "notes", "spec")
+
+    def __init__(self, row: dict, spec: EffectSpec | None):
+        self.item = (row.get("item") or "").strip()
+        self.category = (row.get("category") or "").strip()
+        self.category_key = category_key(self.category)
+        self.effect = (row.get("effect") or "").strip()
+        self.duration = (row.get("duration") or "").strip()
+        try:
+            self.cost = int(row.get("cost_amount") or 0)
+        except ValueError:
+            raise ValueError(f"{self.item}: bad cost_amount {row.get('cost_amount')!r}")
+        self.currency = _currency(row.get("cost_currency"))
+        self.notes = (row.get("notes") or "").strip()
+        self.spec = spec
+
+    def __repr__(self) -> str:
+        return f"Token({self.item!r}, {self.cost} {self.currency})"
+
+
+class Catalog:
+    def __init__(self, path: Path = TOKENS_CSV) -> None:
+        self.path = path
+        self.version = 0               # bumped on every (re)load
+        self._mtime: float | None = None
+        self._checked = 0.0
+        self._tokens: Tuple[Token, ...] = ()
+        self._by_item: Dict[str, Token] = {}
+        self._by_category: Dict[str, Tuple[Token, ...]] = {}
+        self._by_currency: Dict[str, Tuple[Token, ...]] = {}
+
+    # ---- loading ----
+    def _fresh(self) -> "Catalog":
+        now = time.monotonic()
+        if self._mtime is None or now - self._checked >= RELOAD_CHECK_S:
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = 0
+            if mtime != self._mtime:
+                self._load()
+                self._mtime = mtime
+        return self
+
+    def _load(self) -> None:
+        tokens = []
+        by_item: Dict[str, Token] = {}
+        try:
+            with self.path.open(newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if not any((v or "").strip() for v in row.values() if isinstance(v, str)):
+                        continue
+                    if not (row.get("item") or "").strip():
+                        print(f"[catalog] skipped row without item: {row!r}")
+                        continue
+                    try:
+                        spec = compile_spec(row)
+                    except ValueError as e:
+                        print(f"[catalog] {e}")
+                        spec = None   # still sellable/showable, just has no effect
+                    try:
+                        tok = Token(row, spec)
+                    except ValueError as e:
+                        print(f"[catalog] skipped token: {e}")
+                        continue
+                    # item names are the key everywhere (inventory rows, shop
+                    # slots, the effect registry): the first row with a name wins
+                    if tok.item in by_item:
+                        print(f"[catalog] skipped duplicate item {tok.item!r} "
+                              f"({by_item[tok.item].category} / {tok.category})")
+                        continue
+                    by_item[tok.item] = tok
+                    tokens.append(tok)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[catalog] could not read {self.path}: {e}")
+            return  # keep the previous copy
+
+        by_category: Dict[str, list] = {}
+        by_currency: Dict[str, list] = {}
+        for tok in tokens:
+            by_category.setdefault(tok.category_key, []).append(tok)
+            by_currency.setdefault(tok.currency, []).append(tok)
+        self._tokens = tuple(tokens)
+        self._by_item = by_item
+        self._by_category = {k: tuple(v) for k, v in by_category.items()}
+        self._by_currency = {k: tuple(v) for k, v in by_currency.items()}
+        self.version += 1
+        print(f"[catalog] loaded {len(tokens)} tokens (v{self.version})")
+
+    # ---- lookups ----
+    def tokens(self) -> Tuple[Token, ...]:
+        return self._fresh()._tokens
+
+    def get(self, item: str | None) -> Token | None:
+        return self._fresh()._by_item.get((item or "").strip())
+
+    def by_category(self, category: str) -> Tuple[Token, ...]:
+        return self._fresh()._by_category.get(category_key(category), ())
+
+    def by_currency(self, currency: str) -> Tuple[Token, ...]:
+        return self._fresh()._by_currency.get(_currency(currency), ())
+
+
+catalog = Catalog()
@@ -1,10 +1,19 @@
-"""Simple currency manager using get_meta/set_meta for persistence.
-Stores daily/week counters to enforce caps.
+"""Currency manager backed by the SQLite `wallet` table.
+
+Every earn/spend is ONE conditional UPDATE on the currency's wallet row that
+rolls the cap window over, clamps to the daily/weekly cap and refuses to go
+negative; the applied delta is appended to `currency_ledger` in the same
+transaction, so balances can't lose updates and history is queryable.
+
+Reads are served by the in-memory `wallet` singleton: balances and the
+current day / ISO-week stamps are cached and rolled over by comparing
+dates in-process, so the getters never touch the DB after the first load.
 """
-from datetime import date, datetime, timedelta
-from typing import Tuple
+from datetime import date
+from typing import List, Dict
 
-from database import get_meta, set_meta
+from database import get_connection, add_inventory_item, import_meta_wallet_if_needed
+from events import emit
 
 COIN_DAILY_CAP = 150
 SHARD_WEEKLY_CAP = 5
@@ -17,119 +26,249 @@ def _week_start(d: date) -> str:
     y, w, _ = d.isocalendar()
     return f"{y}-W{w:02d}"
 
+def _period(currency: str, d: date = None) -> str:
+    d = d or date.today()
+    return _iso_day(d) if currency == "coins" else _week_start(d)
+
+# amount earned inside the current cap window (a stale window counts as 0)
+_EARNED = "(CASE WHEN period = :period THEN period_earned ELSE 0 END)"
+# earns are clamped to what is left under the cap; spends pass through
+_APPLIED = f"(CASE WHEN :amount >= 0 THEN MIN(:amount, MAX(0, :cap - {_EARNED})) ELSE :amount END)"
+_APPLY_SQL = f"""
+    UPDATE wallet SET
+      last_delta    = {_APPLIED},
+      balance       = balance + {_APPLIED},
+      period_earned = MAX(0, {_EARNED} + {_APPLIED}),
+      period        = :period
+    WHERE currency = :currency AND balance + :amount >= 0
+    RETURNING last_delta, balance, period, period_earned
+"""
+
+def _apply(cur, currency: str, amount: int, cap: int, reason: str, ref: str = None, staged: Dict = None) -> int:
+    """Apply one earn/spend with the caller's cursor; returns the delta actually applied.
+    The RETURNed row is put in `staged` so the cache can adopt it once the transaction commits.
+    """
+    cur.execute(_APPLY_SQL, {"currency": currency, "amount": int(amount), "cap": int(cap), "period": wallet.period(currency)})
+    row = cur.fetchone()
+    if not row:
+        return 0
+    delta = int(row[0])
+    if delta:
+        cur.execute(
+            "INSERT INTO currency_ledger(currency, delta, reason, ref) VALUES (?,?,?,?)",
+            (currency, delta, reason, ref)
+        )
+    if staged is not None:
+        staged[currency] = (int(row[1]), row[2], int(row[3]))
+    return delta
+
+
+class Wallet:
+    """Cached view of the wallet table.
+
+    Balances are loaded once; afterwards reads only compare the cached
+    day/week stamps against today (rolling the period counters to 0 in
+    memory when they change). Writes go through the atomic UPDATE and the
+    cache takes the values the statement RETURNs.
+    """
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, list] | None = None   # currency -> [balance, period, period_earned]
+        self._day: date | None = None
+        self._stamps: Dict[str, str] = {}
+
+    def period(self, currency: str) -> str:
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._stamps = {"coins": _iso_day(today), "shards": _week_start(today)}
+        return self._stamps.get(currency) or _period(currency, today)
+
+    def _load(self) -> Dict[str, list]:
+        if self._rows is None:
+            rows: Dict[str, list] = {}
+            try:
+                conn = get_connection(); cur = conn.cursor()
+                cur.execute("SELECT currency, balance, period, period_earned FROM wallet")
+                rows = {c: [int(b), p, int(e)] for c, b, p, e in cur.fetchall()}
+                conn.close()
+            except Exception as e:
+                print(f"[currency] wallet load failed: {e}")
+            self._rows = rows
+        return self._rows
+
+    def balance(self, currency: str) -> int:
+        row = self._load().get(currency)
+        return row[0] if row else 0
+
+    def earned(self, currency: str) -> int:
+        """Amount earned in the current cap window (0 once the day/week has rolled over)."""
+        row = self._load().get(currency)
+        if not row:
+            return 0
+        if row[1] != self.period(currency):
+            row[1], row[2] = self.period(currency), 0   # in-process rollover; persisted lazily by the next UPDATE
+        return row[2]
+
+    def _commit(self, staged: Dict) -> None:
+        """Adopt the rows RETURNed inside a committed transaction."""
+        rows = self._load()
+        for currency, vals in staged.items():
+            rows[currency] = list(vals)
+
+    def invalidate(self) -> None:
+        self._rows = None
+
+    def transact(self, legs, inventory_add=(), reason: str = None, ref: str = None) -> Dict[str, int] | None:
+        """Apply several currency legs (and inventory grants) atomically.
+
+        legs           iterable of (currency, amount); negative = spend, positive = grant
+        inventory_add  iterable of (item, category) rows to insert in the same transaction
+
+        All legs are validated before anything is written (known currency,
+        enough balance for the combined spends per currency); the writes then
+        share one DB transaction and roll back together if any spend is
+        refused. Grants are multiplied/clamped like add_coins/add_shards.
+        Returns {currency: applied delta} or None if the transaction was refused.
+        """
+        legs = [(str(c).strip().lower(), int(a)) for c, a in legs]
+        spend: Dict[str, int] = {}
+        for currency, amount in legs:
+            if currency not in CURRENCIES:
+                raise ValueError(f"unknown currency {currency!r}")
+            if amount < 0:
+                spend[currency] = spend.get(currency, 0) - amount
+        for currency, total in spend.items():
+            if total > self.balance(currency):
+                return None
+
+        # spends first so a grant in the same batch can't fund them
+        ordered = sorted(legs, key=lambda leg: leg[1] >= 0)
+        applied = {c: 0 for c, _ in legs}
+        staged: Dict = {}
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            with conn:
+                for currency, amount in ordered:
+                    cap, amount = _leg_cap(currency, amount)
+                    label = reason or ("earn" if amount >= 0 else "spend")
+                    delta = _apply(cur, currency, amount, cap, label, ref, staged)
+                    if amount < 0 and delta == 0:
+                        raise _Refused(currency)
+                    applied[currency] += delta
+                for item, category in inventory_add:
+                    add_inventory_item(cur, item, category)
+        except _Refused:
+            # balance moved since validation (cache was stale): nothing was written
+            self.invalidate()
+            return None
+        finally:
+            conn.close()
+        self._commit(staged)
+        if any(applied.values()):
+            emit("wallet", **applied)
+        return applied
+
+
+class _Refused(Exception):
+    """Raised inside a transaction to roll every leg back."""
+
+
+CURRENCIES = ("coins", "shards")
+
+wallet = Wallet()
+
+
 def init():
-    # Ensure keys exist
-    if get_meta("coins_total") is None:
-        set_meta("coins_total", "0")
-    if get_meta("coins_today") is None:
-        set_meta("coins_today", "0")
-    if get_meta("coins_last_day") is None:
-        set_meta("coins_last_day", _iso_day(date.today()))
-    if get_meta("shards_total") is None:
-        set_meta("shards_total", "0")
-    if get_meta("shards_week") is None:
-        set_meta("shards_week", "0")
-    if get_meta("shards_week_start") is None:
-        set_meta("shards_week_start", _week_start(date.today()))
-
-def reset_daily_if_needed():
-    today = date.today()
-    last = get_meta("coins_last_day") or ""
-    if last != _iso_day(today):
-        set_meta("coins_today", "0")
-        set_meta("coins_last_day", _iso_day(today))
-
-    # weekly shards reset
-    cur_week = _week_start(today)
-    week_start = get_meta("shards_week_start") or ""
-    if week_start != cur_week:
-        set_meta("shards_week", "0")
-        set_meta("shards_week_start", cur_week)
+    # Ensure wallet rows exist (seeded once from the legacy meta counters)
+    import_meta_wallet_if_needed()
+    wallet.invalidate()
 
 # -- getters --
 def get_coins() -> int:
-    reset_daily_if_needed()
-    return int(get_meta("coins_total") or 0)
+    return wallet.balance("coins")
 
 def get_coins_today() -> int:
-    reset_daily_if_needed()
-    return int(get_meta("coins_today") or 0)
+    return wallet.earned("coins")
 
 def get_shards() -> int:
-    reset_daily_if_needed()
-    return int(get_meta("shards_total") or 0)
+    return wallet.balance("shards")
 
 def get_shards_week() -> int:
-    reset_daily_if_needed()
-    return int(get_meta("shards_week") or 0)
+    return wallet.earned("shards")
 
 # -- modifiers --
-def add_coins(amount: int) -> int:
+def _coin_cap_and_amount(amount: int):
+    # consult effects for coin multiplier (earns only)
+    try:
+        from shop.effects import effects
+        mult_pct = float(effects.coin_multiplier_pct() or 0.0)
+    except Exception:
+        mult_pct = 0.0
+    return COIN_DAILY_CAP, (int(round(amount * (1.0 + mult_pct))) if mult_pct else amount)
+
+def _shard_cap() -> int:
+    # allow effects to increase weekly shard cap
+    try:
+        from shop.effects import effects
+        bonus = int(effects.shard_weekly_bonus() or 0)
+    except Exception:
+        bonus = 0
+    return SHARD_WEEKLY_CAP + bonus
+
+def _leg_cap(currency: str, amount: int):
+    """(cap, effective amount) for one leg; spends are never capped."""
+    if amount < 0:
+        return 0, amount
+    if currency == "coins":
+        return _coin_cap_and_amount(amount)
+    return _shard_cap(), amount
+
+def add_coins(amount: int, reason: str = None, ref: str = None) -> int:
     """Add coins, respecting daily cap. Returns actual delta applied (may be 0).
-    amount may be negative to spend.
+    amount may be negative to spend (refused, returning 0, if the balance is too low).
     """
-    reset_daily_if_needed()
-    total = int(get_meta("coins_total") or 0)
-    today = int(get_meta("coins_today") or 0)
+    res = wallet.transact([("coins", amount)], reason=reason, ref=ref)
+    return res["coins"] if res else 0
 
-    if amount >= 0:
-        # consult effects for coin multiplier
-        try:
-            from shop.effects import effects
-            mult_pct = float(effects.coin_multiplier_pct() or 0.0)
-        except Exception:
-            mult_pct = 0.0
-        # multiply the incoming amount by (1 + pct)
-        raw_amount = int(round(amount * (1.0 + mult_pct))) if mult_pct else amount
-        allowed = max(0, COIN_DAILY_CAP - today)
-        apply_amt = min(allowed, raw_amount)
-        total += apply_amt
-        today += apply_amt
-    else:
-        # spending: allow if enough total
-        spend = -amount
-        if spend > total:
-            return 0
-        total -= spend
-        # reduce today's count proportionally if possible
-        today = max(0, today - spend)
-        apply_amt = -spend
-
-    set_meta("coins_total", str(total))
-    set_meta("coins_today", str(today))
-    return apply_amt
-
-def add_shards(amount: int) -> int:
-    reset_daily_if_needed()
-    total = int(get_meta("shards_total") or 0)
-    week = int(get_meta("shards_week") or 0)
-
-    if amount >= 0:
-        # allow effects to increase weekly shard cap
-        try:
-            from shop.effects import effects
-            bonus = int(effects.shard_weekly_bonus() or 0)
-        except Exception:
-            bonus = 0
-        allowed = max(0, (SHARD_WEEKLY_CAP + bonus) - week)
-        apply_amt = min(allowed, amount)
-        total += apply_amt
-        week += apply_amt
-    else:
-        spend = -amount
-        if spend > total:
-            return 0
-        total -= spend
-        week = max(0, week - spend)
-        apply_amt = -spend
+def add_shards(amount: int, reason: str = None, ref: str = None) -> int:
+    res = wallet.transact([("shards", amount)], reason=reason, ref=ref)
+    return res["shards"] if res else 0
 
-    set_meta("shards_total", str(total))
-    set_meta("shards_week", str(week))
-    return apply_amt
+# -- history --
+def get_ledger(currency: str = None, since: str = None, limit: int = 100) -> List[Dict]:
+    """Most recent ledger rows first; `since` is a 'YYYY-MM-DD[ HH:MM:SS]' lower bound."""
+    q = "SELECT id, ts, currency, delta, reason, ref FROM currency_ledger WHERE 1=1"
+    args = []
+    if currency:
+        q += " AND currency=?"; args.append(currency)
+    if since:
+        q += " AND ts >= ?"; args.append(since)
+    q += " ORDER BY id DESC LIMIT ?"; args.append(int(limit))
+    conn = get_connection(); cur = conn.cursor()
+    cur.execute(q, args)
+    cols = [c[0] for c in cur.description]
+    rows = [dict(zip(cols, r)) for r in cur.fetchall()]
+    conn.close(); return rows
 
 # helper to set absolute values (for debugging/tests)
+def _set_total(currency: str, n: int):
+    n = max(0, int(n))
+    conn = get_connection(); cur = conn.cursor()
+    with conn:
+        cur.execute("SELECT balance FROM wallet WHERE currency=?", (currency,))
+        row = cur.fetchone()
+        delta = n - int(row[0] if row else 0)
+        cur.execute("UPDATE wallet SET balance=?, last_delta=? WHERE currency=?", (n, delta, currency))
+        if delta:
+            cur.execute("INSERT INTO currency_ledger(currency, delta, reason) VALUES (?,?,'adjust')", (currency, delta))
+    conn.close()
+    wallet.invalidate()
+    emit("wallet")
+
 def set_coins_total(n: int):
-    set_meta("coins_total", str(n))
+    _set_total("coins", n)
 
 def set_shards_total(n: int):
-    set_meta("shards_total", str(n))
+    _set_total("shards", n)
@@ -1,342 +1,367 @@
 from __future__ import annotations
-from pathlib import Path
-from datetime import date
-import json
-from typing import Dict, Any, List
-from constants import POSITIVE_TRAITS
+from datetime import date, datetime, time as dtime, timedelta
+import atexit
+import copy
+import threading
+import time
+from typing import Dict, Any, List, Tuple
 from math import prod
 
-STATE_PATH = Path("data/shop_state.json")
+from constants import POSITIVE_TRAITS
+from events import emit
+from shop.registry import EffectSpec, lookup, get_registry
+
+# Writes are coalesced: mutations inside this window share one DB write.
+SAVE_DEBOUNCE_S = 0.75
+# A full state snapshot is written once this many events have been logged since the last one.
+SNAPSHOT_EVERY = 50
+# Combined shop XP multiplier (global × trait × contract × challenge) is clamped here.
+XP_BOOST_CAP = 1.75
+SIN_REDUCE_CAP = 0.5
 
 
 def _today_iso() -> str:
     return date.today().isoformat()
 
 
+def _midnight_after(d: date) -> float:
+    """Epoch seconds of local midnight at the end of day `d`."""
+    return datetime.combine(d + timedelta(days=1), dtime.min).timestamp()
+
+
+def _expiry_for(duration: str) -> float | None:
+    """Map a token duration to an absolute expiry (None = until consumed)."""
+    if duration == "today":
+        return _midnight_after(date.today())
+    if duration == "tomorrow":
+        return _midnight_after(date.today() + timedelta(days=1))
+    return None
+
+
+def _is_charge(spec: EffectSpec) -> bool:
+    """Counted consumables (shields, rerolls, pardons, cushion seconds ...) have
+    integer magnitudes; they last until used, whatever the row's duration says.
+    Only rate/multiplier boosts and flags lapse with their day."""
+    return spec.stacking != "flag" and isinstance(spec.magnitude, int)
+
+
+def _charge_kinds() -> set:
+    return {spec.kind for spec in get_registry().values() if _is_charge(spec)}
+
+
+def _expiry_key(kind: str, target: str | None = None) -> str:
+    # per-trait map entries expire individually: 'xp_trait:Physical'
+    return f"{kind}:{target}" if target else kind
+
+
+def _now_stamp() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def _default_state() -> Dict[str, Any]:
+    return {
+        "active_date": _today_iso(),
+        "active": {
+            "xp_global": 0.0,
+            "xp_trait": {},
+            "contract_focus": 0.0,
+            "streak_plus": 0.0,
+            "dd_xp_bonus": 0.0,
+            "challenge_xp": 0.0,
+            # economy / currency effects
+            "coin_global_pct": 0.0,
+            "shard_weekly_bonus": 0,
+            # extra features
+            "logger_full_bonus": 0.0,
+            "logger_full_bonus_next": 0.0,
+            "task_doubler": 0,
+            "logger_penalty_buffer": 0.0,
+            "logger_penalty_buffer_one_time": False,
+            "wrath_halved": False,
+            "gentle_landing_charges": 0,
+            "offer_beacons": 0,
+            "grace_periods": 0,
+            "dd_rerolls": 0,
+            "challenge_rerolls": 0,
+            "challenge_time_cushion": 0,
+            "contract_shields": 0,
+        },
+        # expiry key -> epoch seconds; effects without an entry never expire
+        "expires": {},
+    }
+
+
 class ShopEffects:
     """Minimal boosts-only effects manager.
 
+    State lives in the SQLite `effects` table and is loaded lazily on first
+    access, so importing this module does no I/O.
+
+    Every mutation goes through _apply() and is appended to the
+    `effect_events` log (activate / consume / expire ...). The `effects`
+    table is only a periodic snapshot; loading replays the events logged
+    after it, so the log doubles as an audit trail of where boosts went.
+
+    Boosts carry their own expiry (state["expires"]); counted charges have
+    none and stay until consumed. Expired effects are swept lazily: each
+    state access compares the clock against a cached "next expiry"
+    timestamp, so the check is O(1) until something is due.
+
     Exposes:
-    - activate_from_token(token_dict) -> str
+    - activate_from_token(token) -> str
     - xp_after_boosts(base_xp, trait=..., ...) -> int
     - dump() -> dict
     - extra_streak_delta() -> float
+    - consume(key, n, source) -> int
+    - flush(snapshot=False) -> None  (force pending events to the DB)
     """
 
-    def __init__(self, state_path: Path = STATE_PATH) -> None:
-        self.state_path = state_path
-        self._state = self._load()
+    def __init__(self) -> None:
+        self._data: Dict[str, Any] | None = None
+        self._next_expiry = float("inf")
+        # bumped on every mutation; the derived view is rebuilt only when it moves
+        self._version = 0
+        self._view_cache: Dict[str, Any] | None = None
+        self._view_version = -1
+        self._dirty = False
+        self._events: List[tuple] = []      # logged but not yet written
+        self._since_snapshot = 0
+        self._save_lock = threading.RLock()
+        self._write_lock = threading.Lock()  # keeps event ids in apply order across flushes
+        self._save_timer: threading.Timer | None = None
+        atexit.register(self.flush, True)
+
+    @property
+    def _state(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._load()
+            self._next_expiry = self._compute_next_expiry()
+        if time.time() >= self._next_expiry:
+            self._sweep_expired()
+        return self._data
 
     def _load(self) -> Dict[str, Any]:
-        if self.state_path.exists():
+        """Latest snapshot + replay of the events logged after it."""
+        data = None
+        try:
+            from database import get_effects_state, get_effect_events
+            data = get_effects_state()
+            if isinstance(data, dict) and "expires" not in data:
+                data["expires"] = self._legacy_expiries(data)
+            events = get_effect_events(since_snapshot=True)
+        except Exception:
+            events = []
+        if not isinstance(data, dict):
+            data = _default_state()
+        for ev in events:
             try:
-                raw = self.state_path.read_text(encoding="utf-8")
-                data = json.loads(raw or "{}")
-                if isinstance(data, dict) and "day" in data and "active_date" not in data:
-                    data["active_date"] = data.pop("day")
-                return data
-            except Exception:
-                pass
-        return {
-            "active_date": _today_iso(),
-            "active": {
-                "xp_global": 0.0,
-                "xp_trait": {},
-                "contract_focus": 0.0,
-                "streak_plus": 0.0,
-                "dd_xp_bonus": 0.0,
-                "challenge_xp": 0.0,
-                # economy / currency effects
-                "coin_global_pct": 0.0,
-                "shard_weekly_bonus": 0,
-                # extra features
-                "logger_full_bonus": 0.0,
-                "logger_full_bonus_next": 0.0,
-                "task_doubler": 0,
-                "logger_penalty_buffer": 0.0,
-                "logger_penalty_buffer_one_time": False,
-                "wrath_halved": False,
-                "gentle_landing_charges": 0,
-                "offer_beacons": 0,
-                "grace_periods": 0,
-                "dd_rerolls": 0,
-                "challenge_rerolls": 0,
-                "challenge_time_cushion": 0,
-                "contract_shields": 0,
-            },
-        }
+                _replay(data, ev["op"], ev["key"], ev["value"], ev["target"])
+            except Exception as e:
+                print(f"[effects] skipped event {ev.get('id')}: {e}")
+        self._since_snapshot = len(events)
+        return data
+
+    @staticmethod
+    def _legacy_expiries(data: Dict[str, Any]) -> Dict[str, float]:
+        """States saved before per-effect expiry: day-scoped effects end with their active_date."""
+        try:
+            day = date.fromisoformat(data.get("active_date") or _today_iso())
+        except ValueError:
+            day = date.today()
+        active = data.get("active", {})
+        out: Dict[str, float] = {}
+        for spec in get_registry().values():
+            if spec.duration != "today" or spec.kind not in active:
+                continue
+            if spec.target:
+                for target in (active.get(spec.kind) or {}):
+                    out[_expiry_key(spec.kind, target)] = _midnight_after(day)
+            else:
+                out[_expiry_key(spec.kind)] = _midnight_after(day)
+        return out
+
+    # --- expiry engine ---
+    def _compute_next_expiry(self) -> float:
+        exp = (self._data or {}).get("expires") or {}
+        return min(exp.values()) if exp else float("inf")
+
+    def _set_expiry(self, kind: str, target: str | None, expires_at: float | None, source: str | None = None) -> None:
+        if expires_at is None:
+            return
+        self._apply("expiry", _expiry_key(kind, target), expires_at, source=source)
+
+    def _sweep_expired(self) -> None:
+        """Reset every effect whose expiry has passed, then re-arm the cached next expiry."""
+        now = time.time()
+        exp = self._data.setdefault("expires", {})
+        active = self._data.setdefault("active", {})
+        defaults = _default_state()["active"]
+        due = [k for k, ts in exp.items() if ts <= now]
+        charges = _charge_kinds() if due else set()
+        for key in due:
+            self._apply("expiry", key, None, source="expired")
+            kind, _, target = key.partition(":")
+            if kind in charges:
+                continue  # stale expiry on a counted charge: drop it, keep the charges
+            if target:
+                self._apply("reset", kind, None, target, source="expired")
+            elif kind in active:
+                cur = active[kind]
+                default = defaults.get(kind, type(cur)() if isinstance(cur, (bool, int, float)) else 0)
+                self._apply("reset", kind, default, source="expired")
+        if self._data.get("active_date") != _today_iso():
+            self._apply("day", "active_date", _today_iso(), source="rollover")
+        self._next_expiry = self._compute_next_expiry()
+
+    # --- mutation log ---
+    def _apply(self, op: str, key: str, value: Any = None, target: str | None = None, source: str | None = None) -> None:
+        """Single entry point for state changes: mutate in memory and log the event."""
+        if self._data is None:
+            self._state  # load (and replay) first
+        with self._save_lock:
+            _replay(self._data, op, key, value, target)
+            self._events.append((_now_stamp(), op, key, target, value, source))
+        if op == "expiry":
+            if value is None:
+                self._next_expiry = self._compute_next_expiry()
+            else:
+                self._next_expiry = min(self._next_expiry, float(value))
+        self._save()
+
+    def consume(self, key: str, n: int = 1, source: str | None = None) -> int:
+        """Use up to `n` of a counted effect; returns how many were actually consumed."""
+        avail = int(self._state.get("active", {}).get(key, 0) or 0)
+        used = min(avail, int(n))
+        if used <= 0:
+            return 0
+        self._apply("consume", key, used, source=source)
+        return used
 
     def _save(self) -> None:
-        try:
-            self.state_path.parent.mkdir(parents=True, exist_ok=True)
-            self.state_path.write_text(json.dumps(self._state, indent=2), encoding="utf-8")
-        except Exception:
-            pass
+        """Mark the state dirty and schedule a coalesced write.
+
+        _apply() calls this after every mutation; the queued events are
+        written once per SAVE_DEBOUNCE_S window (and always on exit via flush()).
+        """
+        self._version += 1
+        emit("effects")
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is None:
+                timer = threading.Timer(SAVE_DEBOUNCE_S, self.flush)
+                timer.daemon = True
+                self._save_timer = timer
+                timer.start()
+
+    def flush(self, snapshot: bool = False) -> None:
+        """Append pending events to the DB now; also snapshot the state when
+        `snapshot` is set or SNAPSHOT_EVERY events have piled up since the last one."""
+        with self._write_lock:
+            with self._save_lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if self._data is None or not (self._dirty or (snapshot and self._since_snapshot)):
+                    return
+                events, self._events = self._events, []
+                logged = self._since_snapshot + len(events)
+                state = copy.deepcopy(self._data) if (snapshot or logged >= SNAPSHOT_EVERY) else None
+                self._dirty = False
+            try:
+                from database import append_effect_events
+                append_effect_events(events, snapshot=state)
+                self._since_snapshot = 0 if state is not None else logged
+            except Exception as e:
+                print(f"[effects] flush failed: {e}")
+                with self._save_lock:
+                    self._events[:0] = events
+                    self._dirty = True
 
     def dump(self) -> Dict[str, Any]:
         return {"active_date": self._state.get("active_date"), "active": dict(self._state.get("active", {}))}
 
-    def extra_streak_delta(self) -> float:
-        return float(self._state.get("active", {}).get("streak_plus", 0.0) or 0.0)
-
-    def _set_trait_boost(self, trait: str, pct: float) -> None:
-        a = self._state.setdefault("active", {})
-        tmap = a.setdefault("xp_trait", {})
-        tmap[trait] = max(float(tmap.get(trait, 0.0) or 0.0), float(pct))
-        a["xp_trait"] = tmap
-        self._save()
+    def _view(self) -> Dict[str, Any]:
+        """Precomputed multipliers/reductions/labels for the current state version."""
+        active = self._state.get("active", {})  # may sweep expired effects (bumps version)
+        if self._view_cache is None or self._view_version != self._version:
+            self._view_cache = _build_view(active)
+            self._view_version = self._version
+        return self._view_cache
 
-    def _set_global_boost(self, pct: float) -> None:
-        a = self._state.setdefault("active", {})
-        a["xp_global"] = max(float(a.get("xp_global", 0.0) or 0.0), float(pct))
-        self._save()
+    def active_labels(self) -> List[str]:
+        """Human-readable lines for the journal's Active Effects bar."""
+        return self._view()["labels"]
 
-    def activate_from_token(self, token: dict) -> str:
-        name = (token.get("item") or "").strip().lower() if isinstance(token, dict) else str(token)
-        cat = (token.get("category") or "").strip().lower() if isinstance(token, dict) else ""
-
-        # Omni/global
-        if name.startswith("omni booster"):
-            self._set_global_boost(0.10)
-            print(f"[effects] activated token: {token.get('item') if isinstance(token, dict) else name}")
-            return "+10% XP to all Atones (today)"
-
-        # Trait-specific boosters (e.g. 'Spiritual Booster', 'Mindful Booster')
-        for trait in POSITIVE_TRAITS:
-            if name.startswith(f"{trait.lower()} booster"):
-                self._set_trait_boost(trait, 0.25)
-                print(f"[effects] activated token: {token.get('item') if isinstance(token, dict) else name}")
-                return f"+25% XP to {trait} Atones (today)"
-
-        # legacy Physical Booster name
-        if name.startswith("physical booster"):
-            self._set_trait_boost("Physical", 0.25)
-            print(f"[effects] activated token: {token.get('item') if isinstance(token, dict) else name}")
-            return "+25% XP to Physical Atones (today)"
-        # Contract focus booster
-        if name.startswith("contract focus booster"):
-            a = self._state.setdefault("active", {})
-            a["contract_focus"] = max(float(a.get("contract_focus", 0.0) or 0.0), 0.25)
-            self._save()
-            return "+25% XP when matching a contract (today)"
-        # Logger full booster
-        if name.startswith("logger full booster"):
-            a = self._state.setdefault("active", {})
-            a["logger_full_bonus"] = max(float(a.get("logger_full_bonus", 0.0) or 0.0), 0.20)
-            self._save()
-            return "+20% XP when logging a full journal (today)"
-        # Gentle landing (sin penalty reduction) — grant 3 charges
-        if name.startswith("gentle landing"):
-            a = self._state.setdefault("active", {})
-            a["gentle_landing_charges"] = max(int(a.get("gentle_landing_charges", 0) or 0), 3)
-            self._save()
-            return "Gentle Landing active: next 3 sin penalties reduced by 1 XP each (today)"
-        # Wrath halver
-        if name.startswith("wrath halver"):
-            a = self._state.setdefault("active", {})
-            a["wrath_halved"] = True
-            self._save()
-            return "Wrath penalties halved (today)"
-        # Mindful Cushion (trait-specific sin reduction)
-        if name.startswith("mindful cushion"):
-            # maps to Mindful trait reductions
-            self._set_sin_trait_reduce("Mindful", 0.25)
-            return "Mindful Cushion active: -25% Mindful sin penalties (today)"
-        # One-Time Pardon
-        if name.startswith("one-time pardon") or name.startswith("one time pardon"):
-            a = self._state.setdefault("active", {})
-            a["one_time_pardons"] = int(a.get("one_time_pardons", 0) or 0) + 1
-            self._save()
-            return "One-Time Pardon granted: erase one small Sin (today)"
-        # Slip Insurance
-        if name.startswith("slip insurance"):
-            a = self._state.setdefault("active", {})
-            a["slip_insurance"] = int(a.get("slip_insurance", 0) or 0) + 1
-            self._save()
-            return "Slip Insurance active: halve your streak on a miss instead of resetting (one-time)"
-        # Offer beacon
-        if name.startswith("offer beacon"):
-            a = self._state.setdefault("active", {})
-            a["offer_beacons"] = int(a.get("offer_beacons", 0) or 0) + 1
-            self._save()
-            return "+1 Offer Beacon (adds an offer)"
-        # Grace Period (extend one active contract by +1 day)
-        if name.startswith("grace period"):
-            a = self._state.setdefault("active", {})
-            a["grace_periods"] = int(a.get("grace_periods", 0) or 0) + 1
-            self._save()
-            return "+1 Grace Period (extend one contract by 1 day)"
-        # Daily Double reroll
-        if name.startswith("daily double reroll"):
-            a = self._state.setdefault("active", {})
-            a["dd_rerolls"] = int(a.get("dd_rerolls", 0) or 0) + 1
-            self._save()
-            return "One extra Daily Double reroll available (today)"
-        # Challenge reroll
-        if name.startswith("challenge reroll"):
-            a = self._state.setdefault("active", {})
-            a["challenge_rerolls"] = int(a.get("challenge_rerolls", 0) or 0) + 1
-            self._save()
-            return "One extra Challenge reroll available (today)"
-        # Challenge time cushion
-        if name.startswith("challenge time cushion"):
-            a = self._state.setdefault("active", {})
-            a["challenge_time_cushion"] = max(int(a.get("challenge_time_cushion", 0) or 0), 300)
-            self._save()
-            return "+5 min added to challenge timers (today)"
-        # Random Challenge Helpers aliases: allow 'time cushion' token naming
-        if name.startswith("time cushion"):
-            a = self._state.setdefault("active", {})
-            # Additive: each token grants +300s to the challenge cushion which challenge code may consume
-            a["challenge_time_cushion"] = int(a.get("challenge_time_cushion", 0) or 0) + 300
-            self._save()
-            return "+5 min added to current challenge timer"
-        # Safe Decline: allow declining a drawn challenge safely (one-time)
-        if name.startswith("safe decline"):
-            a = self._state.setdefault("active", {})
-            a["challenge_safe_decline"] = int(a.get("challenge_safe_decline", 0) or 0) + 1
-            self._save()
-            return "Safe Decline granted: decline a drawn challenge without penalty (one-time)"
-        # Contract shield
-        if name.startswith("contract shield"):
-            a = self._state.setdefault("active", {})
-            a["contract_shields"] = int(a.get("contract_shields", 0) or 0) + 1
-            self._save()
-            return "Contract shield granted (protects one contract today)"
-        # Small global XP multiplier
-        if name.startswith("xp multiplier small"):
-            self._set_global_boost(0.05)
-            return "+5% XP to all Atones (today)"
-        # Economy & Conversion tokens
-        if name.startswith("coin drip booster"):
-            a = self._state.setdefault("active", {})
-            a["coin_global_pct"] = max(float(a.get("coin_global_pct", 0.0) or 0.0), 0.20)
-            self._save()
-            return "+20% coin earn today"
-        if name.startswith("shard spark"):
-            a = self._state.setdefault("active", {})
-            # immediate shard grant
-            a["shard_weekly_bonus"] = int(a.get("shard_weekly_bonus", 0) or 0) + 1
-            # also increment total shards (via currency manager) if available
-            try:
-                from shop.currency import add_shards
-                add_shards(1)
-            except Exception:
-                pass
-            self._save()
-            return "Shard Spark: granted 1 shard and +1 weekly shard allowance"
-        if name.startswith("streak spark"):
-            a = self._state.setdefault("active", {})
-            a["streak_plus"] = max(float(a.get("streak_plus", 0.0) or 0.0), 0.10)
-            self._save()
-            return "+0.10 to today's streak multiplier"
-        if name.startswith("daily double amplifier"):
-            a = self._state.setdefault("active", {})
-            a["dd_xp_bonus"] = max(float(a.get("dd_xp_bonus", 0.0) or 0.0), 0.50)
-            self._save()
-            return "+0.5× XP on Daily Double Atones (today)"
-        if name.startswith("challenge booster"):
-            a = self._state.setdefault("active", {})
-            a["challenge_xp"] = max(float(a.get("challenge_xp", 0.0) or 0.0), 0.50)
-            self._save()
-            return "+50% XP on Random Challenge success (today)"
-
-        # --- Logger category tokens ---
-        # Task Doubler: one logged task counts as two for the logger bonus calc (one-time)
-        if name.startswith("task doubler"):
-            a = self._state.setdefault("active", {})
-            a["task_doubler"] = int(a.get("task_doubler", 0) or 0) + 1
-            self._save()
-            return "Task Doubler granted: one logged task will count as two (one-time)"
-
-        # Planner's Edge: schedule a logger full bonus for tomorrow
-        if name.startswith("planner") or name.startswith("planner's edge"):
-            a = self._state.setdefault("active", {})
-            # store as a 'next' flag which will be applied when the logger opens next day
-            a["logger_full_bonus_next"] = max(float(a.get("logger_full_bonus_next", 0.0) or 0.0), 0.50)
-            self._save()
-            return "Planner's Edge scheduled: +50% logger full bonus for tomorrow"
-
-        # Penalty Buffer: one-time reduction to logger penalty
-        if name.startswith("penalty buffer"):
-            a = self._state.setdefault("active", {})
-            a["logger_penalty_buffer"] = max(float(a.get("logger_penalty_buffer", 0.0) or 0.0), 0.30)
-            # mark as one-time use — we will zero it when applied
-            a["logger_penalty_buffer_one_time"] = True
-            self._save()
-            return "Penalty Buffer active: -30% logger penalty on next incomplete set"
-
-        return "Unknown boost"
+    def extra_streak_delta(self) -> float:
+        return self._view()["streak_plus"]
+
+    def activate_from_token(self, token) -> str:
+        """Apply a token's effect via the compiled registry (one dict lookup).
+        `token` is a catalog Token, a row dict or the item name."""
+        if isinstance(token, dict):
+            name = token.get("item") or ""
+        else:
+            name = getattr(token, "item", None) or str(token)
+        spec = lookup(name.strip())
+        if spec is None:
+            return "Unknown boost"
+
+        source = f"token:{spec.item}"
+        self._apply(spec.stacking, spec.kind, spec.magnitude, spec.target, source=source)
+        if not _is_charge(spec):
+            self._set_expiry(spec.kind, spec.target, _expiry_for(spec.duration), source=source)
+        hook = _ACTIVATION_HOOKS.get(spec.kind)
+        if hook is not None:
+            hook(self)
+        print(f"[effects] activated token: {name}")
+        return spec.message
 
     def xp_after_boosts(self, base_xp: float, *, trait: str, has_contract_for_trait: bool = False, is_random_challenge: bool = False, is_daily_double: bool = False) -> int:
-        a = self._state.get("active", {})
-        mults: List[float] = []
-        g = float(a.get("xp_global", 0.0) or 0.0)
-        if g > 0:
-            mults.append(1.0 + g)
-        t = float((a.get("xp_trait", {}) or {}).get(trait, 0.0) or 0.0)
-        if t > 0:
-            mults.append(1.0 + t)
-        if has_contract_for_trait and float(a.get("contract_focus", 0.0) or 0.0) > 0:
-            mults.append(1.0 + float(a.get("contract_focus", 0.0)))
-        if is_random_challenge and float(a.get("challenge_xp", 0.0) or 0.0) > 0:
-            mults.append(1.0 + float(a.get("challenge_xp", 0.0)))
-
-        prod_mult = prod(mults) if mults else 1.0
-        cap = 1.75
-        final = base_xp * min(prod_mult, cap)
-
-        dd_bonus = float(a.get("dd_xp_bonus", 0.0) or 0.0)
-        if is_daily_double and dd_bonus > 0:
-            final *= (1.0 + dd_bonus)
+        v = self._view()
+        flags = (bool(has_contract_for_trait), bool(is_random_challenge))
+        prod_mult, clamped = v["xp"].get((trait,) + flags) or v["xp"][(None,) + flags]
+        final = base_xp * clamped
+        if is_daily_double:
+            final *= v["dd_mult"]
 
         try:
-            print(f"[effects.debug] base={base_xp} prod_mult={prod_mult:.4f} clamped_mult={min(prod_mult, cap):.4f} final={int(round(final))}")
+            print(f"[effects.debug] base={base_xp} prod_mult={prod_mult:.4f} clamped_mult={clamped:.4f} final={int(round(final))}")
         except Exception:
             pass
 
         return int(round(final))
-
     # Economy helpers
     def coin_multiplier_pct(self) -> float:
-        a = self._state.get("active", {})
-        return float(a.get("coin_global_pct", 0.0) or 0.0)
+        return self._view()["coin_pct"]
 
     def shard_weekly_bonus(self) -> int:
-        a = self._state.get("active", {})
-        return int(a.get("shard_weekly_bonus", 0) or 0)
+        return self._view()["shard_bonus"]
 
     # --- Neglects / Sin penalty helpers ---
     def logger_penalty_buffer_pct(self) -> float:
-        a = self._state.get("active", {})
-        return float(a.get("logger_penalty_buffer", 0.0) or 0.0)
+        return self._view()["logger_buffer"]
 
     def logger_full_bonus_pct(self) -> float:
-        a = self._state.get("active", {})
-        return float(a.get("logger_full_bonus", 0.0) or 0.0)
+        return self._view()["logger_full"]
 
     def consume_logger_penalty_buffer(self) -> None:
         """Consume the one-time logger penalty buffer (set it to 0)."""
-        a = self._state.setdefault("active", {})
+        a = self._state.get("active", {})
         if float(a.get("logger_penalty_buffer", 0.0) or 0.0) > 0:
-            a["logger_penalty_buffer"] = 0.0
-            a["logger_penalty_buffer_one_time"] = False
-            try:
-                self._save()
-            except Exception:
-                pass
+            self._apply("set", "logger_penalty_buffer", 0.0, source="consume:logger")
+            self._apply("set", "logger_penalty_buffer_one_time", False, source="consume:logger")
 
     def shift_logger_next_to_active(self) -> None:
         """If planner-edge was scheduled for next day, apply it to active bonuses and clear the next flag."""
-        a = self._state.setdefault("active", {})
+        a = self._state.get("active", {})
         next_pct = float(a.get("logger_full_bonus_next", 0.0) or 0.0)
         if next_pct > 0:
-            a["logger_full_bonus"] = max(float(a.get("logger_full_bonus", 0.0) or 0.0), next_pct)
-            a["logger_full_bonus_next"] = 0.0
-            try:
-                self._save()
-            except Exception:
-                pass
+            src = "shift:logger_full_bonus_next"
+            self._apply("max", "logger_full_bonus", next_pct, source=src)
+            self._apply("set", "logger_full_bonus_next", 0.0, source=src)
+            # the scheduled bonus now lives for today only
+            self._apply("expiry", _expiry_key("logger_full_bonus_next"), None, source=src)
+            self._set_expiry("logger_full_bonus", None, _expiry_for("today"), source=src)
 
     def reduce_sin_penalty(self, *, sin_name: str, mapped_trait: str, penalty_points: int) -> int:
         """Apply active neglects to a sin penalty and return the (non-negative) reduced penalty points.
@@ -352,34 +377,21 @@ class ShopEffects:
         if penalty_points <= 0:
             return 0
 
-        a = self._state.setdefault("active", {})
         original = int(penalty_points)
+        source = f"sin:{sin_name}"
 
         # One-Time Pardon (shard consumable) - only erase small sins (<=2)
-        if int(a.get("one_time_pardons", 0) or 0) > 0 and original <= 2:
-            a["one_time_pardons"] = int(a.get("one_time_pardons", 0)) - 1
-            self._save()
+        if original <= 2 and self.consume("one_time_pardons", 1, source=source):
             return 0
 
         # Gentle Landing: consume one charge to reduce penalty by 1 (per charge)
-        if int(a.get("gentle_landing_charges", 0) or 0) > 0:
-            # consume one charge and reduce by 1 point
-            a["gentle_landing_charges"] = int(a.get("gentle_landing_charges", 0)) - 1
-            self._save()
+        if self.consume("gentle_landing_charges", 1, source=source):
             reduced = max(0, original - 1)
             # still apply other percentage reductions below to the reduced number
             original = reduced
 
-        # Percent reductions (trait-specific cushions)
-        sin_map = a.get("sin_trait_reduce", {}) or {}
-        pct = float(sin_map.get(mapped_trait, 0.0) or 0.0)
-
-        # Wrath halving
-        if mapped_trait.lower() == "wrath" and bool(a.get("wrath_halved", False)):
-            pct = max(pct, 0.5)
-
-        # Ensure cap at 50%
-        pct = min(pct, 0.5)
+        # Percent reductions (trait cushions + wrath halving, already capped at 50%)
+        pct = self._view()["sin_pct"].get(mapped_trait, 0.0)
 
         reduced = int(round(original * (1.0 - pct)))
 
@@ -387,37 +399,14 @@ class ShopEffects:
         if reduced < 0:
             reduced = 0
 
-        try:
-            self._save()
-        except Exception:
-            pass
-
         return int(reduced)
 
-    # Utility: set a sin-trait reduction (used by token activation)
-    def _set_sin_trait_reduce(self, trait: str, pct: float) -> None:
-        a = self._state.setdefault("active", {})
-        smap = a.setdefault("sin_trait_reduce", {})
-        smap[trait] = max(float(smap.get(trait, 0.0) or 0.0), float(pct))
-        a["sin_trait_reduce"] = smap
-        self._save()
-
     def consume_slip_insurance(self) -> bool:
         """Consume one Slip Insurance if available; returns True if consumed."""
-        a = self._state.setdefault("active", {})
-        if int(a.get("slip_insurance", 0) or 0) > 0:
-            a["slip_insurance"] = int(a.get("slip_insurance", 0)) - 1
-            self._save()
-            return True
-        return False
+        return self.consume("slip_insurance", 1, source="logger:miss") > 0
 
     def consume_contract_shield(self) -> bool:
-        a = self._state.setdefault("active", {})
-        if int(a.get("contract_shields", 0) or 0) > 0:
-            a["contract_shields"] = int(a.get("contract_shields", 0)) - 1
-            self._save()
-            return True
-        return False
+        return self.consume("contract_shields", 1, source="contract:shield") > 0
 
     # --- Challenge helpers accessors / consumers ---
     def get_challenge_time_cushion(self) -> int:
@@ -426,33 +415,199 @@ class ShopEffects:
 
     def consume_challenge_time_cushion(self, seconds: int) -> int:
         """Consume up to `seconds` from the stored cushion and return the actual seconds consumed."""
-        a = self._state.setdefault("active", {})
-        avail = int(a.get("challenge_time_cushion", 0) or 0)
-        if avail <= 0:
-            return 0
-        used = min(avail, int(seconds))
-        a["challenge_time_cushion"] = max(0, avail - used)
-        try:
-            self._save()
-        except Exception:
-            pass
-        return used
+        return self.consume("challenge_time_cushion", seconds, source="challenge:timer")
 
     def get_challenge_safe_decline_count(self) -> int:
         a = self._state.get("active", {})
         return int(a.get("challenge_safe_decline", 0) or 0)
 
     def use_challenge_safe_decline(self) -> bool:
-        a = self._state.setdefault("active", {})
-        cnt = int(a.get("challenge_safe_decline", 0) or 0)
-        if cnt > 0:
-            a["challenge_safe_decline"] = cnt - 1
-            try:
-                self._save()
-            except Exception:
-                pass
-            return True
-        return False
+        return self.consume("challenge_safe_decline", 1, source="challenge:decline") > 0
+
+    def get_challenge_reroll_count(self) -> int:
+        a = self._state.get("active", {})
+        return int(a.get("challenge_rerolls", 0) or 0)
+
+    def use_challenge_reroll(self) -> bool:
+        return self.consume("challenge_rerolls", 1, source="challenge:reroll") > 0
+
+
+# --- Event replay (shared by live mutations and startup rebuild) ---
+def _replay(state: Dict[str, Any], op: str, key: str, value: Any, target: str | None = None) -> None:
+    """Apply one logged event to a state dict.
+
+    ops: max/add/flag (token stacking rules), set, consume (clamped at 0),
+    reset (back to default; pops per-trait targets), expiry (value=None pops),
+    day (active_date stamp).
+    """
+    if op == "day":
+        state["active_date"] = value
+        return
+    if op == "expiry":
+        exp = state.setdefault("expires", {})
+        if value is None:
+            exp.pop(key, None)
+        else:
+            exp[key] = max(float(exp.get(key, 0.0)), float(value))
+        return
+    a = state.setdefault("active", {})
+    if target:
+        bucket = a.get(key)
+        if not isinstance(bucket, dict):
+            bucket = a[key] = {}
+        k = target
+    else:
+        bucket, k = a, key
+    cur = bucket.get(k, 0) or 0
+    if op == "reset":
+        if target:
+            bucket.pop(k, None)
+        else:
+            bucket[k] = value
+    elif op == "set":
+        bucket[k] = value
+    elif op == "add":
+        bucket[k] = cur + value
+    elif op == "max":
+        bucket[k] = max(cur, value)
+    elif op == "flag":
+        bucket[k] = True
+    elif op == "consume":
+        bucket[k] = max(0, int(cur) - int(value))
+    else:
+        raise ValueError(f"unknown effect op {op!r}")
+
+
+# --- Derived view (rebuilt only when the state version changes) ---
+def _num(a: Dict[str, Any], key: str) -> float:
+    return float(a.get(key, 0.0) or 0.0)
+
+
+def _build_view(a: Dict[str, Any]) -> Dict[str, Any]:
+    g = _num(a, "xp_global")
+    focus = _num(a, "contract_focus")
+    chal = _num(a, "challenge_xp")
+    tmap = {t: float(p or 0.0) for t, p in (a.get("xp_trait") or {}).items()}
+
+    # (trait, has_contract, is_challenge) -> (raw product, clamped product); None = any other trait
+    xp: Dict[Tuple[Any, bool, bool], Tuple[float, float]] = {}
+    for trait in [None, *POSITIVE_TRAITS, *tmap]:
+        t = tmap.get(trait, 0.0) if trait else 0.0
+        for has_ctr in (False, True):
+            for is_ch in (False, True):
+                parts = (g, t, focus if has_ctr else 0.0, chal if is_ch else 0.0)
+                raw = prod(1.0 + x for x in parts if x > 0)
+                xp[(trait, has_ctr, is_ch)] = (raw, min(raw, XP_BOOST_CAP))
+
+    sin_pct = {t: min(float(p or 0.0), SIN_REDUCE_CAP) for t, p in (a.get("sin_trait_reduce") or {}).items()}
+    if a.get("wrath_halved"):
+        for key in ("Wrath", "wrath"):
+            sin_pct[key] = SIN_REDUCE_CAP
+
+    dd = _num(a, "dd_xp_bonus")
+    return {
+        "xp": xp,
+        "dd_mult": 1.0 + dd if dd > 0 else 1.0,
+        "sin_pct": sin_pct,
+        "coin_pct": _num(a, "coin_global_pct"),
+        "shard_bonus": int(a.get("shard_weekly_bonus", 0) or 0),
+        "streak_plus": _num(a, "streak_plus"),
+        "logger_full": _num(a, "logger_full_bonus"),
+        "logger_buffer": _num(a, "logger_penalty_buffer"),
+        "labels": _boost_labels(a),
+    }
+
+
+def _boost_labels(state: Dict[str, Any]) -> List[str]:
+    boosts = []
+    # XP global
+    if state.get("xp_global", 0) > 0:
+        boosts.append(f"+{int(state['xp_global']*100)}% XP (all Atones)")
+    # Trait boosts
+    for trait, pct in state.get("xp_trait", {}).items():
+        if pct > 0:
+            boosts.append(f"+{int(pct*100)}% XP to {trait}")
+    # Contract focus
+    if state.get("contract_focus", 0) > 0:
+        boosts.append(f"+{int(state['contract_focus']*100)}% XP (contract trait)")
+    # Streak
+    if state.get("streak_plus", 0) > 0:
+        boosts.append(f"+{state['streak_plus']:.2f} streak multiplier")
+    # Daily Double
+    if state.get("dd_xp_bonus", 0) > 0:
+        boosts.append(f"+{state['dd_xp_bonus']:.2f}× Daily Double XP")
+    # Logger
+    if state.get("logger_full_bonus", 0) > 0:
+        boosts.append(f"+{int(state['logger_full_bonus']*100)}% Logger full bonus")
+    # Challenge
+    if state.get("challenge_xp", 0) > 0:
+        boosts.append(f"+{int(state['challenge_xp']*100)}% Random Challenge XP")
+    # Sin penalty reductions
+    for trait, pct in state.get("sin_trait_reduce", {}).items():
+        if pct > 0:
+            boosts.append(f"-{int(pct*100)}% {trait} Sin penalty")
+    # Wrath
+    if state.get("wrath_halved", False):
+        boosts.append("Wrath penalties halved")
+    # Gentle landing
+    if state.get("gentle_landing_charges", 0) > 0:
+        boosts.append(f"Gentle Landing: {state['gentle_landing_charges']} left")
+    # One-time pardons
+    if state.get("one_time_pardons", 0) > 0:
+        boosts.append(f"One-Time Pardon: {state['one_time_pardons']} left")
+    # Slip insurance
+    if state.get("slip_insurance", 0) > 0:
+        boosts.append(f"Slip Insurance: {state['slip_insurance']} left")
+    # Contract shield
+    if state.get("contract_shields", 0) > 0:
+        boosts.append(f"Contract Shield: {state['contract_shields']} left")
+    # Grace periods
+    if state.get("grace_periods", 0) > 0:
+        boosts.append(f"Grace Periods: {state['grace_periods']} left")
+    # Offer beacon
+    if state.get("offer_beacons", 0) > 0:
+        boosts.append(f"Offer Beacon: {state['offer_beacons']} left")
+    # Rerolls
+    if state.get("dd_rerolls", 0) > 0:
+        boosts.append(f"Daily Double Reroll: {state['dd_rerolls']} left")
+    if state.get("challenge_rerolls", 0) > 0:
+        boosts.append(f"Challenge Reroll: {state['challenge_rerolls']} left")
+    # Time cushion
+    if state.get("challenge_time_cushion", 0) > 0:
+        boosts.append(f"+{int(state['challenge_time_cushion']//60)} min challenge timer")
+    # Safe decline
+    if state.get("challenge_safe_decline", 0) > 0:
+        boosts.append(f"Safe Decline: {state['challenge_safe_decline']} left")
+    # Logger penalty buffer
+    if state.get("logger_penalty_buffer", 0) > 0:
+        boosts.append(f"-{int(state['logger_penalty_buffer']*100)}% Logger penalty")
+    # Economy / currency effects
+    if state.get("coin_global_pct", 0) > 0:
+        boosts.append(f"+{int(state['coin_global_pct']*100)}% coins today")
+    if state.get("shard_weekly_bonus", 0) > 0:
+        boosts.append(f"Shard Spark: +{int(state['shard_weekly_bonus'])} weekly shard allowance")
+    return boosts
+
+
+# --- Side effects that go beyond setting a state key (keyed by spec.kind) ---
+def _grant_spark_shard(fx: ShopEffects) -> None:
+    # Shard Spark also grants one shard immediately
+    try:
+        from shop.currency import add_shards
+        add_shards(1, reason='token', ref='shard_weekly_bonus')
+    except Exception:
+        pass
+
+
+def _mark_buffer_one_time(fx: ShopEffects) -> None:
+    # Penalty Buffer is consumed on the next incomplete logger set
+    fx._apply("set", "logger_penalty_buffer_one_time", True, source="token:hook")
+
+
+_ACTIVATION_HOOKS = {
+    "shard_weekly_bonus": _grant_spark_shard,
+    "logger_penalty_buffer": _mark_buffer_one_time,
+}
 
 
 # singleton instance
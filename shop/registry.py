@@ -0,0 +1,85 @@
+"""Declarative token -> effect registry.
+
+Each row of data/shop_tokens.csv declares what its token does via four
+columns:
+
+- kind       key in the ShopEffects active-state dict (e.g. 'xp_global')
+- target     optional sub-key for per-trait maps ('xp_trait', 'sin_trait_reduce')
+- magnitude  number applied to that key (ints stay ints: '1', '300')
+- stacking   'max' (keep the strongest), 'add' (accumulate) or 'flag' (set True)
+
+The existing 'duration' column (today/tomorrow/once) is carried along.
+Rows are parsed once by shop.catalog, which attaches each row's compiled
+spec; get_registry() is the {item: spec} view of that, so activating a
+token is a single lookup and new tokens only need a CSV row.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Union
+
+STACKING_RULES = ("max", "add", "flag")
+
+
+@dataclass(frozen=True)
+class EffectSpec:
+    item: str
+    kind: str
+    target: str | None
+    magnitude: Union[int, float]
+    stacking: str
+    duration: str
+    message: str
+
+
+def _parse_magnitude(raw: str) -> Union[int, float]:
+    raw = (raw or "").strip()
+    if not raw:
+        return 1
+    return float(raw) if "." in raw else int(raw)
+
+
+def _message(effect: str, duration: str) -> str:
+    effect = (effect or "").strip() or "Effect active"
+    if duration == "today" and "today" not in effect.lower():
+        return f"{effect} (today)"
+    return effect
+
+
+def compile_spec(row: dict) -> EffectSpec:
+    """Validate one CSV row into an EffectSpec (raises ValueError on bad rows)."""
+    item = (row.get("item") or "").strip()
+    kind = (row.get("kind") or "").strip()
+    stacking = (row.get("stacking") or "").strip().lower()
+    if not item or not kind:
+        raise ValueError(f"token row missing item/kind: {row!r}")
+    if stacking not in STACKING_RULES:
+        raise ValueError(f"{item}: unknown stacking rule {stacking!r}")
+    duration = (row.get("duration") or "today").strip().lower()
+    return EffectSpec(
+        item=item,
+        kind=kind,
+        target=(row.get("target") or "").strip() or None,
+        magnitude=_parse_magnitude(row.get("magnitude")),
+        stacking=stacking,
+        duration=duration,
+        message=_message(row.get("effect"), duration),
+    )
+
+
+_REGISTRY: Dict[str, EffectSpec] | None = None
+_REGISTRY_VERSION = -1
+
+
+def get_registry() -> Dict[str, EffectSpec]:
+    """{item: EffectSpec}, compiled from the token catalog (recompiled when it reloads)."""
+    global _REGISTRY, _REGISTRY_VERSION
+    from shop.catalog import catalog
+    tokens = catalog.tokens()
+    if _REGISTRY is None or _REGISTRY_VERSION != catalog.version:
+        _REGISTRY = {tok.item: tok.spec for tok in tokens if tok.spec is not None}
+        _REGISTRY_VERSION = catalog.version
+    return _REGISTRY
+
+
+def lookup(item: str) -> EffectSpec | None:
+    return get_registry().get(item)
@@ -0,0 +1,37 @@
+# startup.py — coarse cold-start timeline
+#
+# main.py imports this first, so the clock starts at (roughly) launch. Code
+# along the startup path calls mark("what just finished"); once the deferred
+# stage is done the app calls report(), which prints one line per phase:
+#
+#   [startup]    212.4 ms  +  148.0  imports
+#   [startup]    231.9 ms  +   19.5  database
+#   ...
+import time
+from typing import List, Tuple
+
+_T0 = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+_reported = False
+
+
+def mark(label: str) -> None:
+    _marks.append((label, time.perf_counter()))
+
+
+def timeline() -> List[Tuple[str, float, float]]:
+    """[(label, ms since launch, ms since previous mark)]"""
+    out, prev = [], _T0
+    for label, t in _marks:
+        out.append((label, (t - _T0) * 1000.0, (t - prev) * 1000.0))
+        prev = t
+    return out
+
+
+def report() -> None:
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    for label, total, step in timeline():
+        print(f"[startup] {total:8.1f} ms  +{step:7.1f}  {label}")
@@ -0,0 +1,41 @@
+# tests/test_catalog.py — duplicate rows and the category/currency indexes
+import tempfile
+import unittest
+from pathlib import Path
+
+from shop.catalog import Catalog, TOKENS_CSV
+
+
+class DuplicateItemTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "shop_tokens.csv"
+        lines = TOKENS_CSV.read_text(encoding="utf-8").splitlines()
+        header, first = lines[0], lines[1]
+        # same item name again, different cost: the first row must win
+        repeat = first.split(",")
+        repeat[4] = "999"
+        self.item = repeat[1]
+        self.path.write_text("\n".join([header, first, *lines[2:], ",".join(repeat)]) + "\n",
+                             encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_first_row_wins(self):
+        cat = Catalog(self.path)
+        tok = cat.get(self.item)
+        self.assertIsNotNone(tok)
+        self.assertNotEqual(tok.cost, 999)
+        self.assertEqual([t.item for t in cat.tokens()].count(self.item), 1)
+
+    def test_category_and_currency_indexes(self):
+        cat = Catalog(self.path)
+        tok = cat.get(self.item)
+        self.assertIn(tok, cat.by_category(f"  {tok.category.upper()} "))
+        self.assertIn(tok, cat.by_currency(tok.currency.title()))
+        self.assertEqual(sum(len(cat.by_currency(c)) for c in ("coins", "shards")), len(cat.tokens()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_challenges.py — challenge deadlines fire on wall-clock time
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+
+import database
+from scheduler import scheduler
+
+
+class _FakeRoot:
+    """Records after() callbacks; a real Tk root runs them regardless of focus."""
+    def __init__(self):
+        self.jobs = {}
+        self._next = 0
+
+    def after(self, ms, fn):
+        self._next += 1
+        self.jobs[self._next] = (ms, fn)
+        return self._next
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+
+class DeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._db_file = database.DB_FILE
+        database.DB_FILE = Path(self._tmp.name) / "test.db"
+        database.initialize_db()
+
+        from ui.app import parts_challenge
+        self.pc = parts_challenge
+        self._patched = {"play_sfx": parts_challenge.play_sfx, "showinfo": parts_challenge.messagebox.showinfo}
+        parts_challenge.play_sfx = lambda *a, **k: None
+        parts_challenge.messagebox.showinfo = lambda *a, **k: None
+
+    def tearDown(self):
+        self.pc.play_sfx = self._patched["play_sfx"]
+        self.pc.messagebox.showinfo = self._patched["showinfo"]
+        scheduler._unfocused = False
+        from shop.effects import effects
+        effects.flush(True)   # the penalty path touched the shared effects state
+        database.DB_FILE = self._db_file
+        self._tmp.cleanup()
+
+    def test_overdue_challenge_fails_without_focus(self):
+        ch = database.start_challenge("Test", "Physical", 1, 4, 2)
+        conn = database.get_connection()
+        conn.execute("UPDATE challenges SET deadline=? WHERE id=?", (time.time() - 1, ch["id"]))
+        conn.commit(); conn.close()
+
+        # the app is in the background: the shared scheduler is paused
+        scheduler._unfocused = True
+        app = types.SimpleNamespace(root=_FakeRoot())
+        self.pc._watch_deadlines(app)
+
+        self.assertNotIn("challenge.deadline", [t["name"] for t in scheduler.tasks()])
+        self.assertEqual(len(app.root.jobs), 1)
+        (_ms, fire), = app.root.jobs.values()
+        fire()   # Tk's after timer, no FocusIn involved
+
+        self.assertEqual(database.get_challenge(ch["id"])["status"], "failed")
+        self.assertEqual(database.get_active_challenges(), [])
+        self.assertIsNone(app._challenge_deadline_job)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_effects.py — day rollover keeps counted charges
+import tempfile
+import unittest
+from pathlib import Path
+
+import database
+from shop.effects import ShopEffects
+
+
+class RolloverTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._db_file = database.DB_FILE
+        database.DB_FILE = Path(self._tmp.name) / "test.db"
+        database.initialize_db()
+        self.fx = ShopEffects()
+
+    def tearDown(self):
+        self.fx.flush(True)   # drain (incl. the exit snapshot) before the DB path is restored
+        database.DB_FILE = self._db_file
+        self._tmp.cleanup()
+
+    def _pass_midnight(self):
+        # everything stamped "today" is now in the past
+        for key in self.fx._data["expires"]:
+            self.fx._data["expires"][key] = 0.0
+        self.fx._next_expiry = 0.0
+
+    def test_charge_bought_yesterday_survives_rollover(self):
+        self.fx.activate_from_token("Extra Challenge Reroll")   # duration 'today', a counted charge
+        self.fx.activate_from_token("Physical Booster")         # duration 'today', a rate boost
+        self.assertNotIn("challenge_rerolls", self.fx._data["expires"])
+
+        self._pass_midnight()
+        active = self.fx._state["active"]
+
+        self.assertEqual(active["challenge_rerolls"], 1)
+        self.assertNotIn("Physical", active.get("xp_trait", {}))
+        self.assertEqual(self.fx.consume("challenge_rerolls", 1), 1)
+
+    def test_stale_expiry_on_a_charge_is_dropped(self):
+        # saved before charges stopped getting day expiries
+        self.fx.activate_from_token("Contract Ward")
+        self.fx._apply("expiry", "contract_shields", 1.0)
+
+        self._pass_midnight()
+
+        self.assertEqual(self.fx._state["active"]["contract_shields"], 1)
+        self.assertNotIn("contract_shields", self.fx._data["expires"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# tests/test_writequeue.py — completion callbacks and read-after-write without blocking
+import threading
+import unittest
+
+from writequeue import WriteQueue
+
+
+class WriteQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.q = WriteQueue("test")
+        self.gate = threading.Event()
+        self.written = []
+
+    def tearDown(self):
+        self.gate.set()
+        self.q.flush()
+
+    def _write(self, day, text):
+        self.gate.wait(5)
+        self.written.append((day, text))
+
+    def test_peek_sees_queued_text_and_callbacks_wait_for_drain(self):
+        results = []
+        self.q.submit("d1", self._write, "d1", "first", on_done=lambda ok: results.append(("first", ok)))
+        self.q.submit("d2", self._write, "d2", "other")
+        self.q.submit("d2", self._write, "d2", "newer", on_done=lambda ok: results.append(("newer", ok)))
+        self.assertEqual(self.q.peek("d1"), ("d1", "first"))   # running, still not on disk
+        self.assertEqual(self.q.peek("d2"), ("d2", "newer"))
+        self.assertIsNone(self.q.peek("d3"))
+        self.gate.set()
+        self.assertTrue(self.q.flush())
+        self.assertEqual(results, [])                          # only drain() runs callbacks
+        self.q.drain()
+        self.assertEqual(results, [("first", True), ("newer", True)])
+        self.assertEqual(self.written, [("d1", "first"), ("d2", "newer")])
+        self.assertIsNone(self.q.peek("d1"))
+
+    def test_superseded_callback_follows_the_replacing_write(self):
+        results = []
+        self.q.submit("block", self._write, "block", "")
+        self.q.submit("d1", self._write, "d1", "old", on_done=lambda ok: results.append("old"))
+        self.q.submit("d1", self._write, "d1", "new", on_done=lambda ok: results.append("new"))
+        self.gate.set()
+        self.q.flush()
+        self.q.drain()
+        self.assertEqual(results, ["old", "new"])
+        self.assertNotIn(("d1", "old"), self.written)
+
+    def test_failed_write_reports_false(self):
+        def boom():
+            raise OSError("disk full")
+        results = []
+        self.q.submit("d1", boom, on_done=results.append)
+        self.q.flush()
+        self.q.drain()
+        self.assertEqual(results, [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
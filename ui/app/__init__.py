@@ -2,17 +2,13 @@
 # Orchestrates the UI + runs BaselineQuiz BEFORE any other UI loads
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 from datetime import date, timedelta
 import random
-import calendar
-import csv
-from pathlib import Path
 
 from .leveling import update_daily_emas_if_needed
-from .parts_logger import open_logger as _open_logger
 
-from sound import play_sfx, init as init_sound, set_muted
+from sound import init as init_sound, set_muted
 from bgm import init_bgm, start_bgm_shuffle, stop_bgm
 
 from constants import (
@@ -23,8 +19,8 @@ from constants import (
 )
 from database import (
     get_meta, set_meta,
-    get_attributes, update_attribute_score,
-    insert_entry, get_entries_by_date, get_journal, upsert_journal,
+    get_attributes,
+    get_entries_by_date, get_journal, upsert_journal,
     set_daily_double, get_daily_double,
     create_personal_contract_limited,
     get_baselines,
@@ -32,15 +28,19 @@ from database import (
     get_active_contracts_count, get_personal_active_count, get_available_offers_count,
     generate_daily_contracts_if_needed,
     mark_contract_broken, mark_contract_penalty_applied,
+    get_active_challenges,
 )
 from prompts import get_prompt_for_date
 from exp_system import (
     xp_to_next, level_from_xp, xp_in_level,
-    get_total_xp, add_total_xp, average_stat, compute_rank
+    get_total_xp, average_stat, compute_rank
 )
 from shop.effects import effects
+from events import subscribe
+from scheduler import scheduler
+from writequeue import journal_writes
+import startup
 from widgets import RoundButton
-from quiz import BaselineQuiz
 from shop.currency import init as init_currency, add_coins, get_coins, get_coins_today, get_shards
 
 # Components
@@ -51,36 +51,16 @@ from ..components.journal import JournalPanel
 from ..components.logs import LogsPanel
 from ..components.actions import ActionsBar
 from ..components.dailydouble import DailyDoublePanel
+from ..components.calendar_heatmap import CalendarHeatmap
+from .. import theme
 
 # Split-out handlers
 from .parts_actions import (
     save_journal as _save_journal,
+    autosave_journal as _autosave_journal,
     open_atone_dialog as _open_atone_dialog,
     open_sin_dialog as _open_sin_dialog,
 )
-from .parts_contracts import open_contracts as _open_contracts
-
-
-# ---------------- Random challenge pool (CSV optional) ----------------
-CHALLENGE_CSV = Path("data/random_challenges.csv")
-
-def _load_challenge_pool_from_csv():
-    if not CHALLENGE_CSV.exists():
-        return None
-    pool = []
-    with CHALLENGE_CSV.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                title = row["title"].strip()
-                trait = row["trait"].strip()
-                minutes = int(row["minutes"])
-                reward = int(row["reward_pts"])
-                penalty = int(row["penalty_pts"])
-            except Exception:
-                continue
-            pool.append((title, trait, minutes, reward, penalty))
-    return pool or None
 
 
 class HabitTrackerApp:
@@ -92,10 +72,11 @@ class HabitTrackerApp:
             setattr(self.root, '_app', self)
         except Exception:
             pass
+        # periodic UI work (bobbing icons, sprites, shop timers) shares one timer
+        # that sleeps while the window is minimized or unfocused
+        scheduler.attach(self.root)
 
-        # Init audio backends
-        init_sound()
-        init_bgm()
+        # (audio backends are initialised in _finish_startup, after the first frame)
 
         # Theme + sound state first
         saved_theme = get_meta("theme")
@@ -115,6 +96,7 @@ class HabitTrackerApp:
         except tk.TclError:
             pass
         self._apply_styles(style)
+        theme.on_theme_change(lambda: self._apply_styles(ttk.Style()))
 
         # ======== RUN BASELINE QUIZ FIRST ========
         needs_quiz = (get_meta("quiz_done") != "1")
@@ -123,7 +105,9 @@ class HabitTrackerApp:
         self.root.deiconify()
         self.root.update_idletasks()
 
+        startup.mark("window + styles")
         if needs_quiz:
+            from quiz import BaselineQuiz
             q = BaselineQuiz(self.root)  # should be a Toplevel
             try:
                 q.transient(self.root)   # tie to main window
@@ -170,13 +154,18 @@ class HabitTrackerApp:
         except Exception:
             self._prev_total_xp = 0
 
-        # Now build the rest of the UI
+        startup.mark("quiz / first day")
+
+        # Now build the rest of the UI: the shell + today's data first...
         self._build_ui()
+        startup.mark("build ui shell")
+        self._subscribe_refreshes()
         self.refresh_all(first=True)
-
-        # Start BGM only after quiz is done
-        if self.sound_enabled:
-            start_bgm_shuffle(volume=0.22, crossfade_ms=700)
+        startup.mark("load today")
+        self.root.update_idletasks()
+        startup.mark("first frame")
+        # ...then the shop, audio and background chores once that frame is up
+        self.root.after(0, self._finish_startup)
 
         # Clean shutdown so music thread stops
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -200,26 +189,36 @@ class HabitTrackerApp:
         except Exception:
             pass
 
-    # ---------- Shop / Items UI ----------
+    def _finish_startup(self):
+        """Second startup stage: things the first frame doesn't need."""
+        try:
+            self.journal.build_shop()
+        except Exception as e:
+            print(f"[startup] shop build failed: {e}")
+        startup.mark("shop")
+        try:
+            init_sound()
+            init_bgm()
+            # Start BGM only after quiz is done
+            if self.sound_enabled:
+                start_bgm_shuffle(volume=0.22, crossfade_ms=700)
+        except Exception as e:
+            print(f"[startup] audio init failed: {e}")
+        startup.mark("audio")
+        self._resume_challenges()
+        startup.report()
+
+    def _resume_challenges(self):
+        # the challenge module only loads if a challenge was left running
+        try:
+            if get_active_challenges():
+                from .parts_challenge import resume_challenges
+                resume_challenges(self)
+        except Exception as e:
+            print(f"[startup] challenge check failed: {e}")
+        startup.mark("challenges")
 
-    def _get_challenge_pool(self):
-        # cache so we don’t re-read the file every click
-        if not hasattr(self, "_challenge_pool_cache"):
-            csv_pool = _load_challenge_pool_from_csv()
-            if csv_pool:
-                self._challenge_pool_cache = csv_pool
-            else:
-                # fallback to your current inline list
-                self._challenge_pool_cache = [
-                    ("Do 45 pushups",               "Physical", 30, 3, 2),
-                    ("Go for a 1-hour walk",        "Physical", 60, 3, 2),
-                    ("30 min deep work (no phone)", "Mindful",  30, 3, 2),
-                    ("20 min meditation + journal", "Spiritual",30, 3, 2),
-                    ("Read 20 pages",               "Intellect",40, 3, 2),
-                    ("Call someone you care about", "Social",   10, 2, 1),
-                    ("Complete a nagging chore",    "Integrity",25, 3, 2),
-                ]
-        return self._challenge_pool_cache
+    # ---------- Shop / Items UI ----------
 
     def _clamp_to_allowed_range(self, d: date) -> date:
         today = date.today()
@@ -266,7 +265,7 @@ class HabitTrackerApp:
         self.stats = StatsPanel(left)
         self.stats.pack(side="top", fill="x", padx=4, pady=(0, 8))
 
-        self.journal = JournalPanel(left, on_save=self.save_journal)
+        self.journal = JournalPanel(left, on_save=self.save_journal, on_autosave=self.autosave_journal)
         self.journal.pack(side="top", fill="both", expand=True, padx=4, pady=(0, 4))
 
         self.dd_panel = DailyDoublePanel(left)
@@ -302,176 +301,98 @@ class HabitTrackerApp:
         self.actions.pack(fill="x", pady=10)
     
 
-    # --- Calendar popup (only clickable on days that have entries) ---
+    # --- Calendar popup (heatmap; only clickable on days that have entries) ---
     def open_calendar_popup(self):
-        import calendar as _cal
         from datetime import date as _date
 
         first_day = getattr(self, "first_day", _date.today())
         today = _date.today()
 
-        # We depend on this DB helper; fall back gracefully if missing.
-        try:
-            from database import get_logged_days_in_range
-        except Exception:
-            def get_logged_days_in_range(a, b):  # pragma: no cover
-                return set()
-
         # Start from the month currently displayed in the app
-        showing = _date(self.current_date.year, self.current_date.month, 1)
+        view = {"mode": "month", "year": self.current_date.year, "month": self.current_date.month}
 
         # ---- Window shell ----
         win = tk.Toplevel(self.root)
         win.title("Pick a day")
         win.configure(bg=COLORS["BG"])
-        win.geometry("380x360")
         win.grab_set()
         try:
             win.transient(self.root)
         except Exception:
             pass
 
-        # ---- helpers ----
-        def _month_bounds(d0: _date) -> tuple[_date, _date]:
-            _, ndays = _cal.monthrange(d0.year, d0.month)
-            first = _date(d0.year, d0.month, 1)
-            last  = _date(d0.year, d0.month, ndays)
-            if first < first_day: first = first_day
-            if last > today: last = today
-            return first, last
-
-        def _tile(parent, text, *, enabled=False, on_click=None, is_today=False):
-            """
-            Small bordered tile that looks the same on all platforms.
-            """
-            wrap = tk.Frame(parent, bg=COLORS["BG"])
-            wrap.pack(side="left", padx=3, pady=3)
-
-            border_color = COLORS["CARD"] if not enabled else COLORS["PRIMARY"]
-            brd = tk.Frame(
-                wrap, bg=COLORS["BG"],
-                highlightthickness=1 if enabled else 0,
-                highlightbackground=border_color,
-                highlightcolor=border_color,
-                bd=0,
-            )
-            brd.pack()
-
-            bg = COLORS["CARD"]
-            fg = COLORS["MUTED"] if not enabled else COLORS["TEXT"]
-
-            if is_today and enabled:
-                # subtle ring to mark today
-                brd.configure(highlightthickness=2, highlightbackground=COLORS["ACCENT"])
+        def _jump(target):
+            self.current_date = target
+            self.refresh_all()
+            try: win.destroy()
+            except Exception: pass
 
-            lbl = tk.Label(
-                brd, text=text, width=3,
-                font=FONTS["body"], bg=bg, fg=fg,
-                padx=8, pady=6,
-            )
-            lbl.pack()
-
-            if enabled and on_click:
-                def _hover(_e=None):
-                    lbl.configure(bg=COLORS["PRIMARY"], fg=COLORS.get("PRIMARY_TEXT", COLORS["WHITE"]))
-                    brd.configure(highlightbackground=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]))
-                def _leave(_e=None):
-                    lbl.configure(bg=bg, fg=COLORS["TEXT"])
-                    brd.configure(highlightbackground=COLORS["PRIMARY"])
-                for w in (brd, lbl):
-                    w.bind("<Enter>", _hover)
-                    w.bind("<Leave>", _leave)
-                    w.bind("<Button-1>", lambda _e: on_click())
-            return wrap
+        def _open_month(year, month):
+            view.update(mode="month", year=year, month=month)
+            _render()
 
         # ---- Header ----
         header = tk.Frame(win, bg=COLORS["BG"]); header.pack(fill="x", pady=(8, 6))
         title_var = tk.StringVar()
 
-        def _render_title():
-            title_var.set(showing.strftime("%B %Y"))
-
-        def _prev_month():
-            nonlocal showing
-            y, m = showing.year, showing.month
-            y, m = (y - 1, 12) if m == 1 else (y, m - 1)
-            # stop if entire month is before first_day
-            if _date(y, m, _cal.monthrange(y, m)[1]) < first_day:
-                return
-            showing = _date(y, m, 1)
-            _render_month()
-
-        def _next_month():
-            nonlocal showing
-            y, m = showing.year, showing.month
-            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
-            # stop if month would be after today's month
-            if _date(y, m, 1) > _date(today.year, today.month, 1):
-                return
-            showing = _date(y, m, 1)
-            _render_month()
+        def _step(delta):
+            y, m = view["year"], view["month"]
+            if view["mode"] == "year":
+                y += delta
+                if y < first_day.year or y > today.year:
+                    return
+            else:
+                m += delta
+                y, m = (y - 1, 12) if m == 0 else ((y + 1, 1) if m == 13 else (y, m))
+                # stop before first_day's month / after today's month
+                if (y, m) < (first_day.year, first_day.month) or (y, m) > (today.year, today.month):
+                    return
+            view.update(year=y, month=m)
+            _render()
+
+        def _toggle_mode():
+            view["mode"] = "year" if view["mode"] == "month" else "month"
+            _render()
 
-        prev_b = RoundButton(
+        RoundButton(
             header, "◀",
             fill=COLORS["CARD"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
-            fg=COLORS["TEXT"], padx=10, pady=6, radius=12, command=_prev_month
-        ); prev_b.pack(side="left", padx=8)
+            fg=COLORS["TEXT"], padx=10, pady=6, radius=12, command=lambda: _step(-1)
+        ).pack(side="left", padx=8)
 
         tk.Label(header, textvariable=title_var, font=FONTS["h2"], bg=COLORS["BG"], fg=COLORS["TEXT"])\
             .pack(side="left", padx=8)
 
-        next_b = RoundButton(
+        RoundButton(
             header, "▶",
             fill=COLORS["CARD"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
-            fg=COLORS["TEXT"], padx=10, pady=6, radius=12, command=_next_month
-        ); next_b.pack(side="left", padx=8)
-
-        # Weekday row
-        wk = tk.Frame(win, bg=COLORS["BG"]); wk.pack(fill="x", pady=(0, 4))
-        for wd in ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"):
-            tk.Label(wk, text=wd, width=4, font=FONTS["small"], bg=COLORS["BG"], fg=COLORS["MUTED"])\
-                .pack(side="left", padx=2)
-
-        grid = tk.Frame(win, bg=COLORS["BG"]); grid.pack(fill="both", expand=True, padx=8, pady=4)
-
-        # ---- Month grid ----
-        def _render_month():
-            for w in grid.winfo_children():
-                w.destroy()
-            _render_title()
-
-            m_first, m_last = _month_bounds(showing)
-            available = set()
-            if m_first <= m_last:
-                available = get_logged_days_in_range(m_first.isoformat(), m_last.isoformat())
-
-            cal = _cal.Calendar(firstweekday=0)  # Monday = 0
-            for week in cal.monthdayscalendar(showing.year, showing.month):
-                row = tk.Frame(grid, bg=COLORS["BG"]); row.pack()
-                for dnum in week:
-                    if dnum == 0:
-                        tk.Label(row, text="  ", width=4, bg=COLORS["BG"]).pack(side="left", padx=3, pady=3)
-                        continue
-
-                    d = _date(showing.year, showing.month, dnum)
-                    in_window = first_day <= d <= today
-                    d_iso = d.isoformat()
-                    is_clickable = in_window and (d_iso in available)
-                    is_today = (d == today)
-
-                    if is_clickable:
-                        def _jump(target=d):
-                            self.current_date = target
-                            self.refresh_all()
-                            try: win.destroy()
-                            except Exception: pass
-                        _tile(row, f"{dnum}", enabled=True, on_click=_jump, is_today=is_today)
-                    else:
-                        _tile(row, f"{dnum}", enabled=False)
-
-        _render_month()
-
-    # ---------- Styles ----------
+            fg=COLORS["TEXT"], padx=10, pady=6, radius=12, command=lambda: _step(1)
+        ).pack(side="left", padx=8)
+
+        mode_btn = RoundButton(
+            header, "Year",
+            fill=COLORS["CARD"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
+            fg=COLORS["TEXT"], padx=10, pady=6, radius=12, command=_toggle_mode
+        )
+        mode_btn.pack(side="right", padx=8)
+
+        heat = CalendarHeatmap(win, first_day=first_day, on_pick=_jump, on_month=_open_month)
+        heat.pack(padx=8, pady=(0, 10))
+
+        def _render():
+            if view["mode"] == "year":
+                title_var.set(str(view["year"]))
+                heat.show_year(view["year"])
+            else:
+                title_var.set(_date(view["year"], view["month"], 1).strftime("%B %Y"))
+                heat.show_month(view["year"], view["month"])
+            try:
+                mode_btn.set_text("Month" if view["mode"] == "year" else "Year")
+            except Exception:
+                pass
+
+        _render()
+
     def _apply_styles(self, style: ttk.Style):
         style.configure(
             "Treeview",
@@ -505,7 +426,51 @@ class HabitTrackerApp:
             pass
 
     # ---------- Refresh ----------
+    # event family -> UI parts that read that data (see events.py)
+    _REFRESH_ON = {
+        "entries": ("logs",),
+        "attributes": ("stats",),
+        "xp": ("xp",),
+        "wallet": ("wallet",),
+        "contracts": ("contracts",),
+        "effects": ("effects",),
+        "dailydouble": ("dailydouble",),
+    }
+
+    def _subscribe_refreshes(self):
+        self._dirty_parts = set()
+        self._refresh_pending = False
+        for family in self._REFRESH_ON:
+            subscribe(family, self._on_data_changed)
+
+    def _on_data_changed(self, topic, **payload):
+        family = topic.split(":", 1)[0]
+        # entries/daily double of another day don't affect what is on screen
+        day = payload.get("date") or payload.get("day")
+        if day and day != self.current_date.isoformat():
+            return
+        self._dirty_parts.update(self._REFRESH_ON.get(family, ()))
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            try:
+                self.root.after_idle(self._flush_refreshes)
+            except Exception:
+                self._refresh_pending = False
+
+    def _flush_refreshes(self):
+        """Redraw only the parts whose data changed since the last idle (coalesced)."""
+        self._refresh_pending = False
+        parts, self._dirty_parts = self._dirty_parts, set()
+        for part in ("stats", "logs", "dailydouble", "xp", "contracts", "wallet", "effects"):
+            if part in parts:
+                try:
+                    getattr(self, f"_refresh_{part}")()
+                except Exception as e:
+                    print(f"[refresh] {part} failed: {e}")
+
     def refresh_all(self, first=False):
+        """Full reload: first paint, date navigation and theme rebuilds.
+        Data writes after that refresh only the affected parts via events."""
         self.current_date = self._clamp_to_allowed_range(self.current_date)
         is_today = (self.current_date == date.today())
         self.topbar.set_date(self.current_date, is_today)
@@ -520,6 +485,37 @@ class HabitTrackerApp:
         except Exception:
             pass
 
+        self._refresh_stats()
+        self._refresh_logs()
+
+        day = self.current_date.isoformat()
+        self.journal.flush_autosave()
+        # a write still queued for this day is newer than its DB row: show that
+        # text rather than waiting on the writer (args are (day, text))
+        queued = journal_writes.peek(day)
+        content = queued[1] if queued else (get_journal(day) or "")
+        self.journal.set_text(content, editable=is_today, doc=day)
+        try:
+            self.journal.set_prompt(get_prompt_for_date(day))
+        except Exception:
+            pass
+
+        self._refresh_dailydouble()
+        self.actions.enable(is_today)
+        self._refresh_xp(first=first)
+        self._refresh_contracts()
+        try:
+            self.actions.set_sound_state(self.sound_enabled)
+        except Exception:
+            pass
+        self._refresh_wallet()
+        if not first:
+            self._refresh_effects()
+        # a full reload already covers anything queued so far
+        if hasattr(self, "_dirty_parts"):
+            self._dirty_parts.clear()
+
+    def _refresh_stats(self):
         # Baselines overlay
         try:
             self.stats.set_baselines(get_baselines())
@@ -536,25 +532,19 @@ class HabitTrackerApp:
         avg = average_stat({t: stats.get(t, {}).get("score", STAT_MIN) for t in POSITIVE_TRAITS})
         self.topbar.set_rank(f"Rank: {compute_rank(avg)}  •  Avg {avg}")
 
-        records = get_entries_by_date(self.current_date.isoformat())
-        self.logs.load(records)
-
+    def _refresh_logs(self):
         day = self.current_date.isoformat()
-        content = get_journal(day) or ""
-        self.journal.set_text(content, editable=is_today)
-        try:
-            self.journal.set_prompt(get_prompt_for_date(day))
-        except Exception:
-            pass
+        self.logs.load(get_entries_by_date(day), day=day)
 
+    def _refresh_dailydouble(self):
+        day = self.current_date.isoformat()
         dd = get_daily_double(day)
         if not dd:
             dd = {"atone": random.choice(POSITIVE_TRAITS), "sin": random.choice(SINS)}
             set_daily_double(day, dd["atone"], dd["sin"])
         self.dd_panel.set_values(dd["atone"], dd["sin"])
 
-        self.actions.enable(is_today)
-
+    def _refresh_xp(self, first=False):
         total = get_total_xp()
         try:
             # XP -> coin drip: 1 coin per 50 XP gained since last refresh
@@ -564,7 +554,7 @@ class HabitTrackerApp:
                 coins_to_award = xp_delta // 50
                 # add_coins returns applied amount
                 try:
-                    added = add_coins(int(coins_to_award))
+                    added = add_coins(int(coins_to_award), reason='xp_drip')
                 except Exception:
                     added = 0
             self._prev_total_xp = total
@@ -576,14 +566,13 @@ class HabitTrackerApp:
         self.xpstrip.set_level(lvl, in_lvl, need, animate_from=(0 if first else self.prev_xp_in_level))
         self.prev_xp_in_level = in_lvl
 
+    def _refresh_contracts(self):
         try:
             self.actions.set_contracts_badge(get_available_offers_count())
         except Exception:
             pass
-        try:
-            self.actions.set_sound_state(self.sound_enabled)
-        except Exception:
-            pass
+
+    def _refresh_wallet(self):
         # Update topbar currency display
         try:
             if hasattr(self, "topbar"):
@@ -591,6 +580,14 @@ class HabitTrackerApp:
         except Exception:
             pass
 
+    def _refresh_effects(self):
+        # journal's Active Effects bar
+        try:
+            if hasattr(self, 'journal') and hasattr(self.journal, '_populate_boost_bar'):
+                self.journal._populate_boost_bar()
+        except Exception:
+            pass
+
     # API for other components to request a currency refresh
     def update_currency_display(self):
         try:
@@ -641,291 +638,22 @@ class HabitTrackerApp:
         self.current_date = date.today()
         self.refresh_all()
 
-    # --- RANDOM CHALLENGE ---
-    def open_random_challenge(self):
-        # Only for today
-        if self.current_date != date.today():
-            messagebox.showinfo("Random Challenge", "You can only start a challenge on today's page.")
-            return
-
-        # (title, trait, minutes, reward_pts, penalty_pts)
-        pool = self._get_challenge_pool()
-        title, trait, minutes, reward_pts, penalty_pts = random.choice(pool)
-
-        # Daily Double multiplier (if today's atone matches)
-        try:
-            dd = get_daily_double(date.today().isoformat())
-        except Exception:
-            dd = None
-        mult = 2 if dd and dd.get("atone") == trait else 1
-        reward_pts_eff = reward_pts * mult
-        penalty_pts_eff = penalty_pts * mult
-
-        # Check for contract focus (for XP boosts)
-        has_contract = False  # TODO: wire up if contract for trait is active
-        is_dd = bool(dd and dd.get("atone") == trait)
-
-        win = tk.Toplevel(self.root)
-        win.title("Random Challenge")
-        win.configure(bg=COLORS["BG"])
-        win.geometry("420x260")
-        win.grab_set()
-        try:
-            win.transient(self.root)
-        except Exception:
-            pass
-
-        tk.Label(win, text="Random Challenge", font=FONTS["h2"], bg=COLORS["BG"], fg=COLORS["TEXT"]).pack(pady=(12, 8))
-        tk.Label(win, text=title, font=FONTS["h3"], bg=COLORS["BG"], fg=COLORS["TEXT"]).pack(pady=(0, 6))
-        tk.Label(
-            win, text=f"Trait: {trait}  •  Duration: {minutes} min",
-            font=FONTS["small"], bg=COLORS["BG"], fg=COLORS["MUTED"]
-        ).pack(pady=(0, 8))
-
-        timer_lbl = tk.Label(
-            win, text=f"{minutes:02d}:00", font=("Helvetica", 18, "bold"),
-            bg=COLORS["BG"], fg=COLORS["PRIMARY"]
-        )
-        timer_lbl.pack(pady=(4, 10))
-
-        btn_row = tk.Frame(win, bg=COLORS["BG"])
-        btn_row.pack(pady=8)
-
-        # --- Challenge helpers (Time Cushion / Safe Decline) ---
-        helper_row = tk.Frame(win, bg=COLORS["BG"])
-        helper_row.pack(pady=(0, 6))
-        try:
-            from shop.effects import effects as _effects
-            cushion_avail = _effects.get_challenge_time_cushion()
-            safe_declines = _effects.get_challenge_safe_decline_count()
-        except Exception:
-            cushion_avail = 0
-            safe_declines = 0
-
-        def _use_time_cushion():
-            try:
-                # consume up to 300s and add to current timer
-                used = _effects.consume_challenge_time_cushion(300)
-                nonlocal seconds_left
-                seconds_left += used
-                try:
-                    timer_lbl.config(text=fmt(seconds_left))
-                except Exception:
-                    pass
-            except Exception:
-                pass
-
-        def _use_safe_decline():
-            try:
-                ok = _effects.use_challenge_safe_decline()
-                if ok:
-                    # Close without penalty and do not spawn a new challenge
-                    stop_timer(); win.destroy();
-            except Exception:
-                pass
-
-        if cushion_avail > 0:
-            RoundButton(helper_row, f"Use Time Cushion (+{int(cushion_avail//60)}m)", fill=COLORS["ACCENT"], fg=COLORS["WHITE"], command=_use_time_cushion, padx=10, pady=6, radius=8).pack(side="left", padx=8)
-        if safe_declines > 0:
-            RoundButton(helper_row, f"Safe Decline ({safe_declines})", fill=COLORS["ACCENT"], fg=COLORS["WHITE"], command=_use_safe_decline, padx=10, pady=6, radius=8).pack(side="left", padx=8)
-
-        # State for countdown
-        seconds_left = minutes * 60
-        ticking_id = {"id": None}
-        running = {"started": False, "finished": False}
-
-        def fmt(sec):
-            m, s = divmod(max(0, sec), 60)
-            return f"{int(m):02d}:{int(s):02d}"
-
-        def stop_timer():
-            _id = ticking_id["id"]
-            if _id is not None:
-                try:
-                    win.after_cancel(_id)
-                except Exception:
-                    pass
-                ticking_id["id"] = None
-
-        def tick():
-            if running["finished"]:
-                return
-            nonlocal seconds_left
-            seconds_left -= 1
-            timer_lbl.config(text=fmt(seconds_left))
-            if seconds_left <= 0:
-                # Auto-fail
-                return on_fail(auto=True)
-            ticking_id["id"] = win.after(1000, tick)
-
-        def on_accept():
-            if running["started"]:
-                return
-            running["started"] = True
-            # Swap buttons to Complete / Give Up
-            for w in btn_row.winfo_children():
-                w.destroy()
-            RoundButton(
-                btn_row, "Complete",
-                fill=COLORS["PRIMARY"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
-                fg=COLORS.get("PRIMARY_TEXT", COLORS["WHITE"]),
-                padx=16, pady=10, radius=14, command=on_complete
-            ).pack(side="left", padx=8)
-            RoundButton(
-                btn_row, "Give Up",
-                fill=COLORS["ACCENT"], hover_fill=COLORS.get("ACCENT_HOVER", COLORS["ACCENT"]),
-                fg=COLORS.get("ACCENT_TEXT", COLORS["WHITE"]),
-                padx=16, pady=10, radius=14, command=on_fail
-            ).pack(side="left", padx=8)
-            # Start countdown
-            timer_lbl.config(text=fmt(seconds_left))
-            ticking_id["id"] = win.after(1000, tick)
-
-        def on_decline():
-            stop_timer()
-            win.destroy()
-
-        def on_complete():
-            if running["finished"]:
-                return
-            running["finished"] = True
-            stop_timer()
-
-            # Record success as an ATONE on the mapped trait
-            today_iso = date.today().isoformat()
-            try:
-                insert_entry(today_iso, "ATONE", trait, f"Challenge: {title}", reward_pts_eff)
-                update_attribute_score(trait, reward_pts_eff)
-            except Exception:
-                pass
-
-            # XP with effects engine — use compute_xp_gain to get boost delta
-            try:
-                from .leveling import compute_xp_gain
-                # compute_xp_gain will detect 'challenge' in the item string
-                xp_res = compute_xp_gain(trait, trait, f"Challenge: {title}", reward_pts_eff, is_daily_double=is_dd)
-                try:
-                    xp_gain, boost_delta, boost_pct = xp_res
-                except Exception:
-                    try:
-                        xp_gain, boost_delta = xp_res
-                        boost_pct = 0
-                    except Exception:
-                        xp_gain = int(xp_res)
-                        boost_delta = 0
-                        boost_pct = 0
-
-                before = level_from_xp(get_total_xp())
-                after_total = add_total_xp(xp_gain)
-                after = level_from_xp(after_total)
-                try:
-                    if hasattr(self, 'xpstrip'):
-                        if boost_delta:
-                            self.xpstrip.set_boost_info(f"+{boost_delta} XP")
-                        elif boost_pct:
-                            self.xpstrip.set_boost_info(f"+{boost_pct}%")
-                        else:
-                            self.xpstrip.set_boost_info(None)
-                except Exception:
-                    pass
-                if after > before:
-                    try:
-                        play_sfx("levelUp")
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-            # SFX positive
-            try:
-                play_sfx("statsUp")
-            except Exception:
-                pass
-            # Currency rewards for completing a challenge
-            try:
-                from shop.currency import add_coins, add_shards
-                # award coins proportional to reward_pts_eff (e.g., 1 coin per 10 reward pts)
-                try:
-                    coins_to_award = max(1, int(round(reward_pts_eff / 10)))
-                    add_coins(coins_to_award)
-                except Exception:
-                    pass
-                # occasionally award shard (small chance) — if reward is high
-                try:
-                    if reward_pts_eff >= 100:
-                        add_shards(1)
-                except Exception:
-                    pass
-            except Exception:
-                pass
-
-            self.refresh_all()
-            messagebox.showinfo("Challenge", "Completed! Nice work.")
-            win.destroy()
-
-        def on_fail(auto: bool = False):
-            if running["finished"]:
-                return
-            running["finished"] = True
-            stop_timer()
-
-            today_iso = date.today().isoformat()
-            try:
-                # Log as a fail; decrement same trait to keep it intuitive
-                # Use effects engine for penalty reduction
-                reduced_penalty = effects.reduce_sin_penalty(
-                    sin_name="Challenge fail",
-                    mapped_trait=trait,
-                    penalty_points=penalty_pts_eff
-                )
-                insert_entry(today_iso, "SIN", f"Challenge fail ({trait})", f"Failed: {title}", -reduced_penalty)
-                update_attribute_score(trait, -reduced_penalty)
-            except Exception:
-                pass
-
-            # XP penalty
-            try:
-                add_total_xp(-penalty_pts_eff * 10)
-            except Exception:
-                pass
-
-            # SFX negative
-            try:
-                play_sfx("statsDown")
-            except Exception:
-                pass
-
-            self.refresh_all()
-            message = "Time's up — challenge failed." if auto else "Challenge failed."
-            messagebox.showinfo("Challenge", message)
-            win.destroy()
-
-        # Initial buttons (Accept / Decline)
-        RoundButton(
-            btn_row, "Accept",
-            fill=COLORS["PRIMARY"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
-            fg=COLORS.get("PRIMARY_TEXT", COLORS["WHITE"]),
-            padx=16, pady=10, radius=14, command=on_accept
-        ).pack(side="left", padx=8)
-        RoundButton(
-            btn_row, "Decline",
-            fill=COLORS["CARD"], hover_fill=COLORS.get("ACCENT_HOVER", COLORS["ACCENT"]),
-            fg=COLORS["TEXT"], padx=16, pady=10, radius=14, command=on_decline
-        ).pack(side="left", padx=8)
-
-        # Clean up timer if window is closed
-        def _on_close():
-            stop_timer()
-            win.destroy()
-        win.protocol("WM_DELETE_WINDOW", _on_close)
-
     # ---------- Delegates to split parts ----------
+    # (logger/contracts/challenge windows are imported on first use to keep them off the startup path)
     def open_logger(self):
+        from .parts_logger import open_logger as _open_logger
         return _open_logger(self)
 
+    def open_random_challenge(self):
+        from .parts_challenge import open_random_challenge as _open_random_challenge
+        return _open_random_challenge(self)
+
     def save_journal(self, text: str):
         return _save_journal(self, text)
 
+    def autosave_journal(self, day_iso: str, text: str):
+        return _autosave_journal(self, day_iso, text)
+
     def open_atone_dialog(self):
         return _open_atone_dialog(self)
 
@@ -933,6 +661,7 @@ class HabitTrackerApp:
         return _open_sin_dialog(self)
 
     def open_contracts(self):
+        from .parts_contracts import open_contracts as _open_contracts
         return _open_contracts(self)
 
     # ---------- Theme ----------
@@ -957,10 +686,11 @@ class HabitTrackerApp:
             name = var.get()
             if name not in PALETTES:
                 return
+            old = theme.snapshot()
             set_theme(name)
             set_meta("theme", name)
-            self._rebuild_ui()
             win.destroy()
+            self._apply_theme(old)
 
         RoundButton(
             win, "Apply Theme",
@@ -971,6 +701,15 @@ class HabitTrackerApp:
             command=apply_and_close
         ).pack(pady=14)
 
+    def _apply_theme(self, old_colors):
+        """Re-color the live UI in place (no rebuild, no data reload)."""
+        try:
+            theme.apply(self.root, old_colors)
+        except Exception as e:
+            # last resort: the old full rebuild
+            print(f"[theme] in-place switch failed, rebuilding: {e}")
+            self._rebuild_ui()
+
     def _rebuild_ui(self):
         for w in self.root.winfo_children():
             w.destroy()
@@ -982,10 +721,21 @@ class HabitTrackerApp:
             pass
         self._apply_styles(style)
         self._build_ui()
+        self.journal.build_shop()
         self.refresh_all(first=False)
 
     # ---------- Cleanup ----------
     def _on_close(self):
+        try:
+            self.journal.flush_autosave()
+            journal_writes.flush()
+        except Exception:
+            pass
+        try:
+            # don't leave the last boost change to the debounce timer / atexit
+            effects.flush(snapshot=True)
+        except Exception as e:
+            print(f"[effects] flush on close failed: {e}")
         try:
             stop_bgm()
         finally:
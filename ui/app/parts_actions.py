@@ -12,19 +12,66 @@ from database import (
     get_attributes, update_attribute_score, get_journal, upsert_journal, get_meta, set_meta
 )
 from exp_system import level_from_xp, get_total_xp, add_total_xp
-from shop.currency import add_coins, add_shards
+from shop.currency import wallet
+from writequeue import journal_writes
 from widgets import RoundButton
 from ..dialogs import ask_action
 from sound import play_sfx
 from .leveling import compute_xp_gain, update_streak_on_action
 
 # --- Journal ---
+WRITE_POLL_MS = 50   # how often the Tk thread collects finished journal writes
+
+def _watch_journal_writes(self):
+    """Run finished journal writes' on_done callbacks on the Tk thread.
+    Polls only while the queue has something pending."""
+    if getattr(self, "_journal_poll_job", None) is not None:
+        return
+
+    def _poll():
+        self._journal_poll_job = None
+        busy = journal_writes.pending()
+        journal_writes.drain()
+        if busy:
+            _watch_journal_writes(self)
+    self._journal_poll_job = self.root.after(WRITE_POLL_MS, _poll)
+
+def autosave_journal(self, day_iso: str, text: str) -> bool:
+    """Debounced snapshot from the journal box: queue the write, latest text per day wins.
+    Returns False (nothing queued) once `day_iso` is no longer today; the panel is
+    told whether the write landed once it ran."""
+    from datetime import date
+    if day_iso != date.today().isoformat():
+        return False
+    text = text.strip()
+
+    def _done(ok):
+        if ok:
+            self.journal.note_saved(text, doc=day_iso, note="Autosaved.")
+        else:
+            self.journal.note_save_failed(doc=day_iso)
+    journal_writes.submit(day_iso, upsert_journal, day_iso, text, on_done=_done)
+    _watch_journal_writes(self)
+    return True
+
 def save_journal(self, text: str):
     from datetime import date
     if self.current_date != date.today():
         return
-    upsert_journal(self.current_date.isoformat(), text.strip())
-    self.journal.note_saved()
+    day = self.current_date.isoformat()
+
+    def _done(ok):
+        if not ok:
+            self.journal.note_save_failed(doc=day)
+            return
+        self.journal.note_saved(text.strip(), doc=day)
+        _journal_saved(self, text)
+    # through the same queue so an older queued autosave can't land after this
+    journal_writes.submit(day, upsert_journal, day, text.strip(), on_done=_done)
+    _watch_journal_writes(self)
+
+def _journal_saved(self, text: str):
+    """A manual save reached the DB: confirm it and count it toward the journal streak."""
     try:
         from animations import flash_widget
         flash_widget(self.journal.status_label, times=2, on="#C7F9CC")
@@ -49,7 +96,7 @@ def save_journal(self, text: str):
             # award 20 coins every 5 qualifying days
             if cur % 5 == 0:
                 try:
-                    add_coins(20)
+                    wallet.transact([('coins', 20)], reason='journal_streak')
                     try: play_sfx('bought')
                     except Exception: pass
                     # show small popup to notify user
@@ -172,16 +219,15 @@ def _handle_action(self, kind: str):
             # Assumption: award small coins proportional to points logged (20% of pts, min 1)
             coins_awarded = max(1, int(abs(pts) * 0.2))
             try:
-                add_coins(coins_awarded)
+                wallet.transact([('coins', coins_awarded)], reason='atone')
             except Exception:
                 pass
     except Exception:
         pass
 
-    # Update UI and show boost delta on XP strip if available
+    # Show boost delta on XP strip if available
+    # (logs/stats/XP/wallet redraw from the data events of the writes above)
     try:
-        # refresh core data
-        self.refresh_all()
         try:
             if hasattr(self, 'xpstrip'):
                 if boost_delta:
@@ -204,14 +250,14 @@ def _handle_action(self, kind: str):
         try:
             # award coins for leveling up (10 coins per level)
             lvl_delta = max(0, after_lvl - before_lvl)
-            if lvl_delta > 0:
-                try: add_coins(10 * lvl_delta)
-                except Exception: pass
             # every 5 levels grant a shard
             shards_now = after_lvl // 5
             shards_before = before_lvl // 5
+            legs = [('coins', 10 * lvl_delta)] if lvl_delta > 0 else []
             if shards_now > shards_before:
-                try: add_shards(shards_now - shards_before)
+                legs.append(('shards', shards_now - shards_before))
+            if legs:
+                try: wallet.transact(legs, reason='level_up', ref=str(after_lvl))
                 except Exception: pass
         except Exception:
             pass
@@ -0,0 +1,502 @@
+# ui/app/parts_challenge.py
+# Random challenges: offer window, running timer, rewards and penalties.
+#
+# An accepted challenge is a row in the `challenges` table with a wall-clock
+# deadline. Remaining time is always deadline - now (nothing counts down, so
+# nothing drifts), and a challenge keeps running when its window is closed or
+# the app restarts. The window's timer repaints once per displayed second and
+# only while it is visible. The soonest deadline is armed with a plain
+# root.after (not the shared scheduler, which sleeps while the app is
+# minimized or unfocused), so a challenge fails on time even when the user is
+# in another app; resume_challenges() settles the ones that ran out while the
+# app was closed.
+import csv
+import math
+import random
+import time
+import tkinter as tk
+from datetime import date, datetime
+from pathlib import Path
+from tkinter import messagebox
+
+from constants import COLORS, FONTS
+from database import (
+    insert_entry, update_attribute_score, get_daily_double,
+    start_challenge, get_active_challenges, extend_challenge, resolve_challenge,
+)
+from exp_system import level_from_xp, get_total_xp, add_total_xp
+from scheduler import scheduler
+from shop.effects import effects
+from sound import play_sfx
+from widgets import RoundButton
+
+# ---------------- Random challenge pool (CSV optional) ----------------
+CHALLENGE_CSV = Path("data/random_challenges.csv")
+
+# (title, trait, minutes, reward_pts, penalty_pts) when the CSV is missing
+DEFAULT_POOL = [
+    ("Do 45 pushups",               "Physical", 30, 3, 2),
+    ("Go for a 1-hour walk",        "Physical", 60, 3, 2),
+    ("30 min deep work (no phone)", "Mindful",  30, 3, 2),
+    ("20 min meditation + journal", "Spiritual",30, 3, 2),
+    ("Read 20 pages",               "Intellect",40, 3, 2),
+    ("Call someone you care about", "Social",   10, 2, 1),
+    ("Complete a nagging chore",    "Integrity",25, 3, 2),
+]
+
+def _load_challenge_pool_from_csv():
+    if not CHALLENGE_CSV.exists():
+        return None
+    pool = []
+    with CHALLENGE_CSV.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                title = row["title"].strip()
+                trait = row["trait"].strip()
+                minutes = int(row["minutes"])
+                reward = int(row["reward_pts"])
+                penalty = int(row["penalty_pts"])
+            except Exception:
+                continue
+            pool.append((title, trait, minutes, reward, penalty))
+    return pool or None
+
+def _challenge_pool(self):
+    # cache so we don’t re-read the file every click
+    if not hasattr(self, "_challenge_pool_cache"):
+        self._challenge_pool_cache = _load_challenge_pool_from_csv() or list(DEFAULT_POOL)
+    return self._challenge_pool_cache
+
+def _recommender(self):
+    # built on first use; follows entry/attribute events from then on
+    if getattr(self, "_challenge_recommender", None) is None:
+        from .recommender import ChallengeRecommender
+        self._challenge_recommender = ChallengeRecommender(_challenge_pool(self)).start()
+    return self._challenge_recommender
+
+def _draw_offer(self, exclude=None):
+    """Pick a challenge for today (weighted by recent activity) with the Daily Double applied."""
+    exclude_tuple = None
+    if exclude:
+        exclude_tuple = (exclude["title"], exclude["trait"], exclude["minutes"],
+                         exclude["base_reward_pts"], exclude["base_penalty_pts"])
+    try:
+        pick = _recommender(self).draw(exclude=exclude_tuple)
+    except Exception as e:
+        print(f"[challenge] recommender failed, drawing uniformly: {e}")
+        pick = None
+    # (title, trait, minutes, reward_pts, penalty_pts)
+    title, trait, minutes, reward_pts, penalty_pts = pick or random.choice(_challenge_pool(self))
+
+    # Daily Double multiplier (if today's atone matches)
+    try:
+        dd = get_daily_double(date.today().isoformat())
+    except Exception:
+        dd = None
+    is_dd = bool(dd and dd.get("atone") == trait)
+    mult = 2 if is_dd else 1
+    return {
+        "title": title, "trait": trait, "minutes": minutes,
+        "reward_pts": reward_pts * mult, "penalty_pts": penalty_pts * mult,
+        "base_reward_pts": reward_pts, "base_penalty_pts": penalty_pts,
+        "daily_double": int(is_dd),
+    }
+
+
+# ---------------- Time ----------------
+def _remaining(ch) -> float:
+    return ch["deadline"] - time.time()
+
+def _fmt(sec):
+    # rounded up: a fresh 30 min challenge reads 30:00, and 00:00 means time's up
+    m, s = divmod(max(0, math.ceil(sec)), 60)
+    return f"{int(m):02d}:{int(s):02d}"
+
+def _watch_deadlines(self):
+    """Arm the one deadline timer for the soonest active challenge (or drop it)."""
+    job = getattr(self, "_challenge_deadline_job", None)
+    self._challenge_deadline_job = None
+    if job is not None:
+        try:
+            self.root.after_cancel(job)
+        except Exception:
+            pass
+    try:
+        active = get_active_challenges()
+    except Exception:
+        active = []
+    if not active:
+        return
+    delay_ms = int(max(0.0, _remaining(active[0])) * 1000) + 50
+    try:
+        self._challenge_deadline_job = self.root.after(delay_ms, lambda: _on_deadline(self))
+    except Exception as e:
+        print(f"[challenge] could not arm deadline: {e}")
+
+def _on_deadline(self):
+    self._challenge_deadline_job = None   # fired; nothing to cancel
+    _expire_overdue(self)
+
+def _expire_overdue(self, away: bool = False):
+    """Fail every active challenge past its deadline, then re-arm for the next one."""
+    failed = []
+    try:
+        now = time.time()
+        for ch in get_active_challenges():
+            if ch["deadline"] > now:
+                break
+            # penalty lands on the day the time ran out, not the day we noticed
+            day_iso = datetime.fromtimestamp(ch["deadline"]).date().isoformat()
+            if _fail(self, ch, day_iso):
+                failed.append(ch)
+    except Exception as e:
+        print(f"[challenge] expiry check failed: {e}")
+
+    win = getattr(self, "_challenge_win", None)
+    if win is not None and any(ch["id"] == win.challenge.get("id") for ch in failed):
+        _close_window(self)
+    _watch_deadlines(self)
+
+    if failed:
+        try:
+            play_sfx("statsDown")
+        except Exception:
+            pass
+        titles = ", ".join(f"“{ch['title']}”" for ch in failed)
+        if away:
+            messagebox.showinfo("Challenge", f"While you were away, {titles} ran out of time — challenge failed.")
+        else:
+            messagebox.showinfo("Challenge", "Time's up — challenge failed.")
+
+def resume_challenges(self):
+    """Startup: settle challenges that expired while the app was closed, watch the rest."""
+    _expire_overdue(self, away=True)
+
+
+# ---------------- Outcomes ----------------
+def _complete(self, ch) -> bool:
+    if not resolve_challenge(ch["id"], "completed"):
+        return False
+    title, trait, reward_pts = ch["title"], ch["trait"], ch["reward_pts"]
+
+    # Record success as an ATONE on the mapped trait
+    today_iso = date.today().isoformat()
+    try:
+        insert_entry(today_iso, "ATONE", trait, f"Challenge: {title}", reward_pts)
+        update_attribute_score(trait, reward_pts)
+    except Exception:
+        pass
+
+    # XP with effects engine — use compute_xp_gain to get boost delta
+    try:
+        from .leveling import compute_xp_gain
+        # compute_xp_gain will detect 'challenge' in the item string
+        xp_res = compute_xp_gain(trait, trait, f"Challenge: {title}", reward_pts,
+                                 is_daily_double=bool(ch["daily_double"]))
+        try:
+            xp_gain, boost_delta, boost_pct = xp_res
+        except Exception:
+            try:
+                xp_gain, boost_delta = xp_res
+                boost_pct = 0
+            except Exception:
+                xp_gain = int(xp_res)
+                boost_delta = 0
+                boost_pct = 0
+
+        before = level_from_xp(get_total_xp())
+        after_total = add_total_xp(xp_gain)
+        after = level_from_xp(after_total)
+        try:
+            if hasattr(self, 'xpstrip'):
+                if boost_delta:
+                    self.xpstrip.set_boost_info(f"+{boost_delta} XP")
+                elif boost_pct:
+                    self.xpstrip.set_boost_info(f"+{boost_pct}%")
+                else:
+                    self.xpstrip.set_boost_info(None)
+        except Exception:
+            pass
+        if after > before:
+            try:
+                play_sfx("levelUp")
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+    # SFX positive
+    try:
+        play_sfx("statsUp")
+    except Exception:
+        pass
+    # Currency rewards for completing a challenge
+    try:
+        from shop.currency import wallet
+        # award coins proportional to reward_pts (e.g., 1 coin per 10 reward pts)
+        coins_to_award = max(1, int(round(reward_pts / 10)))
+        legs = [('coins', coins_to_award)]
+        # occasionally award shard (small chance) — if reward is high
+        if reward_pts >= 100:
+            legs.append(('shards', 1))
+        wallet.transact(legs, reason='challenge')
+    except Exception:
+        pass
+    # logs/stats/XP/wallet redraw from the data events of the writes above
+    return True
+
+def _fail(self, ch, day_iso: str | None = None) -> bool:
+    if not resolve_challenge(ch["id"], "failed"):
+        return False
+    title, trait, penalty_pts = ch["title"], ch["trait"], ch["penalty_pts"]
+    day_iso = day_iso or date.today().isoformat()
+    try:
+        # Log as a fail; decrement same trait to keep it intuitive
+        # Use effects engine for penalty reduction
+        reduced_penalty = effects.reduce_sin_penalty(
+            sin_name="Challenge fail",
+            mapped_trait=trait,
+            penalty_points=penalty_pts
+        )
+        insert_entry(day_iso, "SIN", f"Challenge fail ({trait})", f"Failed: {title}", -reduced_penalty)
+        update_attribute_score(trait, -reduced_penalty)
+    except Exception:
+        pass
+
+    # XP penalty
+    try:
+        add_total_xp(-penalty_pts * 10)
+    except Exception:
+        pass
+    # logs/stats/XP redraw from the data events of the writes above
+    return True
+
+
+# ---------------- Window ----------------
+def _close_window(self):
+    win = getattr(self, "_challenge_win", None)
+    self._challenge_win = None
+    scheduler.cancel("challenge.repaint")
+    if win is not None:
+        try:
+            win.destroy()
+        except Exception:
+            pass
+
+def open_random_challenge(self):
+    win = getattr(self, "_challenge_win", None)
+    if win is not None and win.winfo_exists():
+        win.lift()
+        return
+
+    # A running challenge (even one whose window was closed) comes back instead of a new draw
+    _expire_overdue(self)
+    try:
+        active = get_active_challenges()
+    except Exception:
+        active = []
+    if active:
+        return _show_window(self, active[0])
+
+    # Only for today
+    if self.current_date != date.today():
+        messagebox.showinfo("Random Challenge", "You can only start a challenge on today's page.")
+        return
+
+    _show_window(self, _draw_offer(self))
+
+def _show_window(self, challenge):
+    """Offer window for a drawn challenge, or the running view of an accepted one (has an id)."""
+    title, trait, minutes = challenge["title"], challenge["trait"], challenge["minutes"]
+    state = {"bonus": challenge.pop("bonus", 0.0), "reroll_btn": None}   # bonus: time cushion used before Accept
+
+    win = tk.Toplevel(self.root)
+    win.title("Random Challenge")
+    win.configure(bg=COLORS["BG"])
+    win.geometry("420x290")
+    win.grab_set()
+    try:
+        win.transient(self.root)
+    except Exception:
+        pass
+    win.challenge = challenge
+    self._challenge_win = win
+
+    tk.Label(win, text="Random Challenge", font=FONTS["h2"], bg=COLORS["BG"], fg=COLORS["TEXT"]).pack(pady=(12, 8))
+    tk.Label(win, text=title, font=FONTS["h3"], bg=COLORS["BG"], fg=COLORS["TEXT"]).pack(pady=(0, 6))
+    tk.Label(
+        win, text=f"Trait: {trait}  •  Duration: {minutes} min",
+        font=FONTS["small"], bg=COLORS["BG"], fg=COLORS["MUTED"]
+    ).pack(pady=(0, 8))
+
+    timer_lbl = tk.Label(
+        win, text=_fmt(minutes * 60 + state["bonus"]), font=("Helvetica", 18, "bold"),
+        bg=COLORS["BG"], fg=COLORS["PRIMARY"]
+    )
+    timer_lbl.pack(pady=(4, 10))
+
+    btn_row = tk.Frame(win, bg=COLORS["BG"])
+    btn_row.pack(pady=8)
+
+    # --- Challenge helpers (Time Cushion / Safe Decline) ---
+    helper_row = tk.Frame(win, bg=COLORS["BG"])
+    helper_row.pack(pady=(0, 6))
+    note_lbl = tk.Label(win, text="", font=FONTS["small"], bg=COLORS["BG"], fg=COLORS["MUTED"])
+    note_lbl.pack(pady=(0, 6))
+    try:
+        cushion_avail = effects.get_challenge_time_cushion()
+        safe_declines = effects.get_challenge_safe_decline_count()
+        rerolls = effects.get_challenge_reroll_count()
+    except Exception:
+        cushion_avail = 0
+        safe_declines = 0
+        rerolls = 0
+
+    def repaint():
+        # wall-clock remaining; wakes again exactly when the shown second changes
+        if "id" not in challenge or not win.winfo_exists():
+            return
+        rem = _remaining(challenge)
+        timer_lbl.config(text=_fmt(rem))
+        if rem <= 0:
+            _expire_overdue(self)   # fails it and closes this window
+            return
+        if win.winfo_viewable():
+            next_change = rem - (math.ceil(rem) - 1)
+            scheduler.once("challenge.repaint", next_change * 1000 + 5, repaint, widget=timer_lbl)
+        # hidden: nothing to repaint until <Map> (the deadline timer still fires)
+
+    win.bind("<Map>", lambda e: repaint() if e.widget is win else None)
+
+    def _use_time_cushion():
+        try:
+            # consume up to 300s and add it to the deadline
+            used = effects.consume_challenge_time_cushion(300)
+            if not used:
+                return
+            if "id" in challenge:
+                deadline = extend_challenge(challenge["id"], used)
+                if deadline is not None:
+                    challenge["deadline"] = deadline
+                _watch_deadlines(self)
+                repaint()
+            else:
+                state["bonus"] += used
+                timer_lbl.config(text=_fmt(minutes * 60 + state["bonus"]))
+        except Exception:
+            pass
+
+    def _use_safe_decline():
+        try:
+            ok = effects.use_challenge_safe_decline()
+            if ok:
+                # Close without penalty and do not spawn a new challenge
+                if "id" in challenge:
+                    resolve_challenge(challenge["id"], "declined")
+                    _watch_deadlines(self)
+                _close_window(self)
+        except Exception:
+            pass
+
+    def _use_reroll():
+        # swap the offer for another weighted draw (never the same one if avoidable)
+        if "id" in challenge:
+            return
+        try:
+            if effects.use_challenge_reroll():
+                offer = _draw_offer(self, exclude=challenge)
+                offer["bonus"] = state["bonus"]   # a cushion already spent carries over
+                _close_window(self)
+                _show_window(self, offer)
+        except Exception as e:
+            print(f"[challenge] reroll failed: {e}")
+
+    if rerolls > 0 and "id" not in challenge:
+        state["reroll_btn"] = RoundButton(helper_row, f"Reroll ({rerolls})", fill=COLORS["ACCENT"], fg=COLORS["WHITE"], command=_use_reroll, padx=10, pady=6, radius=8)
+        state["reroll_btn"].pack(side="left", padx=8)
+    if cushion_avail > 0:
+        RoundButton(helper_row, f"Use Time Cushion (+{int(cushion_avail//60)}m)", fill=COLORS["ACCENT"], fg=COLORS["WHITE"], command=_use_time_cushion, padx=10, pady=6, radius=8).pack(side="left", padx=8)
+    if safe_declines > 0:
+        RoundButton(helper_row, f"Safe Decline ({safe_declines})", fill=COLORS["ACCENT"], fg=COLORS["WHITE"], command=_use_safe_decline, padx=10, pady=6, radius=8).pack(side="left", padx=8)
+
+    def show_running():
+        # Swap buttons to Complete / Give Up
+        for w in btn_row.winfo_children():
+            w.destroy()
+        RoundButton(
+            btn_row, "Complete",
+            fill=COLORS["PRIMARY"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
+            fg=COLORS.get("PRIMARY_TEXT", COLORS["WHITE"]),
+            padx=16, pady=10, radius=14, command=on_complete
+        ).pack(side="left", padx=8)
+        RoundButton(
+            btn_row, "Give Up",
+            fill=COLORS["ACCENT"], hover_fill=COLORS.get("ACCENT_HOVER", COLORS["ACCENT"]),
+            fg=COLORS.get("ACCENT_TEXT", COLORS["WHITE"]),
+            padx=16, pady=10, radius=14, command=on_fail
+        ).pack(side="left", padx=8)
+        if state["reroll_btn"] is not None:
+            state["reroll_btn"].destroy()
+            state["reroll_btn"] = None
+        note_lbl.config(text="Closing this window doesn't stop the timer.")
+        repaint()
+
+    def on_accept():
+        if "id" in challenge:
+            return
+        try:
+            row = start_challenge(title, trait, minutes, challenge["reward_pts"],
+                                  challenge["penalty_pts"], bool(challenge["daily_double"]))
+            if state["bonus"]:
+                row["deadline"] = extend_challenge(row["id"], state["bonus"]) or row["deadline"]
+        except Exception as e:
+            print(f"[challenge] could not start: {e}")
+            messagebox.showinfo("Random Challenge", "Could not start the challenge.", parent=win)
+            return
+        challenge.update(row)
+        _watch_deadlines(self)
+        show_running()
+
+    def on_decline():
+        _close_window(self)
+
+    def on_complete():
+        if _remaining(challenge) <= 0:
+            return _expire_overdue(self)   # too late: the deadline wins
+        _close_window(self)
+        done = _complete(self, challenge)
+        _watch_deadlines(self)
+        if done:
+            messagebox.showinfo("Challenge", "Completed! Nice work.")
+
+    def on_fail():
+        _close_window(self)
+        failed = _fail(self, challenge)
+        _watch_deadlines(self)
+        if failed:
+            # SFX negative
+            try:
+                play_sfx("statsDown")
+            except Exception:
+                pass
+            messagebox.showinfo("Challenge", "Challenge failed.")
+
+    if "id" in challenge:
+        show_running()
+    else:
+        # Initial buttons (Accept / Decline)
+        RoundButton(
+            btn_row, "Accept",
+            fill=COLORS["PRIMARY"], hover_fill=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]),
+            fg=COLORS.get("PRIMARY_TEXT", COLORS["WHITE"]),
+            padx=16, pady=10, radius=14, command=on_accept
+        ).pack(side="left", padx=8)
+        RoundButton(
+            btn_row, "Decline",
+            fill=COLORS["CARD"], hover_fill=COLORS.get("ACCENT_HOVER", COLORS["ACCENT"]),
+            fg=COLORS["TEXT"], padx=16, pady=10, radius=14, command=on_decline
+        ).pack(side="left", padx=8)
+
+    # Closing only hides a running challenge; the deadline timer keeps watching it
+    win.protocol("WM_DELETE_WINDOW", lambda: _close_window(self))
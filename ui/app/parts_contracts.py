@@ -76,14 +76,12 @@ def open_contracts(self):
                 messagebox.showinfo("Offer Beacon", "No Offer Beacons available.", parent=win)
                 return
             # consume one beacon
-            st = effects._state.setdefault('active', {})
-            st['offer_beacons'] = max(0, int(st.get('offer_beacons', 0)) - 1)
-            effects._save()
+            effects.consume('offer_beacons', 1, source='contract:offer_beacon')
             # generate today's offers (one-shot)
             from database import generate_daily_contracts_if_needed
             generate_daily_contracts_if_needed()
             messagebox.showinfo("Offer Beacon", "Generated new offers. Check Available tab.", parent=win)
-            refresh_views(); self.refresh_all()
+            refresh_views()
         except Exception as e:
             messagebox.showwarning("Offer Beacon", f"Failed to use Offer Beacon: {e}", parent=win)
 
@@ -156,7 +154,6 @@ def open_contracts(self):
                     )
 
                     refresh_views()
-                    self.refresh_all()
 
                 RoundButton(box, "Mark Broken",
                             fill=COLORS["ACCENT"], hover_fill=COLORS.get("ACCENT_HOVER", COLORS["ACCENT"]),
@@ -188,13 +185,11 @@ def open_contracts(self):
                         cur.execute("UPDATE contracts SET end_date=? WHERE id=?", (new_ed, cid))
                         conn.commit(); conn.close()
                         # consume one grace period (decrement stored count)
-                        st = effects._state.setdefault('active', {})
-                        st['grace_periods'] = max(0, int(st.get('grace_periods', 0)) - 1)
-                        effects._save()
+                        effects.consume('grace_periods', 1, source=f'contract:grace:{cid}')
                         messagebox.showinfo("Grace Period", "Contract extended by 1 day.", parent=win)
                     except Exception as e:
                         messagebox.showwarning("Grace Period", f"Failed to apply Grace Period: {e}", parent=win)
-                    refresh_views(); self.refresh_all()
+                    refresh_views()
 
                 RoundButton(box, "Use Grace", fill=COLORS["PRIMARY"], fg=COLORS["WHITE"], padx=8, pady=6, radius=8, command=use_grace).pack(pady=4)
 
@@ -218,7 +213,7 @@ def open_contracts(self):
                         claim_contract_offer(oid)
                     except ValueError as e:
                         messagebox.showwarning("Cannot claim", str(e), parent=win); return
-                    refresh_views(); self.refresh_all()
+                    refresh_views()
 
                 RoundButton(
                     box,
@@ -8,7 +8,7 @@ from datetime import date, timedelta
 from constants import COLORS, FONTS
 from widgets import RoundButton
 from exp_system import add_total_xp, get_total_xp, level_from_xp
-from shop.currency import add_coins, add_shards
+from shop.currency import wallet
 from database import (
     add_nn_task, get_nn_tasks, set_nn_completed, delete_nn_task,
     nn_result_applied, set_nn_result_applied
@@ -41,9 +41,7 @@ def _compute_xp(total: int, done: int) -> int:
         done = min(total, done + 1)
         # consume one
         try:
-            st = effects._state.setdefault('active', {})
-            st['task_doubler'] = max(0, int(st.get('task_doubler', 0)) - 1)
-            effects._save()
+            effects.consume('task_doubler', 1, source='logger:task_doubler')
         except Exception:
             pass
 
@@ -152,15 +150,13 @@ def open_logger(self):
             try:
                 if xp > 0:
                     coins = max(1, int(round(xp * 0.10)))
-                    try: add_coins(coins)
+                    try: wallet.transact([('coins', coins)], reason='logger', ref=today_s)
                     except Exception: pass
             except Exception:
                 pass
             message = ("Perfect! +" + str(xp) + " XP 🎉") if done == total else ("Applied " + str(xp) + " XP")
             messagebox.showinfo("Logger", message, parent=win)
             render_today()
-            try: self.refresh_all()
-            except Exception: pass
             after_lvl = level_from_xp(get_total_xp())
             if after_lvl > before_lvl:
                 try:
@@ -0,0 +1,191 @@
+# ui/app/recommender.py
+# Random challenge picks weighted toward the traits that need them.
+#
+# Per trait we keep rolling aggregates over the last WINDOW_DAYS: atone
+# points logged, sin hits against it, and its score vs. the EMA baseline.
+# They are seeded once from the DB, then kept current from the "entries" and
+# "attributes" events (one row lookup per new entry, nothing rescanned). A
+# trait's weight grows with its sins, its gap below baseline and how little
+# it was worked on lately. Draws use a Vose alias table over the traits, so
+# picking (and re-picking for a reroll) is O(1); the table is rebuilt lazily
+# on the first draw after something changed.
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from constants import POSITIVE_TRAITS, SIN_TO_ATTRIBUTE
+from database import get_entry, get_entries_by_date, get_attributes, get_baselines
+from events import subscribe
+
+# ---------- Tunables ----------
+WINDOW_DAYS = 7      # rolling window for atone points / sin hits
+BASE_W      = 1.0    # every trait stays possible
+SIN_W       = 0.75   # per sin hit in the window
+GAP_W       = 0.25   # per point of score below baseline
+NEGLECT_W   = 2.0    # full bonus for a trait with no atones in the window (decays as 1/(1+pts))
+MAX_REDRAWS = 8      # reroll: attempts to avoid repeating the current challenge
+
+Challenge = Tuple[str, str, int, int, int]   # (title, trait, minutes, reward_pts, penalty_pts)
+
+
+def _entry_trait(entry: dict) -> Optional[str]:
+    """Positive trait an entry counts against (atones name it; sins map to it)."""
+    cat = (entry.get("category") or "").strip()
+    if entry.get("entry_type") == "ATONE":
+        return cat if cat in POSITIVE_TRAITS else None
+    trait = SIN_TO_ATTRIBUTE.get(cat)
+    if trait:
+        return trait
+    # e.g. "Challenge fail (Physical)"
+    return next((t for t in POSITIVE_TRAITS if f"({t})" in cat), None)
+
+
+def build_alias(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Vose's alias method: O(n) build for O(1) weighted draws."""
+    n = len(weights)
+    total = float(sum(weights))
+    if n == 0 or total <= 0:
+        return [1.0] * n, list(range(n))
+    scaled = [w * n / total for w in weights]
+    prob, alias = [0.0] * n, [0] * n
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    for i in small + large:   # leftovers are 1 up to float error
+        prob[i], alias[i] = 1.0, i
+    return prob, alias
+
+
+class ChallengeRecommender:
+    def __init__(self, pool: Sequence[Challenge], rng: random.Random | None = None) -> None:
+        self.rng = rng or random.Random()
+        self._by_trait: Dict[str, List[Challenge]] = {}
+        for ch in pool:
+            self._by_trait.setdefault(ch[1], []).append(ch)
+        self._traits = list(self._by_trait)
+
+        self._entries: Dict[int, Tuple[str, str, str, int]] = {}  # id -> (day, trait, kind, pts) inside the window
+        self._days: Dict[str, List[int]] = {}                     # day -> entry ids (for rolling off)
+        self._atone = {t: 0 for t in self._traits}
+        self._sins = {t: 0 for t in self._traits}
+        self._score: Dict[str, int] = {}
+        self._baseline: Dict[str, int] = {}
+        self._today: Optional[date] = None
+        self._alias: Optional[Tuple[List[float], List[int]]] = None  # None = rebuild on next draw
+        self._unsubscribe = []
+
+    # ---- lifecycle ----
+    def start(self) -> "ChallengeRecommender":
+        """Seed from the DB once and follow entry/attribute events from then on."""
+        self._roll()
+        try:
+            for name, row in get_attributes().items():
+                self._score[name] = int(row.get("score", 0))
+        except Exception as e:
+            print(f"[recommender] could not read attributes: {e}")
+        self._unsubscribe = [subscribe("entries", self._on_entries),
+                             subscribe("attributes", self._on_attributes)]
+        return self
+
+    def stop(self) -> None:
+        for unsub in self._unsubscribe:
+            unsub()
+        self._unsubscribe = []
+
+    # ---- aggregates ----
+    def _apply(self, trait: str, kind: str, pts: int, sign: int) -> None:
+        if trait not in self._atone:
+            return  # no challenges for it
+        if kind == "ATONE":
+            self._atone[trait] += sign * abs(pts)
+        else:
+            self._sins[trait] += sign
+        self._alias = None
+
+    def _add(self, entry: dict) -> None:
+        eid = int(entry["id"])
+        trait = _entry_trait(entry)
+        if eid in self._entries or not trait:
+            return
+        day, kind, pts = entry["date"], entry["entry_type"], int(entry.get("points") or 0)
+        self._entries[eid] = (day, trait, kind, pts)
+        self._days.setdefault(day, []).append(eid)
+        self._apply(trait, kind, pts, +1)
+
+    def _remove(self, eid: int) -> None:
+        rec = self._entries.pop(eid, None)
+        if rec:
+            _day, trait, kind, pts = rec
+            self._apply(trait, kind, pts, -1)
+
+    def _roll(self) -> None:
+        """On a new day: drop days that left the window, read the new one, refresh baselines."""
+        today = date.today()
+        if today == self._today:
+            return
+        first = today - timedelta(days=WINDOW_DAYS - 1)
+        cutoff = first.isoformat()
+        for day in [d for d in self._days if d < cutoff]:
+            for eid in self._days.pop(day):
+                self._remove(eid)
+        start = first if self._today is None else max(first, self._today + timedelta(days=1))
+        self._today = today
+        d = start
+        while d <= today:
+            try:
+                for entry in get_entries_by_date(d.isoformat()):
+                    self._add(entry)
+            except Exception as e:
+                print(f"[recommender] could not read {d}: {e}")
+            d += timedelta(days=1)
+        try:
+            self._baseline = get_baselines()   # EMA baselines move once per day
+        except Exception:
+            pass
+        self._alias = None
+
+    def _on_entries(self, _topic, **payload):
+        if payload.get("removed") is not None:
+            self._remove(int(payload["removed"]))
+        day, added = payload.get("date"), payload.get("added")
+        first = (self._today - timedelta(days=WINDOW_DAYS - 1)).isoformat()
+        if added is not None and day and day >= first:
+            entry = get_entry(added)
+            if entry:
+                self._add(entry)
+
+    def _on_attributes(self, _topic, name=None, score=None, **_):
+        if name is not None and score is not None and self._score.get(name) != score:
+            self._score[name] = int(score)
+            self._alias = None
+
+    # ---- weights / draws ----
+    def weight(self, trait: str) -> float:
+        gap = max(0, self._baseline.get(trait, 0) - self._score.get(trait, 0))
+        return (BASE_W + SIN_W * self._sins.get(trait, 0) + GAP_W * gap
+                + NEGLECT_W / (1 + max(0, self._atone.get(trait, 0))))
+
+    def weights(self) -> Dict[str, float]:
+        self._roll()
+        return {t: self.weight(t) for t in self._traits}
+
+    def draw(self, exclude: Optional[Challenge] = None) -> Optional[Challenge]:
+        """Weighted pick; `exclude` (the current offer, for a reroll) is avoided if anything else exists."""
+        self._roll()
+        if not self._traits:
+            return None
+        if self._alias is None:
+            self._alias = build_alias([self.weight(t) for t in self._traits])
+        prob, alias = self._alias
+        pick = None
+        for _ in range(MAX_REDRAWS):
+            i = self.rng.randrange(len(self._traits))
+            trait = self._traits[i if self.rng.random() < prob[i] else alias[i]]
+            pick = self.rng.choice(self._by_trait[trait])
+            if pick != exclude:
+                break
+        return pick
@@ -2,6 +2,7 @@
 import tkinter as tk
 from constants import COLORS, FONTS
 from widgets import RoundButton
+from .. import theme
 
 class ActionsBar(tk.Frame):
     """
@@ -164,6 +165,20 @@ class ActionsBar(tk.Frame):
         # Spacer
         tk.Label(self, text="", bg=COLORS["BG"]).pack(side="right", expand=True)
 
+        # Explicit roles so a theme switch doesn't have to guess between
+        # colors that happened to be equal in the old palette (TEXT vs CARD_TEXT...)
+        card = dict(fill="CARD", hover_fill="PRIMARY_HOVER", fg="CARD_TEXT")
+        primary = dict(fill="PRIMARY", hover_fill="PRIMARY_HOVER", fg="PRIMARY_TEXT")
+        accent = dict(fill="ACCENT", hover_fill="ACCENT_HOVER", fg="ACCENT_TEXT")
+        for name, roles in (("today_btn", card), ("atone_btn", primary), ("sin_btn", accent),
+                             ("challenge_btn", accent), ("logger_btn", card), ("contracts_btn", accent),
+                             ("theme_btn", card), ("items_btn", card), ("faq_btn", card), ("_sound_btn", card)):
+            btn = getattr(self, name, None)
+            if btn is not None:
+                theme.register(btn, **roles)
+        if self._badge:
+            theme.register(self._badge, bg="BG", fg="PRIMARY")
+
     # -------------------------------------------------------------------------
     def enable(self, is_today: bool):
         """Enable/disable inputs that should be blocked for non-today views."""
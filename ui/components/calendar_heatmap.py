@@ -0,0 +1,180 @@
+# ui/components/calendar_heatmap.py
+import calendar
+import tkinter as tk
+from datetime import date
+
+import constants as const
+from constants import COLORS, FONTS
+from database import get_year_activity
+from events import subscribe
+from .. import theme
+
+# year -> {YYYY-MM-DD: (count, net points)}; filled by one query per year,
+# dropped for a year whenever an entry on one of its days is written.
+_YEAR_INDEX: dict[int, dict[str, tuple[int, int]]] = {}
+
+
+def year_index(year: int) -> dict[str, tuple[int, int]]:
+    idx = _YEAR_INDEX.get(year)
+    if idx is None:
+        try:
+            idx = get_year_activity(year)
+        except Exception:
+            idx = {}
+        _YEAR_INDEX[year] = idx
+    return idx
+
+
+def _invalidate(topic, date=None, **_):
+    try:
+        _YEAR_INDEX.pop(int(date[:4]), None)
+    except (TypeError, ValueError):
+        _YEAR_INDEX.clear()
+
+
+subscribe("entries", _invalidate)
+
+# entry-count thresholds -> how far the cell color sits from CARD toward GOOD/BAD
+_LEVELS = ((7, 0.10), (4, 0.35), (2, 0.55), (1, 0.72))
+
+
+def heat_color(count: int, net: int) -> str:
+    if count <= 0:
+        return COLORS["CARD"]
+    t = next(t for n, t in _LEVELS if count >= n)
+    hue = COLORS.get("GOOD", COLORS["PRIMARY"]) if net >= 0 else COLORS.get("BAD", COLORS["ACCENT"])
+    try:
+        return const._blend_hex(hue, COLORS["CARD"], t)
+    except Exception:
+        return hue
+
+
+class CalendarHeatmap(tk.Canvas):
+    """Month or year activity heatmap drawn on a single Canvas.
+
+    Each day is one rectangle tagged with its date; hover/click are handled
+    by tag bindings on the canvas rather than per-tile widgets. Only days
+    between `first_day` and today that have entries are pickable.
+    """
+    MONTH_CELL, MONTH_GAP = 40, 4
+    YEAR_CELL, YEAR_GAP = 12, 2
+    WEEKDAYS = ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su")
+
+    def __init__(self, master, *, first_day: date, on_pick, on_month=None):
+        super().__init__(master, bg=COLORS["BG"], highlightthickness=0, bd=0)
+        self.first_day = first_day
+        self.on_pick = on_pick
+        self.on_month = on_month
+        self.mode = "month"
+        self.showing = date.today().replace(day=1)
+        self._cal = calendar.Calendar(firstweekday=0)  # Monday = 0
+        self._hover = None
+
+        self.tag_bind("pick", "<Enter>", self._on_enter)
+        self.tag_bind("pick", "<Leave>", self._on_leave)
+        self.tag_bind("pick", "<Button-1>", self._on_click)
+        self.tag_bind("month", "<Button-1>", self._on_month_click)
+        # cell colors are blends, not palette values: repaint rather than remap
+        theme.on_theme_change(self._draw, widget=self)
+
+    # ---- public ----
+    def show_month(self, year: int, month: int):
+        self.mode, self.showing = "month", date(year, month, 1)
+        self._draw()
+
+    def show_year(self, year: int):
+        self.mode, self.showing = "year", date(year, 1, 1)
+        self._draw()
+
+    # ---- drawing ----
+    def _draw(self):
+        self.delete("all")
+        self._hover = None
+        idx = year_index(self.showing.year)
+        if self.mode == "year":
+            self._draw_year(idx)
+        else:
+            self._draw_month(idx)
+
+    def _day_cell(self, d: date, x: int, y: int, size: int, idx, *, label: bool):
+        today = date.today()
+        iso = d.isoformat()
+        count, net = idx.get(iso, (0, 0))
+        in_window = self.first_day <= d <= today
+        fill = heat_color(count, net) if in_window else COLORS["BG"]
+        tags = ("day", f"d:{iso}") + (("pick",) if (in_window and count) else ())
+        outline = COLORS["ACCENT"] if d == today else (COLORS["PRIMARY"] if "pick" in tags else COLORS["CARD"])
+        self.create_rectangle(x, y, x + size, y + size, fill=fill, outline=outline,
+                              width=2 if d == today else 1, tags=tags)
+        if label:
+            fg = const._best_fg_on(fill) if "pick" in tags else COLORS["MUTED"]
+            self.create_text(x + size / 2, y + size / 2, text=str(d.day), font=FONTS["body"], fill=fg, tags=tags)
+
+    def _draw_month(self, idx):
+        cell, gap = self.MONTH_CELL, self.MONTH_GAP
+        step = cell + gap
+        for i, wd in enumerate(self.WEEKDAYS):
+            self.create_text(gap + i * step + cell / 2, 10, text=wd, font=FONTS["small"], fill=COLORS["MUTED"])
+        top = 22
+        y, m = self.showing.year, self.showing.month
+        for row, week in enumerate(self._cal.monthdayscalendar(y, m)):
+            for col, dnum in enumerate(week):
+                if dnum:
+                    self._day_cell(date(y, m, dnum), gap + col * step, top + row * step, cell, idx, label=True)
+        self.configure(width=7 * step + gap, height=top + 6 * step)
+
+    def _draw_year(self, idx):
+        cell, gap = self.YEAR_CELL, self.YEAR_GAP
+        step = cell + gap
+        block_w, block_h = 7 * step + 12, 6 * step + 22
+        y = self.showing.year
+        for m in range(1, 13):
+            bx = ((m - 1) % 4) * block_w + 6
+            by = ((m - 1) // 4) * block_h + 4
+            self.create_text(bx, by + 6, text=calendar.month_abbr[m], anchor="w", font=FONTS["small"],
+                             fill=COLORS["TEXT"], tags=("month", f"m:{m}"))
+            for row, week in enumerate(self._cal.monthdayscalendar(y, m)):
+                for col, dnum in enumerate(week):
+                    if dnum:
+                        self._day_cell(date(y, m, dnum), bx + col * step, by + 16 + row * step, cell, idx, label=False)
+        self.configure(width=4 * block_w + 6, height=3 * block_h + 4)
+
+    # ---- interaction ----
+    def _date_of(self, item):
+        for tag in self.gettags(item):
+            if tag.startswith("d:"):
+                return tag[2:]
+        return None
+
+    def _on_enter(self, _e=None):
+        iso = self._date_of("current")
+        if not iso:
+            return
+        self._hover = iso
+        for item in self.find_withtag(f"d:{iso}"):
+            if self.type(item) == "rectangle":
+                self.itemconfigure(item, outline=COLORS.get("PRIMARY_HOVER", COLORS["PRIMARY"]), width=3)
+
+    def _on_leave(self, _e=None):
+        iso, self._hover = self._hover, None
+        if not iso:
+            return
+        is_today = iso == date.today().isoformat()
+        for item in self.find_withtag(f"d:{iso}"):
+            if self.type(item) == "rectangle":
+                self.itemconfigure(item, outline=COLORS["ACCENT"] if is_today else COLORS["PRIMARY"],
+                                   width=2 if is_today else 1)
+
+    def _on_click(self, _e=None):
+        iso = self._date_of("current")
+        if iso and self.on_pick:
+            self.on_pick(date.fromisoformat(iso))
+
+    def _on_month_click(self, _e=None):
+        for tag in self.gettags("current"):
+            if tag.startswith("m:"):
+                if self.on_month:
+                    self.on_month(self.showing.year, int(tag[2:]))
+                else:
+                    self.show_month(self.showing.year, int(tag[2:]))
+                return
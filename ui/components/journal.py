@@ -1,16 +1,25 @@
 import tkinter as tk
 from tkinter import messagebox
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta
 import math
-from pathlib import Path
 import random
-import json
-import csv
+import hashlib
+import zlib
+import heapq
+import itertools
 from constants import COLORS, FONTS
 from widgets import RoundButton
+from scheduler import scheduler
+import assets
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b((text or "").strip().encode("utf-8"), digest_size=16).digest()
 
 
 class JournalPanel(tk.Frame):
+    AUTOSAVE_MS = 1000   # idle time after the last edit before a snapshot is written
+
     def _rebind_buy_button(self, slot, tok, buy_func):
         """Safely rebind the Buy button to call buy_func(tok)."""
         try:
@@ -34,71 +43,18 @@ class JournalPanel(tk.Frame):
         btn.pack(pady=(6, 0))
         slot["buy_btn"] = btn
 
-    def __init__(self, master, on_save):
+    def __init__(self, master, on_save, on_autosave=None):
         super().__init__(master, bg=COLORS["CARD"], bd=0, highlightthickness=0)
         self.on_save = on_save
-
-        # ---------- Category normalization + icon loading ----------
-        def _norm(s):  # local helper visible to nested funcs
-            return (s or "").strip().lower()
-
-
-
-        self._live_images = []            # keep strong refs so PhotoImage isn't GC'd
-        self._icon_by_category = {}       # normalized category -> PhotoImage
-        self._icon_list = []              # [token1..token6] in order for fallback
-
-        images_dir = Path(__file__).resolve().parents[2] / "images"
-
-        # Load currency icons
-        self._currency_icons = {}
-        for name in ["coin", "shard"]:
-            icon = None
-            try:
-                orig_icon = tk.PhotoImage(file=str(images_dir / f"{name}.png"))
-                # Subsample to make it smaller for the label (e.g., 24x24 or less)
-                w, h = orig_icon.width(), orig_icon.height()
-                factor = max(1, int(max(w, h) / 20))
-                if factor > 1:
-                    icon = orig_icon.subsample(factor, factor)
-                else:
-                    icon = orig_icon
-                self._live_images.append(icon)
-            except Exception:
-                pass
-            self._currency_icons[name] = icon
-
-
-        def _load_png(fname, max_wh=48):
-            p = images_dir / fname
-            if not p.exists():
-                return None
-            try:
-                img = tk.PhotoImage(file=str(p))
-                # integer subsample down if needed (Tk limitation)
-                try:
-                    w, h = img.width(), img.height()
-                    if max(w, h) > max_wh:
-                        factor = max(1, int(math.ceil(max(w, h) / max_wh)))
-                        img = img.subsample(factor, factor)
-                except Exception:
-                    pass
-                self._live_images.append(img)
-                return img
-            except Exception:
-                return None
-
-        # Load the six token icons (some may be None if missing)
-        for i in range(1, 7):
-            self._icon_list.append(_load_png(f"token{i}.png"))
-
-        # Canonical category mapping (normalized keys)
-        self._icon_by_category[_norm("Boosts")] = self._icon_list[0]
-        self._icon_by_category[_norm("Neglects")] = self._icon_list[1]
-        self._icon_by_category[_norm("Contracts & Offers")] = self._icon_list[2]
-        self._icon_by_category[_norm("Logger")] = self._icon_list[3]
-        self._icon_by_category[_norm("Random Challenge helpers")] = self._icon_list[4]
-        self._icon_by_category[_norm("Utility & QoL")] = self._icon_list[5]
+        # autosave state: on_autosave(doc, text) gets a snapshot ~AUTOSAVE_MS after
+        # typing stops; `doc` is whatever set_text() was given (the day being edited).
+        # It returns True once the text is queued for writing; the app reports the
+        # outcome later through note_saved() / note_save_failed().
+        self.on_autosave = on_autosave
+        self._doc = None
+        self._saved_digest = _digest("")
+        self._autosave_job = None
+        self.dirty = False
 
         # ---------- Header ----------
         header = tk.Frame(self, bg=COLORS["CARD"])
@@ -144,6 +100,7 @@ class JournalPanel(tk.Frame):
             self.text.bind("<KeyRelease>", lambda e: self._update_char_count())
         except Exception:
             pass
+        self.text.bind("<<Modified>>", self._on_modified)
 
         # Action bar
         bar = tk.Frame(self, bg=COLORS["CARD"])
@@ -173,75 +130,8 @@ class JournalPanel(tk.Frame):
         from shop.effects import effects
 
         def _get_active_boosts():
-            state = effects.dump().get("active", {})
-            boosts = []
-            # XP global
-            if state.get("xp_global", 0) > 0:
-                boosts.append(f"+{int(state['xp_global']*100)}% XP (all Atones)")
-            # Trait boosts
-            for trait, pct in state.get("xp_trait", {}).items():
-                if pct > 0:
-                    boosts.append(f"+{int(pct*100)}% XP to {trait}")
-            # Contract focus
-            if state.get("contract_focus", 0) > 0:
-                boosts.append(f"+{int(state['contract_focus']*100)}% XP (contract trait)")
-            # Streak
-            if state.get("streak_plus", 0) > 0:
-                boosts.append(f"+{state['streak_plus']:.2f} streak multiplier")
-            # Daily Double
-            if state.get("dd_xp_bonus", 0) > 0:
-                boosts.append(f"+{state['dd_xp_bonus']:.2f}× Daily Double XP")
-            # Logger
-            if state.get("logger_full_bonus", 0) > 0:
-                boosts.append(f"+{int(state['logger_full_bonus']*100)}% Logger full bonus")
-            # Challenge
-            if state.get("challenge_xp", 0) > 0:
-                boosts.append(f"+{int(state['challenge_xp']*100)}% Random Challenge XP")
-            # Sin penalty reductions
-            for trait, pct in state.get("sin_trait_reduce", {}).items():
-                if pct > 0:
-                    boosts.append(f"-{int(pct*100)}% {trait} Sin penalty")
-            # Wrath
-            if state.get("wrath_halved", False):
-                boosts.append("Wrath penalties halved")
-            # Gentle landing
-            if state.get("gentle_landing_charges", 0) > 0:
-                boosts.append(f"Gentle Landing: {state['gentle_landing_charges']} left")
-            # One-time pardons
-            if state.get("one_time_pardons", 0) > 0:
-                boosts.append(f"One-Time Pardon: {state['one_time_pardons']} left")
-            # Slip insurance
-            if state.get("slip_insurance", 0) > 0:
-                boosts.append(f"Slip Insurance: {state['slip_insurance']} left")
-            # Contract shield
-            if state.get("contract_shields", 0) > 0:
-                boosts.append(f"Contract Shield: {state['contract_shields']} left")
-            # Grace periods
-            if state.get("grace_periods", 0) > 0:
-                boosts.append(f"Grace Periods: {state['grace_periods']} left")
-            # Offer beacon
-            if state.get("offer_beacons", 0) > 0:
-                boosts.append(f"Offer Beacon: {state['offer_beacons']} left")
-            # Rerolls
-            if state.get("dd_rerolls", 0) > 0:
-                boosts.append(f"Daily Double Reroll: {state['dd_rerolls']} left")
-            if state.get("challenge_rerolls", 0) > 0:
-                boosts.append(f"Challenge Reroll: {state['challenge_rerolls']} left")
-            # Time cushion
-            if state.get("challenge_time_cushion", 0) > 0:
-                boosts.append(f"+{int(state['challenge_time_cushion']//60)} min challenge timer")
-            # Safe decline
-            if state.get("challenge_safe_decline", 0) > 0:
-                boosts.append(f"Safe Decline: {state['challenge_safe_decline']} left")
-            # Logger penalty buffer
-            if state.get("logger_penalty_buffer", 0) > 0:
-                boosts.append(f"-{int(state['logger_penalty_buffer']*100)}% Logger penalty")
-            # Economy / currency effects
-            if state.get("coin_global_pct", 0) > 0:
-                boosts.append(f"+{int(state['coin_global_pct']*100)}% coins today")
-            if state.get("shard_weekly_bonus", 0) > 0:
-                boosts.append(f"Shard Spark: +{int(state['shard_weekly_bonus'])} weekly shard allowance")
-            return boosts
+            # labels come precomputed from the effects view (rebuilt only on state change)
+            return effects.active_labels()
 
         # populate initial boosts into the persistent container
         def _populate():
@@ -298,13 +188,9 @@ class JournalPanel(tk.Frame):
                             try:
                                 delete_entry(entry['id'])
                                 # consume a pardon
-                                a = effects._state.setdefault('active', {})
-                                a['one_time_pardons'] = max(0, int(a.get('one_time_pardons', 0)) - 1)
-                                effects._save()
+                                effects.consume('one_time_pardons', 1, source=f"pardon:entry:{entry['id']}")
                                 messagebox.showinfo("Use Pardon", "Entry erased.", parent=winp)
                                 winp.destroy()
-                                try: self.master.refresh_all()
-                                except Exception: pass
                                 try: self.on_save()
                                 except Exception: pass
                             except Exception:
@@ -358,8 +244,50 @@ class JournalPanel(tk.Frame):
         except Exception:
             pass
 
+        # The shop (token CSV, saved slots, sprite, timers) is the heaviest part
+        # of the panel; the app builds it after the first frame via build_shop().
+        self._action_bar = bar
+        self._shop_built = False
+
+    # ---------- Shop area ----------
+    def _icon_for(self, tok):
+        """Token icon by category; unknown categories get a stable pick from the six."""
+        key = tok.category_key if tok else ""
+        img = self._icon_by_category.get(key)
+        if not img and self._icon_list:
+            idx = zlib.crc32(key.encode("utf-8")) % len(self._icon_list)
+            img = self._icon_list[idx]
+            if tok:
+                print(f"[shop.img] fallback icon for '{tok.category}' -> token{idx+1}.png")
+        return img
+
+    def build_shop(self):
+        """Build the shop row and the My Items button (once)."""
+        if self._shop_built:
+            return
+        self._shop_built = True
+        bar = self._action_bar
+        from shop.catalog import catalog, category_key
+
+        # ---------- Icon loading ----------
+        self._icon_by_category = {}       # category_key -> PhotoImage
+        self._icon_list = []              # [token1..token6] in order for fallback
+
+        # Load currency icons (shared, pre-scaled copies from the assets cache)
+        self._currency_icons = {name: assets.image(f"images/{name}.png", 20) for name in ("coin", "shard")}
+
+        # Load the six token icons (some may be None if missing)
+        for i in range(1, 7):
+            self._icon_list.append(assets.image(f"images/token{i}.png", 48))
+
+        # Canonical category mapping (normalized keys)
+        self._icon_by_category[category_key("Boosts")] = self._icon_list[0]
+        self._icon_by_category[category_key("Neglects")] = self._icon_list[1]
+        self._icon_by_category[category_key("Contracts & Offers")] = self._icon_list[2]
+        self._icon_by_category[category_key("Logger")] = self._icon_list[3]
+        self._icon_by_category[category_key("Random Challenge helpers")] = self._icon_list[4]
+        self._icon_by_category[category_key("Utility & QoL")] = self._icon_list[5]
 
-        # ---------- Shop area ----------
         shop_frame = tk.Frame(self, bg=COLORS["CARD"], bd=0)
         shop_frame.pack(fill="x", padx=12, pady=(6, 12))
 
@@ -375,27 +303,17 @@ class JournalPanel(tk.Frame):
         # Animated shopkeeper sprite (right of tokens) with fallback error label
         shopkeeper_error = False
         try:
-            shopkeeper_path = Path(__file__).resolve().parents[2] / "Npc_Shop" / "idleshop.png"
-            if shopkeeper_path.exists():
-                sheet_img = tk.PhotoImage(file=str(shopkeeper_path))
-                frame_h = sheet_img.height()
-                frame_w = frame_h  # assume square frames
-                num_frames = sheet_img.width() // frame_w
-                if num_frames < 1 or sheet_img.width() % frame_w != 0:
-                    shopkeeper_error = True
-                else:
-                    frames = [sheet_img.subsample(1, 1).copy() for _ in range(num_frames)]
-                    for i in range(num_frames):
-                        frames[i] = sheet_img.subsample(1, 1).copy()
-                        frames[i].tk.call(frames[i], 'copy', sheet_img, '-from', i*frame_w, 0, (i+1)*frame_w, frame_h, 0, 0)
-                    self._live_images.extend(frames)
-                    anim_lbl = tk.Label(shop_row_outer, bg=COLORS["CARD"])
-                    anim_lbl.pack(side="left", padx=(16, 0), pady=2)
-                    def animate_shopkeeper(frame=0):
-                        anim_lbl.configure(image=frames[frame])
-                        next_frame = (frame + 1) % num_frames
-                        anim_lbl.after(120, animate_shopkeeper, next_frame)
-                    animate_shopkeeper()
+            # sliced once per process (square frames); [] if missing or malformed
+            frames = assets.sprite_frames("Npc_Shop/idleshop.png")
+            if frames:
+                num_frames = len(frames)
+                anim_lbl = tk.Label(shop_row_outer, bg=COLORS["CARD"])
+                anim_lbl.pack(side="left", padx=(16, 0), pady=2)
+                sprite = {"frame": 0}
+                def animate_shopkeeper():
+                    anim_lbl.configure(image=frames[sprite["frame"]])
+                    sprite["frame"] = (sprite["frame"] + 1) % num_frames
+                scheduler.every("shop.shopkeeper", 120, animate_shopkeeper, widget=anim_lbl, run_now=True)
             else:
                 shopkeeper_error = True
         except Exception as e:
@@ -427,168 +345,99 @@ class JournalPanel(tk.Frame):
             scroll_frame.bind("<Configure>", _on_frame_configure)
 
             # --- Inventory content ---
-            inv_path = Path("data/shop_inventory.json")
-            items = []
+            # View model: one stack per token name ({name: {"ids": [...inventory ids], widgets}}),
+            # so using a token pops one id and touches only that stack's row.
+            from database import get_inventory, remove_inventory_item
+            from shop.effects import effects
             try:
-                if inv_path.exists():
-                    items = json.loads(inv_path.read_text(encoding="utf-8") or "[]")
+                items = get_inventory()
             except Exception:
                 items = []
-            if not items:
-                tk.Label(scroll_frame, text="No tokens owned.", bg=COLORS["CARD"], fg=COLORS["MUTED"]).pack()
-            else:
-                tokens = []
-                tokp = Path("data/shop_tokens.csv")
-                try:
-                    if tokp.exists():
-                        with tokp.open(encoding="utf-8") as f:
-                            for r in csv.DictReader(f):
-                                tokens.append(r)
-                except Exception:
-                    pass
+            stacks = {}
+            for entry in items:
+                tok = catalog.get(entry.get("item"))
+                if not tok:
+                    continue
+                stacks.setdefault(entry["item"], {"tok": tok, "ids": []})["ids"].append(entry["id"])
 
-                from shop.effects import effects
+            empty_lbl = tk.Label(scroll_frame, text="No tokens owned.", bg=COLORS["CARD"], fg=COLORS["MUTED"])
 
-                def apply_token_effect(token: dict):
-                    msg = effects.activate_from_token(token)
-                    # show modal parented to the inventory window so focus returns correctly
-                    try:
-                        messagebox.showinfo("Item used", msg, parent=win)
-                    except Exception:
-                        try:
-                            messagebox.showinfo("Item used", msg, parent=self)
-                        except Exception:
-                            try:
-                                messagebox.showinfo("Item used", msg)
-                            except Exception:
-                                pass
+            def _stack_title(name):
+                n = len(stacks[name]["ids"])
+                return f"{name} ×{n}" if n > 1 else name
 
-                    # Always log and refresh UI after activation so the boost bar updates immediately
-                    try:
-                        print(f"[inventory] applied token {token.get('item') if isinstance(token, dict) else token}, msg={msg}")
-                    except Exception:
-                        pass
-                    try:
-                        # refresh main UI so active boosts/effects update immediately
-                        app = getattr(self.winfo_toplevel(), '_app', None)
-                        if app and hasattr(app, 'refresh_all'):
-                            try: app.refresh_all()
-                            except Exception: pass
-                        else:
-                            # fallback to previous heuristics
-                            if hasattr(self, 'master') and hasattr(self.master, 'refresh_all'):
-                                try: self.master.refresh_all()
-                                except Exception: pass
-                    except Exception:
-                        pass
-                    # Also directly repopulate the journal boost bar to ensure immediate visibility
-                    try:
-                        try: self._populate_boost_bar()
-                        except Exception: pass
-                    except Exception:
-                        pass
-
-                def use_token(idx):
-                    # Use the token, consume from inventory, and update the UI in-place.
-                    entry = items[idx]
-                    name = entry.get("item")
-                    tok  = next((t for t in tokens if t.get("item") == name), None)
-                    if tok:
-                        apply_token_effect(tok)
-                    # remove token from inventory after use
-                    try:
-                        del items[idx]
-                    except Exception:
-                        pass
-                    try:
-                        inv_path.write_text(json.dumps(items), encoding="utf-8")
-                    except Exception as e:
-                        print(f"[inventory] failed to update: {e}")
-
-                    # Rebuild the scroll_frame contents to reflect the removed item
-                    for child in list(scroll_frame.winfo_children()):
-                        try: child.destroy()
-                        except: pass
-
-                    if not items:
-                        tk.Label(scroll_frame, text="No tokens owned.", bg=COLORS["CARD"], fg=COLORS["MUTED"]).pack()
-                    else:
-                        for idx2, entry2 in enumerate(items):
-                            name2 = entry2.get("item")
-                            tok2 = next((t for t in tokens if t.get("item") == name2), None)
-                            if not tok2:
-                                continue
-                            cat_norm2 = (tok2.get("category") or "").strip().lower()
-                            img2 = self._icon_by_category.get(cat_norm2)
-                            if not img2:
-                                idx_img = abs(hash(cat_norm2)) % max(1, len(self._icon_list))
-                                img2 = self._icon_list[idx_img]
-                            row2 = tk.Frame(scroll_frame, bg=COLORS["CARD"])
-                            row2.pack(fill="x", pady=2)
-                            if img2:
-                                icon_lbl2 = tk.Label(row2, image=img2, bg=COLORS["CARD"])
-                                icon_lbl2.image = img2
-                                icon_lbl2.pack(side="left", padx=(0, 8))
-                            desc2 = tok2.get("effect") or "No description."
-                            tk.Label(row2, text=name2, font=(None, 11, "bold"), bg=COLORS["CARD"], fg=COLORS["TEXT"]).pack(side="left")
-                            tk.Label(row2, text=desc2, font=(None, 10), bg=COLORS["CARD"], fg=COLORS["MUTED"], wraplength=260, justify="left").pack(side="left", padx=(8, 0))
-                            RoundButton(row2, "Use Now", fill=COLORS["PRIMARY"], fg=COLORS["WHITE"], command=lambda i=idx2: use_token(i), padx=8, pady=4, radius=8).pack(side="left", padx=(12, 0))
-
-                    # Ensure main UI reflects any activated effects/currency changes
+            def apply_token_effect(token):
+                msg = effects.activate_from_token(token)
+                # show modal parented to the inventory window so focus returns correctly
+                try:
+                    messagebox.showinfo("Item used", msg, parent=win)
+                except Exception:
                     try:
-                        app = getattr(self.winfo_toplevel(), '_app', None)
-                        if app and hasattr(app, 'refresh_all'):
-                            try: app.refresh_all()
-                            except Exception: pass
-                        else:
-                            try:
-                                if hasattr(self.master, 'refresh_all'):
-                                    try: self.master.refresh_all()
-                                    except Exception: pass
-                            except Exception:
-                                pass
+                        messagebox.showinfo("Item used", msg, parent=self)
                     except Exception:
-                        pass
-
-                    # Refresh scrollregion and reset view so the updated list is visible
-                    try:
-                        canvas.update_idletasks()
-                        bbox = canvas.bbox("all")
-                        if bbox:
-                            canvas.configure(scrollregion=bbox)
                         try:
-                            canvas.yview_moveto(0.0)
+                            messagebox.showinfo("Item used", msg)
                         except Exception:
                             pass
-                    except Exception:
-                        pass
 
-                    try:
-                        win.update_idletasks()
-                        win.focus_force()
-                    except Exception:
-                        pass
+                # Always log and refresh UI after activation so the boost bar updates immediately
+                try:
+                    print(f"[inventory] applied token {getattr(token, 'item', token)}, msg={msg}")
+                except Exception:
+                    pass
+                # Also directly repopulate the journal boost bar to ensure immediate visibility
+                try:
+                    self._populate_boost_bar()
+                except Exception:
+                    pass
 
-                for idx, entry in enumerate(items):
-                    name = entry.get("item")
-                    tok = next((t for t in tokens if t.get("item") == name), None)
-                    if not tok:
-                        continue
-                    cat_norm = (tok.get("category") or "").strip().lower()
-                    img = self._icon_by_category.get(cat_norm)
-                    if not img:
-                        idx_img = abs(hash(cat_norm)) % max(1, len(self._icon_list))
-                        img = self._icon_list[idx_img]
-                    row = tk.Frame(scroll_frame, bg=COLORS["CARD"])
-                    row.pack(fill="x", pady=2)
-                    if img:
-                        icon_lbl = tk.Label(row, image=img, bg=COLORS["CARD"])
-                        icon_lbl.image = img
-                        icon_lbl.pack(side="left", padx=(0, 8))
-                    desc = tok.get("effect") or "No description."
-                    tk.Label(row, text=name, font=(None, 11, "bold"), bg=COLORS["CARD"], fg=COLORS["TEXT"]).pack(side="left")
-                    tk.Label(row, text=desc, font=(None, 10), bg=COLORS["CARD"], fg=COLORS["MUTED"], wraplength=260, justify="left").pack(side="left", padx=(8, 0))
-                    RoundButton(row, "Use Now", fill=COLORS["PRIMARY"], fg=COLORS["WHITE"], command=lambda i=idx: use_token(i), padx=8, pady=4, radius=8).pack(side="left", padx=(12, 0))
+            def use_token(name):
+                # Use one token of the stack, consume it from inventory, update just that row.
+                stack = stacks.get(name)
+                if not stack or not stack["ids"]:
+                    return
+                apply_token_effect(stack["tok"])
+                inv_id = stack["ids"][0]
+                try:
+                    remove_inventory_item(inv_id)
+                    stack["ids"].pop(0)
+                except Exception as e:
+                    print(f"[inventory] failed to update: {e}")
+                    return
+
+                if stack["ids"]:
+                    stack["name_lbl"].config(text=_stack_title(name))
+                else:
+                    stack["row"].destroy()
+                    del stacks[name]
+                    if not stacks:
+                        empty_lbl.pack()
+                try:
+                    win.focus_force()
+                except Exception:
+                    pass
+
+            def _add_row(name):
+                stack = stacks[name]
+                tok = stack["tok"]
+                img = self._icon_for(tok)
+                row = tk.Frame(scroll_frame, bg=COLORS["CARD"])
+                row.pack(fill="x", pady=2)
+                if img:
+                    icon_lbl = tk.Label(row, image=img, bg=COLORS["CARD"])
+                    icon_lbl.image = img
+                    icon_lbl.pack(side="left", padx=(0, 8))
+                desc = tok.effect or "No description."
+                name_lbl = tk.Label(row, text=_stack_title(name), font=(None, 11, "bold"), bg=COLORS["CARD"], fg=COLORS["TEXT"])
+                name_lbl.pack(side="left")
+                tk.Label(row, text=desc, font=(None, 10), bg=COLORS["CARD"], fg=COLORS["MUTED"], wraplength=260, justify="left").pack(side="left", padx=(8, 0))
+                RoundButton(row, "Use Now", fill=COLORS["PRIMARY"], fg=COLORS["WHITE"], command=lambda n=name: use_token(n), padx=8, pady=4, radius=8).pack(side="left", padx=(12, 0))
+                stack["row"], stack["name_lbl"] = row, name_lbl
+
+            if not stacks:
+                empty_lbl.pack()
+            for name in stacks:
+                _add_row(name)
 
             RoundButton(win, "Close", fill=COLORS["PRIMARY"], fg=COLORS["WHITE"], command=win.destroy, padx=10, pady=6, radius=8).pack(pady=(0, 12))
 
@@ -596,78 +445,41 @@ class JournalPanel(tk.Frame):
         my_items_btn.pack(side="right", padx=(0, 8))
 
 
-        # Load token definitions
-        tokens = []
-        tokp = Path("data/shop_tokens.csv")
-        try:
-            if tokp.exists():
-                with tokp.open(encoding="utf-8") as f:
-                    for r in csv.DictReader(f):
-                        tokens.append(r)
-        except Exception as e:
-            print(f"[shop] could not read {tokp}: {e}")
+        # Token definitions (parsed once; the catalog re-reads the CSV if it changes)
+        tokens = list(catalog.tokens())
         choices = random.sample(tokens, min(3, len(tokens))) if tokens else []
         print(f"[shop] loaded {len(tokens)} tokens, initial choices: {len(choices)}")
 
-        # Inventory / slots persistence
-        inv_path = Path("data/shop_inventory.json")
-        slots_path = Path("data/shop_slots.json")
+        # Slot persistence (shop_slots table, one row per visible slot)
+        from database import get_shop_slots, save_shop_slot
 
-        def _save_slots_state():
+        def _save_slot_state(slot):
             try:
-                out = []
-                for s in self._shop_slots:
-                    tok = s.get("tok")
-                    if not tok:
-                        out.append(None); continue
-                    exp = s.get("expires_at")
-                    out.append({"item": tok.get("item"),
-                                "expires_at": exp.isoformat() if exp else None})
-                slots_path.parent.mkdir(parents=True, exist_ok=True)
-                slots_path.write_text(json.dumps(out), encoding="utf-8")
+                tok = slot.get("tok")
+                exp = slot.get("expires_at")
+                save_shop_slot(slot["idx"], tok.item if tok else None,
+                               exp.isoformat() if exp else None)
             except Exception:
                 pass
 
         def _load_slots_state():
             try:
-                if not slots_path.exists():
-                    return []
-                return json.loads(slots_path.read_text(encoding="utf-8") or "[]")
+                return get_shop_slots()
             except Exception:
-                return []
+                return {}
 
         def _buy(tok):
             try:
-                from shop.currency import add_coins, add_shards
-                cost = int(tok.get("cost_amount") or 0)
-                currency = (tok.get("cost_currency") or "coins").strip().lower()
-                if "shard" in currency:
-                    applied = add_shards(-cost)
-                    if applied == 0:
-                        messagebox.showinfo("Shop", "Not enough shards.", parent=self)
-                        return
-                elif "coin" in currency:
-                    applied = add_coins(-cost)
-                    if applied == 0:
-                        messagebox.showinfo("Shop", "Not enough coins.", parent=self)
-                        return
-                else:
-                    messagebox.showinfo("Shop", f"Currency '{currency}' not supported.", parent=self)
+                from shop.currency import wallet
+                kind = tok.currency
+                if kind not in ("coins", "shards"):
+                    messagebox.showinfo("Shop", f"Currency '{kind}' not supported.", parent=self)
+                    return
+                # spend + inventory insert are one transaction
+                if wallet.transact([(kind, -tok.cost)], inventory_add=[(tok.item, tok.category)],
+                                   reason="buy", ref=tok.item) is None:
+                    messagebox.showinfo("Shop", f"Not enough {kind}.", parent=self)
                     return
-                # persist
-                items = []
-                try:
-                    if inv_path.exists():
-                        items = json.loads(inv_path.read_text(encoding="utf-8") or "[]")
-                except Exception:
-                    items = []
-                items.append({
-                    "item": tok.get("item"),
-                    "category": tok.get("category"),
-                    "bought_at": str(date.today())
-                })
-
-                inv_path.write_text(json.dumps(items), encoding="utf-8")
 
                 # Play bought sound effect
                 try:
@@ -676,22 +488,8 @@ class JournalPanel(tk.Frame):
                 except Exception:
                     pass
 
-                # Update currency display if method exists
-                try:
-                    if hasattr(self.master, "update_currency_display"):
-                        self.master.update_currency_display()
-                except Exception:
-                    pass
-
-                messagebox.showinfo("Shop", f"Bought {tok.get('item')}", parent=self)
-
-                # Refresh main UI so shop/inventory/effects state is visible immediately
-                try:
-                    if hasattr(self.master, 'refresh_all'):
-                        try: self.master.refresh_all()
-                        except Exception: pass
-                except Exception:
-                    pass
+                # (topbar currency redraws from the wallet event)
+                messagebox.showinfo("Shop", f"Bought {tok.item}", parent=self)
 
                 # Find the slot for this token
                 slot = next((s for s in self._shop_slots if s.get("tok") == tok), None)
@@ -725,8 +523,8 @@ class JournalPanel(tk.Frame):
 
         def _show_slot_info(slot):
             try:
-                t = slot.get("tok") or {}
-                print(f"[shop] token clicked: {t.get('item') if t else '<empty>'}")
+                t = slot.get("tok")
+                print(f"[shop] token clicked: {t.item if t else '<empty>'}")
                 try:
                     from sound import play_sfx
                     play_sfx("click")
@@ -735,19 +533,15 @@ class JournalPanel(tk.Frame):
 
                 info = tk.Toplevel(self)
                 info.transient(self)
-                info.title(t.get("item") or "Token")
+                info.title(t.item if t else "Token")
                 info.configure(bg=COLORS.get("CARD", "#fff"))
                 # Show icon if available
-                cat_norm = (t.get("category") or "").strip().lower()
-                img = self._icon_by_category.get(cat_norm)
-                if not img:
-                    idx = abs(hash(cat_norm)) % max(1, len(self._icon_list))
-                    img = self._icon_list[idx]
+                img = self._icon_for(t)
                 if img:
                     icon_lbl = tk.Label(info, image=img, bg=COLORS.get("CARD", "#fff"))
                     icon_lbl.image = img
                     icon_lbl.pack(pady=(12, 0))
-                txt = t.get("description") or t.get("details") or t.get("item") or "No description available."
+                txt = (t.effect or t.item) if t else "No description available."
                 tk.Label(info, text=txt, wraplength=320,
                          bg=COLORS.get("CARD", "#fff"),
                          fg=COLORS.get("TEXT", "#000"), font=(None, 11)).pack(padx=12, pady=12)
@@ -801,9 +595,70 @@ class JournalPanel(tk.Frame):
             return slot
 
 
+        # ---- slot timers ----
+        # The label only shows "Nd" / "Hh Mm" / "Mm Ss", so each slot is woken when
+        # its text next changes (or it expires), not every second. Pending wakeups
+        # sit in a min-heap; one scheduler task sleeps until the earliest. A slot's
+        # "timer_gen" is bumped on every reschedule so stale heap entries are skipped.
+        self._timer_heap = []
+        timer_seq = itertools.count()
+
+        def _timer_text(remaining):
+            """(label text, seconds until that text changes) for `remaining` > 0 seconds."""
+            if remaining >= 86400:
+                return f"{remaining // 86400}d", remaining % 86400 + 1
+            if remaining >= 3600:
+                return f"{remaining // 3600}h {(remaining % 3600) // 60}m", remaining % 60 + 1
+            if remaining >= 60:
+                return f"{remaining // 60}m {remaining % 60}s", 1
+            return f"{remaining}s", 1
+
+        def _schedule_slot_timer(slot, now=None):
+            slot["timer_gen"] = slot.get("timer_gen", 0) + 1
+            exp = slot.get("expires_at")
+            if not exp:
+                return
+            now = now or datetime.now()
+            remaining = int((exp - now).total_seconds())
+            if remaining <= 0:
+                due = now
+            else:
+                text, change_in = _timer_text(remaining)
+                try:
+                    slot["timer_lbl"].config(text=f"Expires in {text}")
+                except Exception:
+                    pass
+                # the moment int(exp - t) drops to remaining - change_in (+5ms so it has)
+                due = exp - timedelta(seconds=remaining - change_in + 1) + timedelta(milliseconds=5)
+            heapq.heappush(self._timer_heap, (due, next(timer_seq), slot["timer_gen"], slot))
+            _arm_timers()
+
+        def _arm_timers():
+            heap = self._timer_heap
+            while heap and heap[0][2] != heap[0][3].get("timer_gen"):
+                heapq.heappop(heap)
+            if not heap:
+                scheduler.cancel("shop.slot_timers")
+                return
+            delay_ms = (heap[0][0] - datetime.now()).total_seconds() * 1000
+            scheduler.once("shop.slot_timers", max(1, delay_ms), _on_timers_due, widget=self)
+
+        def _on_timers_due():
+            now = datetime.now()
+            heap = self._timer_heap
+            while heap and heap[0][0] <= now:
+                _due, _seq, gen, slot = heapq.heappop(heap)
+                if gen != slot.get("timer_gen"):
+                    continue
+                if slot["expires_at"] <= now:
+                    _replace_slot(slot)   # re-assigning reschedules the slot
+                else:
+                    _schedule_slot_timer(slot, now)
+            _arm_timers()
+
         def _assign_token_to_slot(slot, tok, expires_at=None):
             """Assign token to slot; handle expiry and image."""
-            print(f"[shop.trace] assign -> slot {slot.get('idx')} item={tok.get('item')!r}")
+            print(f"[shop.trace] assign -> slot {slot.get('idx')} item={tok.item!r}")
             slot["tok"] = tok
 
             # expiry
@@ -823,12 +678,12 @@ class JournalPanel(tk.Frame):
 
             # labels + buy
             # Show cost with currency icon
-            cost = tok.get("cost_amount", "")
-            currency = (tok.get("cost_currency") or "Coins").strip().lower()
+            cost = tok.cost
+            currency = tok.currency
             icon = None
-            if "shard" in currency:
+            if currency == "shards":
                 icon = self._currency_icons.get("shard")
-            elif "coin" in currency:
+            elif currency == "coins":
                 icon = self._currency_icons.get("coin")
             # Compose label with icon and text
             if icon:
@@ -836,11 +691,11 @@ class JournalPanel(tk.Frame):
                 slot["item_lbl"].image = icon
             else:
                 slot["item_lbl"].config(text=f"{cost} {currency.title()}", image="", font=(None, 11, "bold"), fg=COLORS["TEXT"], bg=COLORS["CARD"])
-            slot["dur_lbl"].config(text=f"{tok.get('duration','')}")
+            slot["dur_lbl"].config(text=tok.duration)
             self._rebind_buy_button(slot, tok, _buy)
 
             # --- Tooltip for effect on hover ---
-            effect = tok.get("effect") or ""
+            effect = tok.effect
             tooltip = None
             def show_tooltip(event):
                 nonlocal tooltip
@@ -863,12 +718,7 @@ class JournalPanel(tk.Frame):
                 except: pass
 
             # choose image by category (as you had)
-            cat_norm = (tok.get("category") or "").strip().lower()
-            img = self._icon_by_category.get(cat_norm)
-            if not img:
-                idx = abs(hash(cat_norm)) % max(1, len(self._icon_list))
-                img = self._icon_list[idx]
-                print(f"[shop.img] fallback icon for '{tok.get('category')}' -> token{idx+1}.png")
+            img = self._icon_for(tok)
 
             # size to holder
             try:
@@ -902,7 +752,7 @@ class JournalPanel(tk.Frame):
                 # No click handler for the image itself; only hover tooltip is active
 
                 # Name badge inside the same frame (centered, wrapped)
-                name = (tok.get("item") or "")
+                name = tok.item
                 short = name if len(name) <= 24 else name[:22] + "…"
                 badge = tk.Label(
                     img_frame,
@@ -922,15 +772,12 @@ class JournalPanel(tk.Frame):
                 img_frame._phase = random.uniform(0, 2 * math.pi)  # randomize phase for out-of-sync bob
                 amplitude = max(3, min(10, (H - 100) // 3))  # stay within holder
                 step_ms = 80
-                def _bob(widget):
-                    try:
-                        widget._phase += 0.25
-                        y = int(amplitude * math.sin(widget._phase))
-                        widget.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
-                        widget.after(step_ms, _bob, widget)
-                    except Exception:
-                        pass
-                _bob(img_frame)
+                def _bob(widget=img_frame):
+                    widget._phase += 0.25
+                    y = int(amplitude * math.sin(widget._phase))
+                    widget.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
+                # one task per slot; replacing the slot's token replaces the task
+                scheduler.every(f"shop.slot_bob.{slot['idx']}", step_ms, _bob, widget=img_frame, run_now=True)
 
                 slot["img_label"] = img_frame
             else:
@@ -941,21 +788,17 @@ class JournalPanel(tk.Frame):
 
             # No click-to-show-info handlers; only hover tooltip is active
 
-            _save_slots_state()
+            _save_slot_state(slot)
+            _schedule_slot_timer(slot)
 
         def _replace_slot(slot):
-            pool = [t for t in tokens if t and t != slot.get("tok")] or tokens[:]
+            # current catalog, so CSV edits show up as slots rotate
+            current = catalog.tokens()
+            held = slot.get("tok")
+            pool = [t for t in current if not held or t.item != held.item] or list(current)
             new_tok = random.choice(pool) if pool else None
             if new_tok:
                 _assign_token_to_slot(slot, new_tok)
-                _save_slots_state()
-                # After replacing a slot, ensure the parent UI refreshes (currency/effects may have changed)
-                try:
-                    if hasattr(self.master, 'refresh_all'):
-                        try: self.master.refresh_all()
-                        except Exception: pass
-                except Exception:
-                    pass
 
         # create up to 3 visible slots, try to restore previous state
         visible = min(3, max(1, len(tokens))) or 3
@@ -964,12 +807,12 @@ class JournalPanel(tk.Frame):
         for i in range(visible):
             slot = _make_slot(i)
             restored = None
-            if i < len(saved):
+            if i in saved:
                 entry = saved[i]
                 if entry and isinstance(entry, dict):
                     name = entry.get("item")
                     if name:
-                        restored = next((t for t in tokens if t and t.get("item") == name), None)
+                        restored = catalog.get(name)
                         if restored:
                             _assign_token_to_slot(slot, restored, expires_at=entry.get("expires_at"))
             if not restored:
@@ -981,43 +824,21 @@ class JournalPanel(tk.Frame):
 
         # Add the shopkeeper sprite to the right of the last slot
 
-        def _update_timers():
-            now = datetime.now()
-            for slot in list(self._shop_slots):
-                exp = slot.get("expires_at")
-                if not exp:
-                    continue
-                remaining = int((exp - now).total_seconds())
-                if remaining <= 0:
-                    _replace_slot(slot); continue
-                if remaining >= 86400:
-                    text = f"{remaining // 86400}d"
-                elif remaining >= 3600:
-                    hrs = remaining // 3600
-                    mins = (remaining % 3600) // 60
-                    text = f"{hrs}h {mins}m"
-                elif remaining >= 60:
-                    mins = remaining // 60
-                    secs = remaining % 60
-                    text = f"{mins}m {secs}s"
-                else:
-                    text = f"{remaining}s"
-                try:
-                    slot["timer_lbl"].config(text=f"Expires in {text}")
-                except Exception:
-                    pass
-            self.after(1000, _update_timers)
-
-        self.after(1000, _update_timers)
 
     # ---- Public API ----
     def set_prompt(self, text: str):
         self.prompt_lbl.config(text=text or "")
 
-    def set_text(self, text, editable: bool):
+    def set_text(self, text, editable: bool, doc=None):
+        # edits to the previous day must be snapshotted before its text is replaced
+        self.flush_autosave()
+        self._doc = doc if editable else None
+        self._saved_digest = _digest(text)
         self.text.config(state="normal")
         self.text.delete("1.0", "end")
         self.text.insert("1.0", text or "")
+        self.text.edit_modified(False)
+        self._set_dirty(False)
         # update char counter when text is programmatically set
         try:
             self._update_char_count()
@@ -1034,9 +855,63 @@ class JournalPanel(tk.Frame):
             self.status_label.config(text="(view-only for past/future dates)")
 
     def _save(self):
+        self._cancel_autosave()
         content = self.text.get("1.0", "end-1c")
         self.on_save(content)
 
+    # ---- autosave ----
+    def _on_modified(self, _e=None):
+        if not self.text.edit_modified():
+            return
+        self.text.edit_modified(False)   # re-arm <<Modified>> for the next edit
+        if self._doc is None or self.on_autosave is None:
+            return
+        self._cancel_autosave()
+        self._autosave_job = self.after(self.AUTOSAVE_MS, self._autosave)
+        self._set_dirty(True)
+
+    def _cancel_autosave(self):
+        if self._autosave_job is not None:
+            try:
+                self.after_cancel(self._autosave_job)
+            except Exception:
+                pass
+            self._autosave_job = None
+
+    def _autosave(self):
+        self._autosave_job = None
+        if self._doc is None or self.on_autosave is None:
+            return
+        content = self.text.get("1.0", "end-1c")
+        digest = _digest(content)
+        if digest == self._saved_digest:
+            self._set_dirty(False)   # typed and undid: nothing to write
+            return
+        try:
+            saved = self.on_autosave(self._doc, content)
+        except Exception as e:
+            print(f"[journal] autosave failed: {e}")
+            return
+        if not saved:
+            # refused (e.g. the day rolled over while typing): still unsaved
+            self._set_dirty(True)
+            return
+        # queued, not written yet: note_saved() clears the flag once it lands
+        self._set_dirty(True, note="Saving…")
+
+    def flush_autosave(self):
+        """Write a pending (debounced) snapshot right away."""
+        if self._autosave_job is not None:
+            self._cancel_autosave()
+            self._autosave()
+
+    def _set_dirty(self, dirty: bool, note: str = ""):
+        self.dirty = dirty
+        try:
+            self.status_label.config(text=note or ("● Unsaved changes" if dirty else ""))
+        except Exception:
+            pass
+
     def _update_char_count(self):
         try:
             cnt = len(self.text.get("1.0", "end-1c"))
@@ -1049,5 +924,17 @@ class JournalPanel(tk.Frame):
             except Exception:
                 pass
 
-    def note_saved(self):
-        self.status_label.config(text="Saved.")
+    def note_saved(self, text: str, doc=None, note: str = "Saved."):
+        """The app's write of `text` for `doc` reached the DB."""
+        if doc != self._doc:
+            return   # another day is on screen now
+        self._saved_digest = _digest(text)
+        if _digest(self.text.get("1.0", "end-1c")) == self._saved_digest:
+            self._set_dirty(False, note=note)
+
+    def note_save_failed(self, doc=None):
+        """The write for `doc` failed: keep the text dirty so the next save retries."""
+        if doc != self._doc:
+            return
+        self._saved_digest = None
+        self._set_dirty(True, note="● Save failed")
@@ -2,8 +2,11 @@ import tkinter as tk
 from tkinter import ttk
 import constants as const
 from constants import COLORS, FONTS
+from .. import theme
 
 class LogsPanel(tk.Frame):
+    PAGE_SIZE = 200     # rows materialised per Treeview page
+
     def __init__(self, master):
         super().__init__(master, bg=COLORS["CARD"], bd=0, highlightthickness=0)
 
@@ -35,6 +38,16 @@ class LogsPanel(tk.Frame):
         self.sinned.column("points", width=60, anchor="e")
         self.sinned.pack(fill="both", expand=True, pady=4)
 
+        # per-tree render state for incremental load(): rendered iids, their stripe tags, paging
+        self._views = {}
+        self._day = None                   # date the rows belong to (paging restarts when it changes)
+        for t in (self.atone, self.sinned):
+            self._views[t] = {"ids": [], "tags": {}, "recs": [], "limit": self.PAGE_SIZE}
+            t.configure(yscrollcommand=lambda first, last, tree=t: self._on_scroll(tree, last))
+        self._apply_theme()
+        theme.on_theme_change(self._apply_theme, widget=self)
+
+    def _apply_theme(self):
         # Themed row backgrounds for readability across light/dark themes
         odd_bg = COLORS.get("ROW_ODD", "#FFFFFF")
         even_bg = COLORS.get("ROW_EVEN", "#F8FAFC")
@@ -63,20 +76,86 @@ class LogsPanel(tk.Frame):
             t.tag_configure("odd", background=odd_bg, foreground=odd_fg)
             t.tag_configure("even", background=even_bg, foreground=even_fg)
 
-    def load(self, records):
-        for tree in (self.atone, self.sinned):
-            for iid in tree.get_children():
-                tree.delete(iid)
-        ai = si = 0
+    # ---- keyed, incremental rendering ----
+    # Rows use the entry id as Treeview iid, so a refresh only inserts new
+    # entries, deletes removed ones and re-tags rows whose stripe parity
+    # shifted. Only the first `limit` rows of a list are materialised; more
+    # pages are added as the user scrolls to the bottom.
+    @staticmethod
+    def _row_values(rec):
+        when = rec["ts"][11:16]
+        desc = f"[{rec['category']}] {rec['item']}"
+        pts = rec["points"]
+        return (when, desc, f"+{pts}" if rec["entry_type"] == "ATONE" else str(pts))
+
+    def load(self, records, day=None):
+        """Show `records`; pass the day they belong to so paging restarts on a new day."""
+        if day is not None and day != self._day:
+            self._day = day
+            for st in self._views.values():
+                st["limit"] = self.PAGE_SIZE
+        split = {self.atone: [], self.sinned: []}
         for rec in records:
-            when = rec["ts"][11:16]
-            desc = f"[{rec['category']}] {rec['item']}"
-            pts = rec["points"]
-            if rec["entry_type"] == "ATONE":
-                tag = "odd" if (ai % 2 == 0) else "even"
-                self.atone.insert("", "end", values=(when, desc, f"+{pts}"), tags=(tag,))
-                ai += 1
-            else:
-                tag = "odd" if (si % 2 == 0) else "even"
-                self.sinned.insert("", "end", values=(when, desc, str(pts)), tags=(tag,))
-                si += 1
+            split[self.atone if rec["entry_type"] == "ATONE" else self.sinned].append(rec)
+        for tree, recs in split.items():
+            self._sync(tree, recs)
+
+    def _sync(self, tree, recs):
+        st = self._views[tree]
+        st["recs"] = recs
+        have = st["ids"]
+        have_set = set(have)
+        all_ids = [str(r["id"]) for r in recs]
+        want = all_ids[:st["limit"]]
+        if want == have:
+            return
+        want_set = set(want)
+        kept = [i for i in have if i in want_set]
+        if kept != [i for i in want if i in have_set]:
+            # order changed under us (shouldn't happen for ts-ordered rows): rebuild
+            tree.delete(*have)
+            st["ids"], st["tags"], have, kept = [], {}, [], []
+
+        first_dirty = len(want)
+        gone = [i for i in have if i not in want_set]
+        if gone:
+            first_dirty = min(first_dirty, have.index(gone[0]))
+            tree.delete(*gone)
+            for i in gone:
+                st["tags"].pop(i, None)
+
+        by_id = {str(r["id"]): r for r in recs}
+        k = 0
+        for idx, iid in enumerate(want):
+            if k < len(kept) and kept[k] == iid:
+                k += 1
+                continue
+            tag = "odd" if idx % 2 == 0 else "even"
+            tree.insert("", idx, iid=iid, values=self._row_values(by_id[iid]), tags=(tag,))
+            st["tags"][iid] = tag
+            first_dirty = min(first_dirty, idx)
+
+        # only rows at/after the first change can have shifted parity
+        for idx in range(first_dirty, len(want)):
+            iid = want[idx]
+            tag = "odd" if idx % 2 == 0 else "even"
+            if st["tags"].get(iid) != tag:
+                tree.item(iid, tags=(tag,))
+                st["tags"][iid] = tag
+        st["ids"] = want
+
+    def _on_scroll(self, tree, last):
+        st = self._views[tree]
+        try:
+            at_bottom = float(last) >= 0.98
+        except ValueError:
+            return
+        if at_bottom and len(st["ids"]) < len(st["recs"]) and not st.get("paging"):
+            st["paging"] = True
+            self.after_idle(lambda: self._next_page(tree))
+
+    def _next_page(self, tree):
+        st = self._views[tree]
+        st["paging"] = False
+        st["limit"] += self.PAGE_SIZE
+        self._sync(tree, st["recs"])
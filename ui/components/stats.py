@@ -1,43 +1,104 @@
 # ui/components/stats.py
+import time
 import tkinter as tk
 from constants import COLORS, FONTS, POSITIVE_TRAITS, STAT_MIN, STAT_MAX
+from .. import theme
 
 BAR_H = 12
 RADIUS = 6
 BAR_WIDTH = 320
+BASE_FILL = "#BFC8D4"
+ANIM_MS = 180       # old -> new value tween
+ANIM_FRAME_MS = 15
 
 class _Bar(tk.Canvas):
+    """Track + baseline + delta, each a round-capped line made once.
+
+    A line of width BAR_H with round caps is exactly a RADIUS-cornered pill,
+    so a redraw is just coords() on three items (no re-tessellated polygons).
+    Value changes ease from what is currently shown to the new value.
+    """
     def __init__(self, master, width=BAR_WIDTH):
         super().__init__(master, width=width, height=BAR_H, bg=COLORS["CARD"],
                          highlightthickness=0, bd=0)
         self.w = width
+        opts = dict(width=BAR_H, capstyle="round")
+        self._track = self.create_line(0, 0, 0, 0, fill=COLORS.get("TRACK", "#D4D4D8"), **opts)
+        self._base = self.create_line(0, 0, 0, 0, fill=BASE_FILL, state="hidden", **opts)
+        self._delta = self.create_line(0, 0, 0, 0, state="hidden", **opts)
+        self._shown = None     # (value, baseline) currently on screen
+        self._target = None
+        self._anim = None      # (start, t0 ms, after id) while tweening
+        self._set_segment(self._track, 0, self.w)
+        self.bind("<Configure>", self._on_resize)
+        theme.on_theme_change(self._recolor, widget=self)
+
+    def _set_segment(self, item, x1, x2):
+        """Place a pill from x1 to x2 (hidden if empty)."""
+        span = x2 - x1
+        if span < 1:
+            self.itemconfigure(item, state="hidden")
+            return
+        # caps add RADIUS on each side; narrow segments become a smaller dot
+        thick = min(BAR_H, span)
+        r = thick / 2
+        self.coords(item, x1 + r, BAR_H / 2, max(x1 + r, x2 - r), BAR_H / 2)
+        self.itemconfigure(item, state="normal", width=thick)
+
+    def _px(self, v):
+        return max(0, min(self.w, int(self.w * v / STAT_MAX)))
+
+    def _render(self, value, baseline):
+        self._shown = (value, baseline)
+        base_px = self._px(baseline)
+        cur_px = self._px(value)
+        self._set_segment(self._base, 0, base_px)
+        if cur_px > base_px:
+            self.itemconfigure(self._delta, fill=COLORS.get("GOOD", "#22C55E"))
+            self._set_segment(self._delta, base_px, cur_px)
+        elif cur_px < base_px:
+            self.itemconfigure(self._delta, fill=COLORS.get("BAD", "#EF4444"))
+            self._set_segment(self._delta, cur_px, base_px)
+        else:
+            self.itemconfigure(self._delta, state="hidden")
 
-    def _rounded_rect(self, x1, y1, x2, y2, r, fill):
-        pts = [
-            x1+r,y1, x2-r,y1, x2,y1, x2,y1+r,
-            x2,y2-r, x2,y2, x2-r,y2, x1+r,y2,
-            x1,y2, x1,y2-r, x1,y1+r, x1,y1
-        ]
-        self.create_polygon(pts, smooth=True, splinesteps=36, fill=fill, outline="")
-
-    def draw(self, value, baseline):
-        self.delete("all")
-        # Track
-        self._rounded_rect(0, 0, self.w, BAR_H, RADIUS, fill=COLORS.get("TRACK", "#D4D4D8"))
-
-        # Baseline segment (neutral)
-        base_px = max(0, min(self.w, int(self.w * baseline / STAT_MAX)))
-        cur_px  = max(0, min(self.w, int(self.w * value    / STAT_MAX)))
-
-        if base_px > 0:
-            self._rounded_rect(0, 0, base_px, BAR_H, RADIUS, fill="#BFC8D4")
-
-        # Delta overlay
-        if cur_px != base_px:
-            if cur_px > base_px:
-                self._rounded_rect(base_px, 0, cur_px, BAR_H, RADIUS, fill=COLORS.get("GOOD", "#22C55E"))
-            else:
-                self._rounded_rect(cur_px, 0, base_px, BAR_H, RADIUS, fill=COLORS.get("BAD", "#EF4444"))
+    def draw(self, value, baseline, animate=True):
+        target = (value, baseline)
+        if target == self._target:
+            return
+        self._target = target
+        if self._anim:
+            self.after_cancel(self._anim[2])
+            self._anim = None
+        if not animate or self._shown is None or not self.winfo_ismapped():
+            self._render(value, baseline)
+            return
+        self._anim = (self._shown, time.monotonic() * 1000, None)
+        self._step()
+
+    def _step(self):
+        (v0, b0), t0, _ = self._anim
+        v1, b1 = self._target
+        t = min(1.0, (time.monotonic() * 1000 - t0) / ANIM_MS)
+        k = 1 - (1 - t) ** 3   # ease-out
+        self._render(v0 + (v1 - v0) * k, b0 + (b1 - b0) * k)
+        if t >= 1.0:
+            self._anim = None
+        else:
+            self._anim = ((v0, b0), t0, self.after(ANIM_FRAME_MS, self._step))
+
+    def _on_resize(self, event):
+        if event.width != self.w:
+            self.w = event.width
+            self._set_segment(self._track, 0, self.w)
+            if self._shown is not None:
+                self._render(*self._shown)
+
+    def _recolor(self):
+        self.configure(bg=COLORS["CARD"])
+        self.itemconfigure(self._track, fill=COLORS.get("TRACK", "#D4D4D8"))
+        if self._shown is not None:
+            self._render(*self._shown)
 
 class StatsPanel(tk.Frame):
     def __init__(self, master):
@@ -4,6 +4,9 @@ from datetime import date
 import math
 from constants import COLORS, FONTS
 from widgets import RoundButton
+from scheduler import scheduler
+import assets
+from .. import theme
 
 class TopBar(tk.Frame):
     def __init__(self, master, on_prev, on_next, on_calendar=None):
@@ -44,23 +47,9 @@ class TopBar(tk.Frame):
         self._coins_var = tk.StringVar(value="0")
         self._shards_var = tk.StringVar(value="0")
 
-        # Load images and ensure a consistent max size (approx 28px)
-        def _load_and_fit(path, max_size=28):
-            try:
-                img = tk.PhotoImage(file=path)
-                try:
-                    w, h = img.width(), img.height()
-                    if w > max_size or h > max_size:
-                        factor = max(1, int(max(w // max_size, h // max_size)))
-                        img = img.subsample(factor, factor)
-                except Exception:
-                    pass
-                return img
-            except Exception:
-                return None
-
-        self._coin_img = _load_and_fit("images/coin.png", max_size=28)
-        self._shard_img = _load_and_fit("images/shard.png", max_size=28)
+        # Shared icons, pre-scaled to fit ~28px (see assets.py)
+        self._coin_img = assets.image("images/coin.png", 28)
+        self._shard_img = assets.image("images/shard.png", 28)
 
         # Create holders so we can animate the icons without disturbing layout
         if self._coin_img:
@@ -89,28 +78,20 @@ class TopBar(tk.Frame):
             if self._coin_label:
                 self._coin_label._phase = 0.0
                 def _coin_bob():
-                    try:
-                        self._coin_label._phase += 0.25
-                        y = int(3 * math.sin(self._coin_label._phase))
-                        self._coin_label.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
-                    except Exception:
-                        return
-                    self.after(140, _coin_bob)
-                _coin_bob()
+                    self._coin_label._phase += 0.25
+                    y = int(3 * math.sin(self._coin_label._phase))
+                    self._coin_label.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
+                scheduler.every("topbar.coin_bob", 140, _coin_bob, widget=self._coin_label, run_now=True)
 
             # shard bob (gentle vertical motion with a slightly different phase)
             if self._shard_label:
                 # shard uses a similar gentle bob but with a phase offset so movement feels distinct
                 self._shard_label._phase = 0.9
                 def _shard_bob():
-                    try:
-                        self._shard_label._phase += 0.25
-                        y = int(3 * math.sin(self._shard_label._phase))
-                        self._shard_label.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
-                    except Exception:
-                        return
-                    self.after(140, _shard_bob)
-                _shard_bob()
+                    self._shard_label._phase += 0.25
+                    y = int(3 * math.sin(self._shard_label._phase))
+                    self._shard_label.place_configure(relx=0.5, rely=0.5, anchor='center', y=y)
+                scheduler.every("topbar.shard_bob", 140, _shard_bob, widget=self._shard_label, run_now=True)
         except Exception:
             pass
 
@@ -136,6 +117,12 @@ class TopBar(tk.Frame):
         # Spacer to keep things tidy
         tk.Label(self, text="", bg=COLORS["BG"]).pack(side="right", expand=True)
 
+        for btn in (self.prev_btn, self.next_btn, getattr(self, "cal_btn", None)):
+            if btn is not None:
+                theme.register(btn, fill="CARD", hover_fill="PRIMARY_HOVER", fg="TEXT")
+        theme.register(self.date_label, bg="BG", fg="TEXT")
+        theme.register(self.rank_label, bg="BG", fg="MUTED")
+
     # --- API used by app.py ---
 
     def set_date(self, d: date, is_today: bool):
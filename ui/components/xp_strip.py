@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
 from constants import COLORS
+from animations import animate_intvar
 
 
 class XPStrip(tk.Frame):
+    TWEEN_MS = 450   # bar animation length, independent of the XP delta
+
     def __init__(self, master):
         super().__init__(master, bg=COLORS["BG"])
+        self._tween = None
         self.level_label = tk.Label(
             self,
             text="LVL 1",
@@ -43,21 +47,13 @@ class XPStrip(tk.Frame):
     def set_level(self, lvl, in_level, need, animate_from=None):
         self.level_label.config(text=f"LVL {lvl}")
         self.bar.configure(maximum=need)
+        # a new value supersedes whatever is still animating
+        if self._tween is not None:
+            self._tween.cancel()
+            self._tween = None
         if animate_from is not None:
-            # simple tween to avoid pulling in animations module here
-            step = 1 if in_level >= animate_from else -1
-            val = animate_from
-            self.var.set(val)
-
-            def tick():
-                nonlocal val
-                if val == in_level:
-                    return
-                val += step
-                self.var.set(val)
-                self.after(6, tick)
-
-            tick()
+            self._tween = animate_intvar(self.var, int(animate_from), int(in_level),
+                                         duration_ms=self.TWEEN_MS, widget=self)
         else:
             self.var.set(in_level)
         self.text.config(text=f"{in_level}/{need} XP")
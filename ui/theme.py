@@ -0,0 +1,158 @@
+# ui/theme.py — re-color the live widget tree when the theme changes
+#
+# Components can register widgets with explicit color roles:
+#
+#     theme.register(label, bg="CARD", fg="TEXT")
+#     theme.register(button, fill="PRIMARY", hover_fill="PRIMARY_HOVER", fg="PRIMARY_TEXT")
+#
+# and/or a callback for things drawn from derived colors (blends, tags, ttk
+# styles):
+#
+#     theme.on_theme_change(self._apply_theme, widget=self)
+#
+# apply() then updates registered widgets from their roles, walks the rest of
+# the tree swapping every option / canvas item color that matched an old
+# palette value for the new one, and runs the callbacks. Entries whose widget
+# was destroyed are dropped on the way.
+import tkinter as tk
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import COLORS
+from widgets import RoundButton
+
+# widget options that may carry a palette color
+_OPTIONS = ("bg", "fg", "activebackground", "activeforeground", "highlightbackground",
+            "highlightcolor", "insertbackground", "selectbackground", "selectforeground",
+            "troughcolor", "disabledforeground", "selectcolor")
+_ITEM_OPTIONS = ("fill", "outline", "activefill")
+# when two roles shared a color in the old palette, these win the remap
+_PRIORITY = ("BG", "CARD", "TEXT", "MUTED", "PRIMARY", "ACCENT")
+
+_registered: Dict[str, Tuple[tk.Misc, Dict[str, str]]] = {}
+_callbacks: List[Tuple[Callable[[], None], Optional[tk.Misc]]] = []
+
+
+def register(widget: tk.Misc, **roles: str) -> tk.Misc:
+    """Remember which COLORS key each option of `widget` follows; returns the widget."""
+    entry = _registered.get(str(widget))
+    if entry and entry[0] is widget:
+        entry[1].update(roles)
+    else:
+        _registered[str(widget)] = (widget, dict(roles))
+    return widget
+
+
+def on_theme_change(fn: Callable[[], None], widget: Optional[tk.Misc] = None) -> Callable[[], None]:
+    """Run fn() after every theme switch (until `widget` is destroyed); returns an unsubscribe function."""
+    item = (fn, widget)
+    _callbacks.append(item)
+
+    def _unsubscribe():
+        try:
+            _callbacks.remove(item)
+        except ValueError:
+            pass
+    return _unsubscribe
+
+
+def snapshot() -> Dict[str, str]:
+    """Copy of the current palette, to pass to apply() after set_theme()."""
+    return dict(COLORS)
+
+
+def _alive(widget) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except tk.TclError:
+        return False
+
+
+def _remap_table(old: Dict[str, str]) -> Dict[str, str]:
+    table: Dict[str, str] = {}
+    keys = [k for k in _PRIORITY if k in old] + [k for k in old if k not in _PRIORITY]
+    for key in keys:
+        before, after = old.get(key), COLORS.get(key)
+        if isinstance(before, str) and before.startswith("#") and after:
+            table.setdefault(before.upper(), after)
+    return table
+
+
+def _set_roles(widget, roles: Dict[str, str]) -> None:
+    opts = {opt: COLORS[key] for opt, key in roles.items() if key in COLORS}
+    if isinstance(widget, RoundButton):
+        widget.set_colors(**opts)
+    elif opts:
+        widget.configure(**opts)
+
+
+def _remap_widget(widget, table: Dict[str, str], skip=()) -> None:
+    if isinstance(widget, RoundButton):
+        new = {k: table.get(str(getattr(widget, k)).upper()) for k in ("fill", "hover_fill", "fg") if k not in skip}
+        widget.set_colors(**{k: v for k, v in new.items() if v})
+        # its frame/canvas background follows the parent; the items are set_colors' job
+        bg = table.get(str(widget.cget("bg")).upper())
+        if bg:
+            widget.configure(bg=bg)
+            widget.canvas.configure(bg=bg)
+        return
+    changes = {}
+    for opt in _OPTIONS:
+        if opt in skip:
+            continue
+        try:
+            cur = widget.cget(opt)
+        except (tk.TclError, ValueError):
+            continue  # ttk widgets / options this class lacks
+        new = table.get(str(cur).upper())
+        if new:
+            changes[opt] = new
+    if changes:
+        try:
+            widget.configure(**changes)
+        except tk.TclError:
+            pass
+    if isinstance(widget, tk.Canvas):
+        for item in widget.find_all():
+            item_changes = {}
+            for opt in _ITEM_OPTIONS:
+                try:
+                    new = table.get(str(widget.itemcget(item, opt)).upper())
+                except tk.TclError:
+                    continue
+                if new:
+                    item_changes[opt] = new
+            if item_changes:
+                widget.itemconfigure(item, **item_changes)
+
+
+def apply(root: tk.Misc, old: Dict[str, str]) -> None:
+    """Re-color everything under `root` from palette `old` to the current COLORS."""
+    table = _remap_table(old)
+
+    for name, (widget, roles) in list(_registered.items()):
+        if not _alive(widget):
+            _registered.pop(name, None)
+            continue
+        try:
+            _set_roles(widget, roles)
+        except tk.TclError as e:
+            print(f"[theme] {name}: {e}")
+
+    stack = [root]
+    while stack:
+        widget = stack.pop()
+        entry = _registered.get(str(widget))
+        skip = entry[1] if entry and entry[0] is widget else ()
+        _remap_widget(widget, table, skip)
+        if not isinstance(widget, RoundButton):
+            stack.extend(widget.winfo_children())
+
+    for item in list(_callbacks):
+        fn, widget = item
+        if widget is not None and not _alive(widget):
+            _callbacks.remove(item)
+            continue
+        try:
+            fn()
+        except Exception as e:
+            print(f"[theme] callback failed: {e}")
@@ -1,8 +1,49 @@
 # widgets.py
+import math
 import tkinter as tk
 import tkinter.font as tkfont
 from sound import play_sfx
 
+# Shared across all RoundButtons: one Font object per font spec, text extents
+# per (text, font) and outline points per (width, height, radius). Buttons
+# are created by the dozen in every dialog, so each only pays for a lookup.
+_FONTS = {}
+_TEXT_SIZES = {}
+_SHAPES = {}
+CORNER_STEPS = 6  # straight segments per rounded corner
+
+
+def _font_key(font):
+    return font if isinstance(font, (str, tuple)) else repr(font)
+
+
+def _text_size(text, font):
+    key = (text, _font_key(font))
+    size = _TEXT_SIZES.get(key)
+    if size is None:
+        f = _FONTS.get(key[1])
+        if f is None:
+            f = _FONTS[key[1]] = tkfont.Font(font=font)
+        size = _TEXT_SIZES[key] = (f.measure(text), f.metrics("linespace"))
+    return size
+
+
+def _rounded_rect_points(w, h, r):
+    """Flat outline of a w x h rounded rectangle (drawn with smooth=False)."""
+    key = (w, h, r)
+    pts = _SHAPES.get(key)
+    if pts is None:
+        r = max(0, min(r, w / 2, h / 2))
+        pts = []
+        # corner centers clockwise from top-right, each sweeping 90 degrees
+        for cx, cy, start in ((w - r, r, -90), (w - r, h - r, 0), (r, h - r, 90), (r, r, 180)):
+            for i in range(CORNER_STEPS + 1):
+                a = math.radians(start + 90 * i / CORNER_STEPS)
+                pts += (cx + r * math.cos(a), cy + r * math.sin(a))
+        pts = _SHAPES[key] = tuple(pts)
+    return pts
+
+
 class RoundButton(tk.Frame):
     def __init__(self, master, text, command=None,
                  fill="#6C63FF", hover_fill="#7A71FF",
@@ -23,6 +64,7 @@ class RoundButton(tk.Frame):
         self._hovered = False
         self._enabled = True
         self._bg_id = self._text_id = None
+        self._size = None
         self.after(0, self._redraw)
 
     def enable(self, yes=True):
@@ -33,29 +75,45 @@ class RoundButton(tk.Frame):
         if self._bg_id:
             self.canvas.itemconfigure(self._bg_id, stipple=("gray50" if not yes else ""))
 
-    # ---- drawing ----
-    def _rounded_rect(self, x1, y1, x2, y2, r, **kwargs):
-        pts = [
-            x1+r, y1,  x2-r, y1,  x2, y1,  x2, y1+r,
-            x2, y2-r,  x2, y2,  x2-r, y2,  x1+r, y2,
-            x1, y2,    x1, y2-r, x1, y1+r, x1, y1
-        ]
-        return self.canvas.create_polygon(pts, smooth=True, splinesteps=36,
-                                          outline="", width=0, **kwargs)
+    def set_colors(self, fill=None, hover_fill=None, fg=None):
+        """Swap colors in place (used by theme switching)."""
+        if fill:
+            self.fill = fill
+        if hover_fill:
+            self.hover_fill = hover_fill
+        if fg:
+            self.fg = fg
+        if self._bg_id is not None:
+            self.canvas.itemconfigure(self._bg_id, fill=(self.hover_fill if self._hovered else self.fill))
+            self.canvas.itemconfigure(self._text_id, fill=self.fg)
+
+    def set_text(self, text):
+        self.text = text
+        self._redraw()
 
+    # ---- drawing ----
     def _redraw(self):
-        self.canvas.delete("all")
-        f = tkfont.Font(font=self.font)
-        tw, th = f.measure(self.text), f.metrics("linespace")
+        tw, th = _text_size(self.text, self.font)
         w, h = tw + self.padx*2, th + self.pady*2
-        self.canvas.config(width=w, height=h)
         fill = self.hover_fill if self._hovered else self.fill
-        self._bg_id = self._rounded_rect(0, 0, w, h, self.radius, fill=fill)
-        self._text_id = self.canvas.create_text(w/2, h/2, text=self.text, fill=self.fg, font=self.font)
+        if self._bg_id is None:
+            self._bg_id = self.canvas.create_polygon(_rounded_rect_points(w, h, self.radius),
+                                                     fill=fill, outline="", width=0)
+            self._text_id = self.canvas.create_text(w/2, h/2, text=self.text, fill=self.fg, font=self.font)
+            self._size = None
+        else:
+            self.canvas.itemconfigure(self._text_id, text=self.text)
+        if self._size != (w, h):
+            # only a size change touches geometry; same-size text swaps reuse it
+            self._size = (w, h)
+            self.canvas.config(width=w, height=h)
+            self.canvas.coords(self._bg_id, *_rounded_rect_points(w, h, self.radius))
+            self.canvas.coords(self._text_id, w/2, h/2)
 
     def _set_hover(self, on):
         self._hovered = bool(on)
-        self._redraw()
+        if self._bg_id is not None:
+            self.canvas.itemconfigure(self._bg_id, fill=(self.hover_fill if self._hovered else self.fill))
 
     def _invoke(self):
         if self._enabled and callable(self.command):
@@ -0,0 +1,100 @@
+# writequeue.py — coalescing background writer
+#
+#     journal_writes.submit("2025-08-20", upsert_journal, "2025-08-20", text,
+#                           on_done=lambda ok: ...)
+#
+# One daemon thread per queue runs submitted writes in order. Submitting a
+# key that is still waiting replaces its pending write (only the latest
+# snapshot matters), so a burst of autosaves costs one DB write. Nothing here
+# blocks the caller: on_done(ok) callbacks are handed back through drain(),
+# which the UI thread polls while writes are pending(), and peek() shows the
+# text still on its way to the DB. flush() blocks until everything submitted
+# so far has been written; it is meant for shutdown and also runs at
+# interpreter exit so queued text isn't lost on close.
+import atexit
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class WriteQueue:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._inflight: Optional[tuple] = None   # (key, args) of the write running now
+        self._done: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.flush)
+
+    def submit(self, key: Hashable, fn: Callable, *args, on_done: Optional[Callable] = None, **kwargs) -> None:
+        """Queue fn(*args, **kwargs). on_done(ok) runs from drain() once it was written
+        (or failed); callbacks of a superseded write carry over to the one replacing it."""
+        with self._cond:
+            old = self._pending.pop(key, None)  # newer snapshot supersedes (and re-queues at the back)
+            callbacks = list(old[3]) if old else []
+            if on_done is not None:
+                callbacks.append(on_done)
+            self._pending[key] = (fn, args, kwargs, callbacks)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"writequeue-{self.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def peek(self, key: Hashable) -> Optional[tuple]:
+        """Args of the newest write for `key` not yet on disk (queued or running), else None."""
+        with self._cond:
+            if key in self._pending:
+                return self._pending[key][1]
+            if self._inflight is not None and self._inflight[0] == key:
+                return self._inflight[1]
+            return None
+
+    def drain(self) -> None:
+        """Run on_done callbacks of finished writes on the calling thread."""
+        while True:
+            try:
+                cb, ok = self._done.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                cb(ok)
+            except Exception as e:
+                print(f"[writequeue:{self.name}] on_done failed: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until the queue is drained; False if it didn't drain within timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                key, (fn, args, kwargs, callbacks) = self._pending.popitem(last=False)
+                self._busy = True
+                self._inflight = (key, args)
+            ok = False
+            try:
+                fn(*args, **kwargs)
+                ok = True
+            except Exception as e:
+                print(f"[writequeue:{self.name}] write failed: {e}")
+            finally:
+                # results are queued before the write stops counting as pending(),
+                # so a poller that sees pending() == 0 finds them in drain()
+                for cb in callbacks:
+                    self._done.put((cb, ok))
+                with self._cond:
+                    self._busy = False
+                    self._inflight = None
+                    self._cond.notify_all()
+
+
+journal_writes = WriteQueue("journal")